@@ -14,7 +14,7 @@ class UserAdmin(BaseUserAdmin):
     
     fieldsets = BaseUserAdmin.fieldsets + (
         ('Additional Info', {
-            'fields': ('role', 'phone_number', 'date_of_birth', 'address', 'profile_picture')
+            'fields': ('role', 'access_role', 'phone_number', 'date_of_birth', 'address', 'profile_picture')
         }),
     )
 
@@ -49,15 +49,21 @@ class SubjectAdmin(admin.ModelAdmin):
 
 @admin.register(Class)
 class ClassAdmin(admin.ModelAdmin):
-    list_display = ('name', 'subject', 'teacher', 'room_number', 'student_count')
+    list_display = ('name', 'subject', 'teacher', 'room_number', 'student_count', 'enrolled')
     list_filter = ('subject', 'teacher')
     search_fields = ('name', 'subject__name', 'teacher__user__first_name')
     raw_id_fields = ('teacher',)
     filter_horizontal = ('students',)
-    
-    def student_count(self, obj):
-        return obj.students.count()
-    student_count.short_description = 'Students'
+    list_select_related = ('subject', 'teacher__user')
+    readonly_fields = ('student_count',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_student_count()
+
+    def enrolled(self, obj):
+        return obj.actual_student_count
+    enrolled.short_description = 'Enrolled (live)'
+    enrolled.admin_order_field = 'actual_student_count'
 
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
@@ -81,14 +87,22 @@ class GradeAdmin(admin.ModelAdmin):
 
 @admin.register(Assignment)
 class AssignmentAdmin(admin.ModelAdmin):
-    list_display = ('title', 'class_session', 'teacher', 'due_date', 'status', 'submission_count')
+    list_display = (
+        'title', 'class_session', 'teacher', 'due_date', 'status', 'submission_count', 'submitted'
+    )
     list_filter = ('status', 'due_date', 'class_session')
     search_fields = ('title', 'description')
     raw_id_fields = ('class_session', 'teacher')
-    
-    def submission_count(self, obj):
-        return obj.submissions.count()
-    submission_count.short_description = 'Submissions'
+    list_select_related = ('class_session__subject', 'teacher__user')
+    readonly_fields = ('submission_count', 'late_submission_count')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_submission_count()
+
+    def submitted(self, obj):
+        return obj.actual_submission_count
+    submitted.short_description = 'Submitted (live)'
+    submitted.admin_order_field = 'actual_submission_count'
 
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
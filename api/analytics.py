@@ -0,0 +1,227 @@
+import statistics
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import Class, ClassStanding, Grade, StudentStanding, TermStandings
+from .routers import primary_reads
+from .terms import term_bounds
+
+GRADEBOOK_PERCENTILES = (10, 25, 75, 90)
+
+# Minimum subject percentage -> grade points; anything lower scores 0.
+GPA_SCALE = ((90, Decimal('4.0')), (80, Decimal('3.0')), (70, Decimal('2.0')), (60, Decimal('1.0')))
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile (numpy's default) of sorted values."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def _percentage(grade, max_grade):
+    return float(grade) * 100 / float(max_grade) if max_grade else None
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+def credit_weighted_averages(student_ids, start, end):
+    """
+    ``{student_id: average}`` of each student's per-subject percentage
+    (total points over total possible) for the grades assigned between
+    ``start`` and ``end``, weighted by ``Subject.credits``.
+    """
+    totals = Grade.objects.filter(
+        student_id__in=student_ids, date_assigned__range=(start, end)
+    ).order_by().values(
+        'student_id', 'subject_id', 'subject__credits'
+    ).annotate(points=Sum('grade'), possible=Sum('max_grade'))
+    weighted = defaultdict(float)
+    credits = defaultdict(int)
+    for row in totals:
+        percentage = _percentage(row['points'], row['possible'])
+        if percentage is not None:
+            weighted[row['student_id']] += percentage * row['subject__credits']
+            credits[row['student_id']] += row['subject__credits']
+    return {student_id: weighted[student_id] / credits[student_id] for student_id in credits}
+
+def column_stats(values):
+    values = sorted(value for value in values if value is not None)
+    stats = {
+        'count': len(values),
+        'mean': statistics.fmean(values) if values else None,
+        'median': statistics.median(values) if values else None,
+        'stdev': statistics.pstdev(values) if values else None,
+    }
+    for q in GRADEBOOK_PERCENTILES:
+        stats[f'p{q}'] = percentile(values, q)
+    return stats
+
+def build_gradebook(class_obj, term):
+    """
+    Students x assignments matrix of percentages for the grades of the
+    class's subject given to its roster during ``term``, with per-student
+    and per-assignment statistics as parallel arrays. Missing grades are
+    ``None``; when a student has several grades for one assignment the
+    latest counts. ``averages`` covers this subject only;
+    ``weighted_averages`` is each student's credit-weighted average over
+    all of their subjects in the term, to compare against.
+    """
+    start, end = term_bounds(term)
+    roster = list(class_obj.students.order_by(
+        'user__last_name', 'user__first_name', 'pk'
+    ).values_list('pk', 'student_id', 'user__first_name', 'user__last_name'))
+    student_ids = [row[0] for row in roster]
+    rows = Grade.objects.filter(
+        subject_id=class_obj.subject_id, student_id__in=student_ids,
+        date_assigned__range=(start, end),
+    ).order_by('date_assigned', 'pk').values_list('student_id', 'assignment_name', 'grade', 'max_grade')
+
+    assignments = {}
+    cells = {}
+    points = defaultdict(lambda: [0, 0])
+    for student_id, assignment_name, grade, max_grade in rows:
+        column = assignments.setdefault(assignment_name, len(assignments))
+        cells[(student_id, column)] = (grade, max_grade)
+    for (student_id, _), (grade, max_grade) in cells.items():
+        points[student_id][0] += grade
+        points[student_id][1] += max_grade
+
+    matrix = [
+        [_round(_percentage(*cells[(student_id, column)])) if (student_id, column) in cells else None
+         for column in range(len(assignments))]
+        for student_id in student_ids
+    ]
+    weighted = credit_weighted_averages(student_ids, start, end)
+    stats = [column_stats(column) for column in zip(*matrix)] if matrix else []
+    return {
+        'class_id': class_obj.pk,
+        'subject_id': class_obj.subject_id,
+        'term': term,
+        'students': student_ids,
+        'student_numbers': [row[1] for row in roster],
+        'student_names': [f'{row[2]} {row[3]}'.strip() for row in roster],
+        'assignments': list(assignments),
+        'matrix': matrix,
+        'averages': [
+            _round(_percentage(*points[student_id])) if student_id in points else None
+            for student_id in student_ids
+        ],
+        'weighted_averages': [_round(weighted.get(student_id)) for student_id in student_ids],
+        'assignment_stats': {
+            key: [stat[key] if key == 'count' else _round(stat[key]) for stat in stats]
+            for key in ('count', 'mean', 'median', 'stdev', *(f'p{q}' for q in GRADEBOOK_PERCENTILES))
+        },
+    }
+
+def grade_points(percentage):
+    for minimum, points in GPA_SCALE:
+        if percentage >= minimum:
+            return points
+    return Decimal('0')
+
+def competition_ranks(scores):
+    """``{key: rank}`` for ``{key: score}``, highest first, ties sharing a rank (1224)."""
+    ranks = {}
+    previous, rank = None, 0
+    for position, (key, score) in enumerate(sorted(scores.items(), key=lambda item: -item[1]), start=1):
+        if score != previous:
+            rank, previous = position, score
+        ranks[key] = rank
+    return ranks
+
+def compute_term_standings(term):
+    """
+    Recompute the cached standings of ``term`` from two queries: per
+    student and subject grade totals for grades assigned in the term, and
+    the class rosters. GPA is the ``Subject.credits``-weighted mean of
+    ``GPA_SCALE`` points; students are ranked by GPA within their
+    ``grade_level`` and by subject percentage within each class.
+    """
+    start, end = term_bounds(term)
+    totals = Grade.objects.filter(date_assigned__range=(start, end)).order_by().values_list(
+        'student_id', 'student__grade_level', 'subject_id', 'subject__credits'
+    ).annotate(points=Sum('grade'), possible=Sum('max_grade'))
+
+    subject_percentages = {}
+    weighted_points = defaultdict(Decimal)
+    credits = defaultdict(int)
+    grade_levels = {}
+    for student_id, grade_level, subject_id, subject_credits, points, possible in totals:
+        if not possible:
+            continue
+        percentage = points * 100 / possible
+        subject_percentages[(student_id, subject_id)] = percentage
+        weighted_points[student_id] += grade_points(percentage) * subject_credits
+        credits[student_id] += subject_credits
+        grade_levels[student_id] = grade_level
+
+    gpas = {
+        student_id: round(weighted_points[student_id] / credits[student_id], 2)
+        for student_id in credits
+    }
+    by_level = defaultdict(dict)
+    for student_id, gpa in gpas.items():
+        by_level[grade_levels[student_id]][student_id] = gpa
+
+    rosters = defaultdict(dict)
+    enrollments = Class.students.through.objects.values_list(
+        'class_id', 'student_id', 'class__subject_id'
+    )
+    for class_id, student_id, subject_id in enrollments.iterator():
+        percentage = subject_percentages.get((student_id, subject_id))
+        if percentage is not None:
+            rosters[class_id][student_id] = round(percentage, 2)
+
+    with transaction.atomic():
+        standings, _ = TermStandings.objects.select_for_update().get_or_create(term=term)
+        standings.students.all().delete()
+        standings.classes.all().delete()
+        student_rows = []
+        for grade_level, level_gpas in by_level.items():
+            ranks = competition_ranks(level_gpas)
+            student_rows.extend(
+                StudentStanding(
+                    standings=standings, student_id=student_id, grade_level=grade_level,
+                    gpa=gpa, credits=credits[student_id],
+                    grade_level_rank=ranks[student_id], grade_level_size=len(level_gpas),
+                )
+                for student_id, gpa in level_gpas.items()
+            )
+        class_rows = []
+        for class_id, averages in rosters.items():
+            ranks = competition_ranks(averages)
+            class_rows.extend(
+                ClassStanding(
+                    standings=standings, class_session_id=class_id, student_id=student_id,
+                    average=average, rank=ranks[student_id], size=len(averages),
+                )
+                for student_id, average in averages.items()
+            )
+        StudentStanding.objects.bulk_create(student_rows, batch_size=1000)
+        ClassStanding.objects.bulk_create(class_rows, batch_size=1000)
+        standings.is_stale = False
+        standings.save()
+    return standings
+
+def get_term_standings(term):
+    """
+    The cached standings of ``term``, recomputed first from the primary if
+    missing or stale.
+    """
+    standings = TermStandings.objects.filter(term=term, is_stale=False).first()
+    if standings is not None:
+        return standings
+    with primary_reads():
+        return compute_term_standings(term)
+
+def invalidate_term_standings(terms=None):
+    """Mark the standings of ``terms`` (default: every term) stale."""
+    standings = TermStandings.objects.filter(is_stale=False)
+    if terms is not None:
+        standings = standings.filter(term__in=terms)
+    standings.update(is_stale=True)
@@ -0,0 +1,156 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import User
+
+PROFILE_ATTRS = {
+    User.Roles.STUDENT: 'student_profile',
+    User.Roles.TEACHER: 'teacher_profile',
+}
+
+def get_role_profile(user):
+    """
+    Return the Student or Teacher profile matching ``user.role``, or None
+    for admins and for users whose profile has not been created yet.
+    """
+    attr = PROFILE_ATTRS.get(getattr(user, 'role', None))
+    if attr is None:
+        return None
+    try:
+        return getattr(user, attr)
+    except ObjectDoesNotExist:
+        return None
+
+def get_request_profile(request):
+    """Resolve the role profile once per request and cache it there."""
+    if not hasattr(request, '_role_profile'):
+        request._role_profile = get_role_profile(request.user)
+    return request._role_profile
+
+class ProfileTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that loads the user together with their student
+    and teacher profiles in the same query, so role scoping needs no
+    further lookups.
+    """
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related(
+                'user__student_profile', 'user__teacher_profile'
+            ).get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        return (token.user, token)
+
+class TokenUserCache:
+    """
+    Token key -> authenticated user, held in a process-local LRU with a TTL
+    and optionally mirrored in a Django cache so other processes can share
+    hits. Users are stored pickled (with their cached role profile) so each
+    request gets its own instance.
+    """
+    def __init__(self, max_size, ttl, alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.alias = alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared(self):
+        return caches[self.alias] if self.alias else None
+
+    def _shared_key(self, key):
+        return f'auth-token:{key}'
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, payload = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    return pickle.loads(payload)
+                del self._entries[key]
+
+        shared = self._shared()
+        payload = shared.get(self._shared_key(key)) if shared is not None else None
+        if payload is None:
+            return None
+        self._store(key, payload)
+        return pickle.loads(payload)
+
+    def set(self, key, user):
+        payload = pickle.dumps(user)
+        self._store(key, payload)
+        shared = self._shared()
+        if shared is not None:
+            shared.set(self._shared_key(key), payload, self.ttl)
+
+    def _store(self, key, payload):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        shared = self._shared()
+        if shared is not None and keys:
+            shared.delete_many([self._shared_key(key) for key in keys])
+
+    def evict_user(self, user_id):
+        self.evict(*Token.objects.filter(user_id=user_id).values_list('key', flat=True))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+token_cache = TokenUserCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL,
+    alias=settings.TOKEN_CACHE_ALIAS,
+)
+
+class CachedTokenAuthentication(ProfileTokenAuthentication):
+    """
+    ``ProfileTokenAuthentication`` that skips loading the user and their
+    profiles while the token is in ``token_cache``. A hit is only trusted
+    after an indexed check that the token still exists and its user is
+    still active with the same role, so logout, deactivation and role
+    changes apply at once in every process, including changes made with
+    ``QuerySet.update()``. Entries are evicted when the token is deleted
+    and when the user or their profile changes; other profile edits made
+    in another process are bounded by ``TOKEN_CACHE_TTL``.
+    """
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is not None:
+            if Token.objects.filter(
+                key=key, user_id=user.pk, user__is_active=True, user__role=user.role
+            ).exists():
+                token = Token(key=key, user_id=user.pk)
+                token.user = user
+                return (user, token)
+            token_cache.evict(key)
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user)
+        return (user, token)
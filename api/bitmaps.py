@@ -0,0 +1,210 @@
+import datetime
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Attendance, AttendanceBitmap
+from .terms import as_date, term_bounds, term_for
+
+# 2-bit status codes: bit 0 in the ``low`` plane, bit 1 in the ``high`` plane.
+STATUS_CODES = {status: code for code, status in enumerate(Attendance.Status.values)}
+
+def _to_int(value):
+    return int.from_bytes(bytes(value or b''), 'little')
+
+def _to_bytes(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+def _day(date, term):
+    return (date - term_bounds(term)[0]).days
+
+def day_mask(first_day, last_day):
+    """Bits ``first_day`` to ``last_day`` inclusive."""
+    if last_day < first_day:
+        return 0
+    return ((1 << (last_day - first_day + 1)) - 1) << first_day
+
+def runs(mask):
+    """Yield ``(first_day, run_mask)`` for each run of consecutive set bits."""
+    while mask:
+        lowest = mask & -mask
+        run = ((mask + lowest) & ~mask) - lowest
+        yield lowest.bit_length() - 1, run
+        mask &= ~run
+
+def terms_between(start, end):
+    terms = []
+    while start <= end:
+        term = term_for(start)
+        terms.append(term)
+        start = term_bounds(term)[1] + datetime.timedelta(days=1)
+    return terms
+
+class TermBitmap:
+    """The bit planes of one ``AttendanceBitmap`` as Python integers."""
+    def __init__(self, recorded=0, low=0, high=0):
+        self.recorded, self.low, self.high = recorded, low, high
+
+    @classmethod
+    def from_row(cls, recorded, low, high):
+        return cls(_to_int(recorded), _to_int(low), _to_int(high))
+
+    def set(self, day, status):
+        bit = 1 << day
+        code = STATUS_CODES[status]
+        self.recorded |= bit
+        self.low = self.low | bit if code & 1 else self.low & ~bit
+        self.high = self.high | bit if code & 2 else self.high & ~bit
+
+    def clear(self, day):
+        bit = ~(1 << day)
+        self.recorded &= bit
+        self.low &= bit
+        self.high &= bit
+
+    def mask(self, status):
+        """Days recorded with ``status``."""
+        code = STATUS_CODES[status]
+        low = self.low if code & 1 else ~self.low
+        high = self.high if code & 2 else ~self.high
+        return self.recorded & low & high
+
+    def save_to(self, row):
+        row.recorded = _to_bytes(self.recorded)
+        row.low = _to_bytes(self.low)
+        row.high = _to_bytes(self.high)
+
+class AttendanceBitmapWriter:
+    """
+    Collects attendance days set or cleared and writes them to the bitmaps
+    with one read, one ``bulk_update`` and one ``bulk_create``.
+    """
+    def __init__(self):
+        self.changes = defaultdict(dict)
+
+    def set(self, student_id, class_id, date, status):
+        date = as_date(date)
+        term = term_for(date)
+        self.changes[(student_id, class_id, term)][_day(date, term)] = status
+
+    def clear(self, student_id, class_id, date):
+        date = as_date(date)
+        term = term_for(date)
+        self.changes[(student_id, class_id, term)][_day(date, term)] = None
+
+    def set_row(self, row):
+        self.set(row.student_id, row.class_session_id, row.date, row.status)
+
+    def apply(self):
+        if not self.changes:
+            return
+        grouped = defaultdict(list)
+        for student_id, class_id, term in self.changes:
+            grouped[(class_id, term)].append(student_id)
+        lookup = reduce(or_, (
+            Q(class_session_id=class_id, term=term, student_id__in=student_ids)
+            for (class_id, term), student_ids in grouped.items()
+        ))
+
+        with transaction.atomic():
+            existing = {
+                (row.student_id, row.class_session_id, row.term): row
+                for row in AttendanceBitmap.objects.select_for_update().filter(lookup)
+            }
+            to_update, to_create = [], []
+            for key, days in self.changes.items():
+                row = existing.get(key)
+                if row is None:
+                    if all(status is None for status in days.values()):
+                        continue
+                    student_id, class_id, term = key
+                    row = AttendanceBitmap(student_id=student_id, class_session_id=class_id, term=term)
+                    to_create.append(row)
+                else:
+                    to_update.append(row)
+                bitmap = TermBitmap.from_row(row.recorded, row.low, row.high)
+                for day, status in days.items():
+                    if status is None:
+                        bitmap.clear(day)
+                    else:
+                        bitmap.set(day, status)
+                bitmap.save_to(row)
+            AttendanceBitmap.objects.bulk_update(to_update, ['recorded', 'low', 'high'])
+            AttendanceBitmap.objects.bulk_create(to_create)
+
+def _iter_bitmaps(bitmaps, start, end):
+    """Yield ``(student_id, class_id, bitmap, window, term_start)`` for [start, end]."""
+    for term in terms_between(start, end):
+        term_start, term_end = term_bounds(term)
+        window = day_mask(
+            (max(start, term_start) - term_start).days,
+            (min(end, term_end) - term_start).days,
+        )
+        rows = bitmaps.filter(term=term).values_list(
+            'student_id', 'class_session_id', 'recorded', 'low', 'high'
+        )
+        for student_id, class_id, *planes in rows.iterator():
+            yield student_id, class_id, TermBitmap.from_row(*planes), window, term_start
+
+def status_day_counts(bitmaps, start, end, status=Attendance.Status.ABSENT):
+    """``{student_id: days}`` with ``status`` between ``start`` and ``end``, over all classes."""
+    counts = defaultdict(int)
+    for student_id, _, bitmap, window, _ in _iter_bitmaps(bitmaps, start, end):
+        counts[student_id] += (bitmap.mask(status) & window).bit_count()
+    return counts
+
+def absence_streaks(bitmaps, start, end, min_length=2, status=Attendance.Status.ABSENT):
+    """
+    Runs of at least ``min_length`` consecutive recorded days with
+    ``status`` per student and class; days without a record (weekends,
+    days the class does not meet) do not break a run. Runs are not joined
+    across terms.
+    """
+    streaks = []
+    for student_id, class_id, bitmap, window, term_start in _iter_bitmaps(bitmaps, start, end):
+        matching = bitmap.mask(status) & window
+        if matching.bit_count() < min_length:
+            continue
+        bridged = matching | (~bitmap.recorded & window)
+        for _, run in runs(bridged):
+            days = run & matching
+            length = days.bit_count()
+            if length >= min_length:
+                streaks.append({
+                    'student_id': student_id,
+                    'class_id': class_id,
+                    'days': length,
+                    'start': term_start + datetime.timedelta(days=(days & -days).bit_length() - 1),
+                    'end': term_start + datetime.timedelta(days=days.bit_length() - 1),
+                })
+    return streaks
+
+def rebuild_attendance_bitmaps(chunk_size=5000, apps=None, using=None):
+    """
+    Recompute every bitmap from the ``Attendance`` table, optionally with
+    the (historical) models of a migration's ``apps`` registry and database
+    alias.
+    """
+    attendance_model, bitmap_model = Attendance, AttendanceBitmap
+    if apps is not None:
+        attendance_model = apps.get_model(Attendance._meta.label)
+        bitmap_model = apps.get_model(AttendanceBitmap._meta.label)
+    planes = defaultdict(TermBitmap)
+    rows = attendance_model._default_manager.using(using).order_by().values_list(
+        'student_id', 'class_session_id', 'date', 'status'
+    )
+    for student_id, class_id, date, status in rows.iterator(chunk_size=chunk_size):
+        term = term_for(date)
+        planes[(student_id, class_id, term)].set(_day(date, term), status)
+    bitmaps = []
+    for (student_id, class_id, term), bitmap in planes.items():
+        row = bitmap_model(student_id=student_id, class_session_id=class_id, term=term)
+        bitmap.save_to(row)
+        bitmaps.append(row)
+    with transaction.atomic(using=using):
+        bitmap_model._default_manager.using(using).all().delete()
+        bitmap_model._default_manager.db_manager(using).bulk_create(bitmaps, batch_size=1000)
+    return len(bitmaps)
@@ -0,0 +1,110 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from .routers import read_lag
+
+def admin_key():
+    return 'dashboard:admin'
+
+def teacher_key(teacher_id):
+    return f'dashboard:teacher:{teacher_id}'
+
+def student_key(student_id):
+    return f'dashboard:student:{student_id}'
+
+class DashboardCache:
+    """
+    Role dashboard payloads kept in a Django cache as ``{'data',
+    'built_at'}`` entries, fresh for ``timeout`` seconds. Model signals
+    either adjust single counters in place (``adjust``) or invalidate whole
+    payloads (``invalidate``), which records the time under a marker key so
+    a payload built before the change is never taken as fresh, even when a
+    rebuild was already running.
+
+    With ``stale_while_revalidate`` on, invalidated and expired entries stay
+    readable for ``stale_ttl`` more seconds: readers get the old payload at
+    once while one background thread, guarded by a cache lock, rebuilds it.
+    Otherwise they are rebuilt before the response.
+    """
+    def __init__(self, alias, timeout, stale_while_revalidate=False, stale_ttl=3600):
+        self.alias = alias
+        self.timeout = timeout
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_ttl = stale_ttl
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _ttl(self):
+        return self.timeout + (self.stale_ttl if self.stale_while_revalidate else 0)
+
+    def _marker(self, key):
+        return f'{key}:invalidated'
+
+    def _build(self, key, build):
+        # Data read from a replica is as old as the replica's lag.
+        started = time.time() - read_lag()
+        data = build()
+        self.cache.set(key, {'data': data, 'built_at': started}, self._ttl())
+        return data
+
+    def get_or_build(self, key, build):
+        values = self.cache.get_many([key, self._marker(key)])
+        entry = values.get(key)
+        if entry is None:
+            return self._build(key, build)
+        built_at = entry['built_at']
+        if built_at > values.get(self._marker(key), 0) and time.time() - built_at < self.timeout:
+            return entry['data']
+        if self.stale_while_revalidate:
+            self._revalidate(key, build)
+            return entry['data']
+        return self._build(key, build)
+
+    def _revalidate(self, key, build):
+        lock_key = f'{key}:refreshing'
+        if not self.cache.add(lock_key, True, self.timeout):
+            return
+
+        def refresh():
+            try:
+                self._build(key, build)
+            finally:
+                self.cache.delete(lock_key)
+                connection.close()
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def adjust(self, key, field, delta):
+        """Add ``delta`` to a cached counter without rebuilding the payload."""
+        entry = self.cache.get(key)
+        if entry is None or field not in entry['data']:
+            return
+        entry['data'][field] += delta
+        remaining = self._ttl() - (time.time() - entry['built_at'])
+        if remaining > 0:
+            self.cache.set(key, entry, remaining)
+
+    def invalidate(self, *keys):
+        if keys:
+            now = time.time()
+            self.cache.set_many({self._marker(key): now for key in keys}, self._ttl())
+
+dashboard_cache = DashboardCache(
+    alias=settings.DASHBOARD_CACHE_ALIAS,
+    timeout=settings.DASHBOARD_CACHE_TIMEOUT,
+    stale_while_revalidate=settings.DASHBOARD_STALE_WHILE_REVALIDATE,
+    stale_ttl=settings.DASHBOARD_STALE_TTL,
+)
+
+def invalidate_dashboards(teacher_ids=(), student_ids=()):
+    dashboard_cache.invalidate(
+        *[teacher_key(teacher_id) for teacher_id in teacher_ids],
+        *[student_key(student_id) for student_id in student_ids],
+    )
+
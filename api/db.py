@@ -0,0 +1,39 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# One re-entrant lock per database alias, shared by the threads of a process.
+_write_locks = defaultdict(threading.RLock)
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply ``settings.SQLITE_PRAGMAS`` to every new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+@contextmanager
+def serialized_write(using=None):
+    """
+    ``transaction.atomic`` for request paths that write. On SQLite the
+    threads of a process first queue on a lock, so only one of them at a
+    time waits for the database write lock (taken at BEGIN by
+    ``transaction_mode = IMMEDIATE`` under the production profile) instead
+    of all of them retrying against ``busy_timeout``; other processes are
+    serialized by SQLite itself. Nested blocks reuse the lock and become
+    savepoints.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    if connections[using].vendor != 'sqlite':
+        with transaction.atomic(using=using):
+            yield
+        return
+    with _write_locks[using], transaction.atomic(using=using):
+        yield
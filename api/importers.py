@@ -0,0 +1,234 @@
+import csv
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework import serializers
+
+from .dashboard import admin_key, dashboard_cache
+from .db import serialized_write
+from .lookup import prefix_index
+from .models import User, Student, Teacher
+from .search import index_documents
+
+USER_FIELDS = ['email', 'first_name', 'last_name', 'phone_number', 'date_of_birth', 'address']
+
+class UserRowSerializer(serializers.Serializer):
+    username = serializers.CharField(max_length=150)
+    email = serializers.EmailField(required=False)
+    first_name = serializers.CharField(max_length=150, required=False)
+    last_name = serializers.CharField(max_length=150, required=False)
+    password = serializers.CharField(required=False)
+    phone_number = serializers.CharField(max_length=15, required=False)
+    date_of_birth = serializers.DateField(required=False)
+    address = serializers.CharField(required=False)
+    role = serializers.ChoiceField(choices=User.Roles.choices, required=False)
+
+class StudentRowSerializer(UserRowSerializer):
+    student_id = serializers.CharField(max_length=20)
+    grade_level = serializers.CharField(max_length=20)
+    enrollment_date = serializers.DateField(required=False)
+    parent_name = serializers.CharField(max_length=255, required=False)
+    parent_phone = serializers.CharField(max_length=15, required=False)
+    parent_email = serializers.EmailField(required=False)
+
+class TeacherRowSerializer(UserRowSerializer):
+    employee_id = serializers.CharField(max_length=20)
+    department = serializers.CharField(max_length=100)
+    hire_date = serializers.DateField(required=False)
+    qualification = serializers.CharField(max_length=255, required=False)
+    experience_years = serializers.IntegerField(min_value=0, required=False)
+
+# Columns never copied into error reports, matched as substrings of the lowercased name.
+CREDENTIAL_MARKERS = ('password', 'secret', 'token')
+
+# kind -> (row serializer, profile model, forced role, unique profile key)
+IMPORT_KINDS = {
+    'user': (UserRowSerializer, None, None, None),
+    'student': (StudentRowSerializer, Student, User.Roles.STUDENT, 'student_id'),
+    'teacher': (TeacherRowSerializer, Teacher, User.Roles.TEACHER, 'employee_id'),
+}
+
+def iter_rows(stream, fmt):
+    """
+    Yield ``(line_number, row_dict)`` from a text stream of CSV (with a
+    header row) or JSON Lines without reading it all into memory.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                row = {'__error__': f'Invalid JSON: {exc}'}
+            yield line_number, row if isinstance(row, dict) else {'__error__': 'Expected a JSON object'}
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+def detect_format(name):
+    return 'jsonl' if name.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+class BulkUserImporter:
+    """
+    Creates users and their Student/Teacher profiles from an iterable of
+    rows, ``chunk_size`` rows at a time. Each chunk is validated with one
+    uniqueness query per key, passwords are hashed on a thread pool
+    (PBKDF2 releases the GIL), and users and profiles are written with
+    ``bulk_create`` in one transaction. After every committed chunk the
+    last line number is written to ``checkpoint_path`` so a rerun resumes
+    there; rejected rows, minus any credential columns, are appended to
+    ``error_path`` as JSON Lines.
+    Password strength validators are not run on imported passwords.
+    """
+    def __init__(self, kind, chunk_size=1000, workers=4, checkpoint_path=None,
+                 error_path=None, max_reported_errors=100):
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unknown import kind: {kind}")
+        self.kind = kind
+        self.row_serializer, self.profile_model, self.role, self.profile_key = IMPORT_KINDS[kind]
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path
+        self.error_path = error_path
+        self.max_reported_errors = max_reported_errors
+        self.created = 0
+        self.failed = 0
+        self.skipped = 0
+        self.errors = []
+
+    def read_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path) as fh:
+            return json.load(fh).get('line', 0)
+
+    def write_checkpoint(self, line_number):
+        if not self.checkpoint_path:
+            return
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump({'kind': self.kind, 'line': line_number}, fh)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def run(self, rows):
+        resume_after = self.read_checkpoint()
+        error_file = open(self.error_path, 'a') if self.error_path else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                rows = iter(rows)
+                while True:
+                    chunk = list(islice(rows, self.chunk_size))
+                    if not chunk:
+                        break
+                    pending = [(line, row) for line, row in chunk if line > resume_after]
+                    self.skipped += len(chunk) - len(pending)
+                    if pending:
+                        self._import_chunk(pending, pool, error_file)
+                        self.write_checkpoint(chunk[-1][0])
+        finally:
+            if error_file is not None:
+                error_file.close()
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'errors': self.errors,
+        }
+
+    def _reject(self, line_number, errors, row, error_file):
+        self.failed += 1
+        row = {
+            key: value for key, value in row.items()
+            if not any(marker in str(key).lower() for marker in CREDENTIAL_MARKERS)
+        }
+        entry = {'line': line_number, 'errors': errors, 'row': row}
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append(entry)
+        if error_file is not None:
+            error_file.write(json.dumps(entry, default=str) + '\n')
+
+    def _import_chunk(self, chunk, pool, error_file):
+        valid = []
+        for line_number, row in chunk:
+            if '__error__' in row:
+                self._reject(line_number, {'row': [row['__error__']]}, row, error_file)
+                continue
+            data = {key: value for key, value in row.items() if value not in ('', None)}
+            serializer = self.row_serializer(data=data)
+            if serializer.is_valid():
+                valid.append((line_number, row, serializer.validated_data))
+            else:
+                self._reject(line_number, serializer.errors, row, error_file)
+
+        taken_usernames = set(User.objects.filter(
+            username__in=[data['username'] for _, _, data in valid]
+        ).values_list('username', flat=True))
+        taken_keys = set()
+        if self.profile_model is not None:
+            taken_keys = set(self.profile_model.objects.filter(**{
+                f'{self.profile_key}__in': [data[self.profile_key] for _, _, data in valid]
+            }).values_list(self.profile_key, flat=True))
+
+        accepted = []
+        for line_number, row, data in valid:
+            if data['username'] in taken_usernames:
+                self._reject(line_number, {'username': ['A user with that username already exists.']}, row, error_file)
+                continue
+            if self.profile_key and data[self.profile_key] in taken_keys:
+                self._reject(line_number, {self.profile_key: ['This value is already in use.']}, row, error_file)
+                continue
+            taken_usernames.add(data['username'])
+            if self.profile_key:
+                taken_keys.add(data[self.profile_key])
+            accepted.append(data)
+
+        if not accepted:
+            return
+        hashes = list(pool.map(make_password, [data.get('password') for data in accepted]))
+
+        users = [
+            User(
+                username=data['username'],
+                password=password_hash,
+                role=self.role or data.get('role', User.Roles.STUDENT),
+                **{field: data[field] for field in USER_FIELDS if field in data},
+            )
+            for data, password_hash in zip(accepted, hashes)
+        ]
+        with serialized_write():
+            User.objects.bulk_create(users)
+            if self.profile_model is not None:
+                profile_fields = [
+                    field.name for field in self.profile_model._meta.concrete_fields
+                    if field.name not in ('id', 'user')
+                ]
+                profiles = self.profile_model.objects.bulk_create([
+                    self.profile_model(
+                        user_id=user.pk,
+                        **{field: data[field] for field in profile_fields if field in data},
+                    )
+                    for user, data in zip(users, accepted)
+                ])
+                index_documents(self.kind, [profile.pk for profile in profiles])
+            # bulk_create sends no post_save, so the search index is written here.
+            index_documents('user', [user.pk for user in users])
+        # The admin dashboard counters missed these rows for the same reason.
+        dashboard_cache.invalidate(admin_key())
+        if self.profile_model is not None:
+            transaction.on_commit(partial(
+                prefix_index.refresh, self.kind, pk__in=[profile.pk for profile in profiles]
+            ))
+        self.created += len(users)
+
+def open_text(binary_stream, encoding='utf-8'):
+    return io.TextIOWrapper(binary_stream, encoding=encoding, newline='')
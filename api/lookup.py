@@ -0,0 +1,138 @@
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .models import Student, Teacher
+
+# Entry ids pack the kind into the lowest bit: pk * 2 + code.
+LOOKUP_KINDS = {'student': (0, Student, 'student_id'), 'teacher': (1, Teacher, 'employee_id')}
+KIND_NAMES = {code: kind for kind, (code, _, _) in LOOKUP_KINDS.items()}
+
+def normalize(text):
+    """Casefolded words of ``text`` with accents removed."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r'\w+', text.casefold())
+
+def _entry(first_name, last_name, number):
+    label = f'{first_name} {last_name}'.strip()
+    tokens = {*normalize(first_name), *normalize(last_name), *normalize(number)}
+    # The whole number too, so "2024-001" also matches "2024001".
+    tokens.add(''.join(normalize(number)))
+    tokens.discard('')
+    return f'{label} ({number})' if label else number, tuple(sorted(tokens))
+
+class PrefixIndex:
+    """
+    Type-ahead index of student and teacher names and numbers held in
+    memory: the words of every entry in a sorted list with the entry ids
+    in a parallel ``array``, so a prefix is one ``bisect`` range. Loaded
+    with one query per kind on first use and again after ``ttl`` seconds
+    (changes made by other processes); signals keep it current in between
+    through ``refresh``/``remove``.
+    """
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._tokens = None
+        self._ids = None
+        self._entries = {}
+        self._expires = 0
+        self._lock = threading.Lock()
+
+    def _rows(self, model, number_field, **lookup):
+        rows = model.objects.filter(**lookup).values_list(
+            'pk', 'user__first_name', 'user__last_name', number_field
+        )
+        return rows.iterator()
+
+    def _load(self):
+        keys, entries = [], {}
+        for code, model, number_field in LOOKUP_KINDS.values():
+            for pk, first_name, last_name, number in self._rows(model, number_field):
+                entry_id = pk * 2 + code
+                entries[entry_id] = _entry(first_name, last_name, number)
+                keys.extend((token, entry_id) for token in entries[entry_id][1])
+        keys.sort()
+        self._tokens = [token for token, _ in keys]
+        self._ids = array('q', (entry_id for _, entry_id in keys))
+        self._entries = entries
+        self._expires = time.monotonic() + self.ttl
+
+    def _ensure_loaded(self):
+        if self._tokens is None or time.monotonic() >= self._expires:
+            self._load()
+
+    def _discard(self, entry_id):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            position = bisect_left(self._tokens, token)
+            while position < len(self._tokens) and self._tokens[position] == token:
+                if self._ids[position] == entry_id:
+                    del self._tokens[position]
+                    del self._ids[position]
+                    break
+                position += 1
+
+    def refresh(self, kind, **lookup):
+        """Reload the ``kind`` entries matching ``lookup``, if the index is loaded."""
+        if self._tokens is None:
+            return
+        code, model, number_field = LOOKUP_KINDS[kind]
+        rows = list(self._rows(model, number_field, **lookup))
+        with self._lock:
+            if self._tokens is None:
+                return
+            for pk, first_name, last_name, number in rows:
+                entry_id = pk * 2 + code
+                self._discard(entry_id)
+                self._entries[entry_id] = entry = _entry(first_name, last_name, number)
+                for token in entry[1]:
+                    position = bisect_left(self._tokens, token)
+                    self._tokens.insert(position, token)
+                    self._ids.insert(position, entry_id)
+
+    def remove(self, kind, pk):
+        with self._lock:
+            if self._tokens is not None:
+                self._discard(pk * 2 + LOOKUP_KINDS[kind][0])
+
+    def invalidate(self):
+        with self._lock:
+            self._tokens = None
+
+    def lookup(self, query, limit=10, kinds=None):
+        """
+        Up to ``limit`` ``(kind, pk, label)`` entries having, for every
+        word of ``query``, a word starting with it; ordered by the word
+        matching the longest query word.
+        """
+        words = sorted(set(normalize(query)), key=len, reverse=True)
+        if not words:
+            return []
+        codes = {LOOKUP_KINDS[kind][0] for kind in kinds or LOOKUP_KINDS}
+        first, rest = words[0], words[1:]
+        results, seen = [], set()
+        with self._lock:
+            self._ensure_loaded()
+            position = bisect_left(self._tokens, first)
+            while position < len(self._tokens) and len(results) < limit:
+                if not self._tokens[position].startswith(first):
+                    break
+                entry_id = self._ids[position]
+                position += 1
+                if entry_id in seen or (entry_id & 1) not in codes:
+                    continue
+                seen.add(entry_id)
+                label, tokens = self._entries[entry_id]
+                if all(any(token.startswith(word) for token in tokens) for word in rest):
+                    results.append((KIND_NAMES[entry_id & 1], entry_id >> 1, label))
+        return results
+
+prefix_index = PrefixIndex(ttl=settings.LOOKUP_INDEX_TTL)
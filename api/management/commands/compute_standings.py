@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.analytics import compute_term_standings
+from api.terms import term_bounds, term_for
+
+
+class Command(BaseCommand):
+    help = 'Recompute the cached GPA and rank standings for one or more terms.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'terms', nargs='*',
+            help='Terms such as 2025-T1 (default: the current term).',
+        )
+
+    def handle(self, *args, **options):
+        terms = options['terms'] or [term_for(timezone.localdate())]
+        for term in terms:
+            try:
+                term_bounds(term)
+            except ValueError:
+                raise CommandError(f'Invalid term: {term}')
+            standings = compute_term_standings(term)
+            self.stdout.write(
+                f'{term}: {standings.students.count()} student and '
+                f'{standings.classes.count()} class standing(s).'
+            )
+        self.stdout.write(self.style.SUCCESS('Standings recomputed.'))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.risk import RiskScorer, students_to_rescore
+
+
+class Command(BaseCommand):
+    help = (
+        'Score students for risk from attendance, late and missing submissions and grade trend. '
+        'By default only students whose data changed since their last score are rescored.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rescore every student.')
+        parser.add_argument('--chunk-size', type=int, default=900)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        now = timezone.now()
+        scorer = RiskScorer(now=now, chunk_size=options['chunk_size'])
+        if options['full']:
+            scored = scorer.run()
+        else:
+            scored = scorer.run(students_to_rescore(now))
+        self.stdout.write(self.style.SUCCESS(
+            f'Scored {scored} student(s) in {time.monotonic() - started:.2f}s.'
+        ))
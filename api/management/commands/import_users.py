@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importers import IMPORT_KINDS, BulkUserImporter, detect_format, iter_rows
+
+
+class Command(BaseCommand):
+    help = 'Stream users with their student or teacher profiles from a CSV or JSON Lines file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with header) or JSON Lines file to import.')
+        parser.add_argument('--kind', choices=sorted(IMPORT_KINDS), default='student')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=4, help='Password hashing threads.')
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file; defaults to <path>.checkpoint. Rerunning resumes after it.',
+        )
+        parser.add_argument('--errors', help='Error report file; defaults to <path>.errors.jsonl.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        importer = BulkUserImporter(
+            options['kind'],
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            checkpoint_path=options['checkpoint'] or f'{path}.checkpoint',
+            error_path=options['errors'] or f'{path}.errors.jsonl',
+        )
+        try:
+            with open(path, newline='', encoding='utf-8') as stream:
+                summary = importer.run(iter_rows(stream, fmt))
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {summary['created']}, rejected {summary['failed']}, "
+            f"skipped {summary['skipped']} already imported row(s)."
+        ))
+        if summary['failed']:
+            self.stdout.write(f'Rejected rows were written to {importer.error_path}.')
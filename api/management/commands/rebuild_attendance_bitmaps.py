@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.bitmaps import rebuild_attendance_bitmaps
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-term attendance bitmaps from the attendance table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        bitmaps = rebuild_attendance_bitmaps(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {bitmaps} attendance bitmap(s).'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.rollups import rebuild_attendance_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-student and per-class attendance rollups from the attendance table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        students, classes = rebuild_attendance_rollups(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {students} student and {classes} class attendance rollup(s).'
+        ))
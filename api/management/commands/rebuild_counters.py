@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from api.models import Assignment, Class
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored enrollment and submission counters and report any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drift without rewriting the counters.',
+        )
+
+    def handle(self, *args, **options):
+        drifted_classes = Class.objects.with_student_count().exclude(
+            student_count=F('actual_student_count')
+        ).values_list('pk', 'name', 'student_count', 'actual_student_count')
+        class_drift = 0
+        for pk, name, stored, actual in drifted_classes.iterator():
+            class_drift += 1
+            self.stdout.write(f'Class {pk} ({name}): student_count {stored} -> {actual}')
+
+        drifted_assignments = Assignment.objects.with_submission_count().filter(
+            ~Q(submission_count=F('actual_submission_count'))
+            | ~Q(late_submission_count=F('actual_late_submission_count'))
+        ).values_list(
+            'pk', 'title', 'submission_count', 'actual_submission_count',
+            'late_submission_count', 'actual_late_submission_count',
+        )
+        assignment_drift = 0
+        for pk, title, stored, actual, stored_late, actual_late in drifted_assignments.iterator():
+            assignment_drift += 1
+            self.stdout.write(
+                f'Assignment {pk} ({title}): submission_count {stored} -> {actual}, '
+                f'late_submission_count {stored_late} -> {actual_late}'
+            )
+
+        summary = f'{class_drift} class(es) and {assignment_drift} assignment(s) drifted'
+        if options['dry_run']:
+            self.stdout.write(f'{summary}; no changes made (dry run).')
+            return
+
+        with transaction.atomic():
+            classes = Class.objects.refresh_student_count()
+            assignments = Assignment.objects.refresh_submission_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f'{summary}; rebuilt counters for {classes} class(es) and {assignments} assignment(s).'
+        ))
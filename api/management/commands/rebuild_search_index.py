@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text search index of users, students, teachers, classes and assignments.'
+
+    def handle(self, *args, **options):
+        documents = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {documents} document(s).'))
@@ -0,0 +1,45 @@
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.snapshots import DATASETS, SnapshotWriter
+
+
+class Command(BaseCommand):
+    help = (
+        'Append grade and attendance rows created since the last snapshot to a columnar, '
+        'memory-mappable snapshot partitioned by term and subject.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=settings.ANALYTICS_SNAPSHOT_DIR,
+            help='Snapshot directory (default: ANALYTICS_SNAPSHOT_DIR).',
+        )
+        parser.add_argument(
+            '--dataset', action='append', choices=sorted(DATASETS),
+            help='Only snapshot this dataset; may be repeated.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Discard the existing snapshot and rewrite it, picking up edited rows.',
+        )
+
+    def handle(self, *args, **options):
+        root = options['output']
+        names = options['dataset'] or list(DATASETS)
+        writer = SnapshotWriter(root, chunk_size=options['chunk_size'])
+        if options['full']:
+            watermark = writer.read_watermark()
+            for name in names:
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+                watermark.pop(name, None)
+            writer.write_watermark(watermark)
+
+        written = writer.run(names)
+        for name in names:
+            self.stdout.write(f'{name}: appended {written[name]} row(s).')
+        self.stdout.write(self.style.SUCCESS(f'Snapshot written to {root}.'))
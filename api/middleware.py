@@ -0,0 +1,18 @@
+from .routers import pin_to_primary, request_routing
+
+class ReplicaPinningMiddleware:
+    """
+    Tracks the database routing of each request and, after a request that
+    wrote, keeps the user's reads on the primary for ``REPLICA_MAX_LAG``
+    seconds so they read their own writes.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_routing() as state:
+            response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if state.wrote and user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
+        return response
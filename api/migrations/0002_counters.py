@@ -0,0 +1,273 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:30
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Subject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('code', models.CharField(max_length=10, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('credits', models.IntegerField(default=1, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)])),
+            ],
+        ),
+        migrations.AlterModelOptions(
+            name='class',
+            options={'verbose_name_plural': 'Classes'},
+        ),
+        migrations.RemoveField(
+            model_name='student',
+            name='email',
+        ),
+        migrations.RemoveField(
+            model_name='student',
+            name='name',
+        ),
+        migrations.RemoveField(
+            model_name='teacher',
+            name='email',
+        ),
+        migrations.RemoveField(
+            model_name='teacher',
+            name='name',
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='max_capacity',
+            field=models.IntegerField(default=30, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='room_number',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='schedule_days',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='schedule_time',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='student_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='students',
+            field=models.ManyToManyField(blank=True, related_name='classes', to='api.student'),
+        ),
+        migrations.AddField(
+            model_name='permission',
+            name='description',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='role',
+            name='description',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='enrollment_date',
+            field=models.DateField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='grade_level',
+            field=models.CharField(default='', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='parent_email',
+            field=models.EmailField(blank=True, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='parent_name',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='parent_phone',
+            field=models.CharField(blank=True, max_length=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='student_id',
+            field=models.CharField(default='', max_length=20, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='user',
+            field=models.OneToOneField(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='student_profile', to=settings.AUTH_USER_MODEL),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='department',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='employee_id',
+            field=models.CharField(default='', max_length=20, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='experience_years',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='hire_date',
+            field=models.DateField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='qualification',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='user',
+            field=models.OneToOneField(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='teacher_profile', to=settings.AUTH_USER_MODEL),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='address',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='date_of_birth',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='phone_number',
+            field=models.CharField(blank=True, max_length=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, upload_to='profiles/'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='class',
+            name='teacher',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='classes', to='api.teacher'),
+        ),
+        migrations.AlterField(
+            model_name='role',
+            name='permissions',
+            field=models.ManyToManyField(blank=True, to='api.permission'),
+        ),
+        migrations.CreateModel(
+            name='Assignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('due_date', models.DateTimeField()),
+                ('max_points', models.DecimalField(decimal_places=2, default=100, max_digits=5)),
+                ('status', models.CharField(choices=[('D', 'Draft'), ('P', 'Published'), ('C', 'Closed')], default='D', max_length=1)),
+                ('submission_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('late_submission_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('class_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='api.class')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.teacher')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Grade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assignment_name', models.CharField(max_length=255)),
+                ('grade', models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('max_grade', models.DecimalField(decimal_places=2, default=100, max_digits=5)),
+                ('date_assigned', models.DateField()),
+                ('date_submitted', models.DateField(blank=True, null=True)),
+                ('comments', models.TextField(blank=True, null=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grades', to='api.student')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.teacher')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.subject')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='subject',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, to='api.subject'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='subjects',
+            field=models.ManyToManyField(blank=True, to='api.subject'),
+        ),
+        migrations.CreateModel(
+            name='Attendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(default=django.utils.timezone.now)),
+                ('status', models.CharField(choices=[('P', 'Present'), ('A', 'Absent'), ('L', 'Late'), ('E', 'Excused')], default='P', max_length=1)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('class_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendances', to='api.class')),
+                ('marked_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marked_attendances', to=settings.AUTH_USER_MODEL)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendances', to='api.student')),
+            ],
+            options={
+                'unique_together': {('student', 'class_session', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Submission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.TextField()),
+                ('file_attachment', models.FileField(blank=True, null=True, upload_to='submissions/')),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('is_late', models.BooleanField(default=False)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='api.assignment')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='api.student')),
+            ],
+            options={
+                'unique_together': {('assignment', 'student')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='access_role',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='api.role'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_user_access_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassAttendanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_kind', models.CharField(choices=[('A', 'All time'), ('T', 'Term'), ('D', 'Day')], max_length=1)),
+                ('period', models.CharField(max_length=10)),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('class_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='api.class')),
+            ],
+            options={
+                'unique_together': {('class_session', 'period_kind', 'period')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentAttendanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_kind', models.CharField(choices=[('A', 'All time'), ('T', 'Term'), ('D', 'Day')], max_length=1)),
+                ('period', models.CharField(max_length=10)),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('class_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_attendance_rollups', to='api.class')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='api.student')),
+            ],
+            options={
+                'unique_together': {('student', 'class_session', 'period_kind', 'period')},
+            },
+        ),
+    ]
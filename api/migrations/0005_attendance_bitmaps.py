@@ -0,0 +1,29 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_attendance_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=10)),
+                ('recorded', models.BinaryField(default=b'')),
+                ('low', models.BinaryField(default=b'')),
+                ('high', models.BinaryField(default=b'')),
+                ('class_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='api.class')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='api.student')),
+            ],
+            options={
+                'unique_together': {('student', 'class_session', 'term')},
+            },
+        ),
+    ]
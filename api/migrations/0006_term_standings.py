@@ -0,0 +1,57 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_attendance_bitmaps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermStandings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=10, unique=True)),
+                ('is_stale', models.BooleanField(default=False)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Term standings',
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade_level', models.CharField(max_length=20)),
+                ('gpa', models.DecimalField(decimal_places=2, max_digits=3)),
+                ('credits', models.PositiveIntegerField()),
+                ('grade_level_rank', models.PositiveIntegerField()),
+                ('grade_level_size', models.PositiveIntegerField()),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='api.student')),
+                ('standings', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='students', to='api.termstandings')),
+            ],
+            options={
+                'unique_together': {('standings', 'student')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('average', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('rank', models.PositiveIntegerField()),
+                ('size', models.PositiveIntegerField()),
+                ('class_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='api.class')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_standings', to='api.student')),
+                ('standings', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='classes', to='api.termstandings')),
+            ],
+            options={
+                'unique_together': {('standings', 'class_session', 'student')},
+            },
+        ),
+    ]
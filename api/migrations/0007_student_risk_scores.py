@@ -0,0 +1,30 @@
+# Generated by Django 5.2.2 on 2026-10-16 22:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_term_standings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentRiskScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('level', models.CharField(choices=[('L', 'Low'), ('M', 'Medium'), ('H', 'High')], max_length=1)),
+                ('attendance_rate', models.DecimalField(decimal_places=2, max_digits=5, null=True)),
+                ('late_ratio', models.DecimalField(decimal_places=4, max_digits=5, null=True)),
+                ('missing_submissions', models.PositiveIntegerField(default=0)),
+                ('assigned_submissions', models.PositiveIntegerField(default=0)),
+                ('grade_trend', models.DecimalField(decimal_places=2, max_digits=6, null=True)),
+                ('is_stale', models.BooleanField(default=False)),
+                ('computed_at', models.DateTimeField()),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='risk_score', to='api.student')),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from api.search import rebuild_search_index
+
+
+def backfill_search_index(apps, schema_editor):
+    # 0010 created the index empty: add the rows that existed before it.
+    rebuild_search_index(apps=apps, using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
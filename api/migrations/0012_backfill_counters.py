@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from api.models import AssignmentQuerySet, ClassQuerySet
+
+
+def backfill_counters(apps, schema_editor):
+    # 0002 added the counters as zero: count the rows that existed before them.
+    alias = schema_editor.connection.alias
+    ClassQuerySet(apps.get_model('api', 'Class'), using=alias).refresh_student_count()
+    AssignmentQuerySet(apps.get_model('api', 'Assignment'), using=alias).refresh_submission_counts()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_backfill_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from api.rollups import rebuild_attendance_rollups
+
+
+def backfill_attendance_rollups(apps, schema_editor):
+    # 0004 created the rollup tables empty: count the attendance recorded before them.
+    rebuild_attendance_rollups(apps=apps, using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_backfill_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_attendance_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from api.bitmaps import rebuild_attendance_bitmaps
+
+
+def backfill_attendance_bitmaps(apps, schema_editor):
+    # 0005 created the bitmap table empty: set the days recorded before it.
+    rebuild_attendance_bitmaps(apps=apps, using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_backfill_attendance_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_attendance_bitmaps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,325 @@
+import csv
+import hashlib
+import json
+from calendar import timegm
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Prefetch, Sum
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .authentication import get_request_profile
+from .db import serialized_write
+from .models import User
+from .routers import choose_replica, current_routing
+from .serializers import parse_expand
+
+# Columns read by model methods commonly used as serializer sources.
+METHOD_COLUMNS = {
+    (User, 'get_full_name'): ('first_name', 'last_name'),
+}
+
+
+class QuerySelection:
+    """
+    The ``select_related``/``prefetch_related``/``only`` arguments needed to
+    render one serializer against one model.
+    """
+    def __init__(self):
+        self.select_related = set()
+        self.prefetch_related = {}
+        self.only = set()
+
+    def add_all_columns(self, model, prefix):
+        self.only.update(prefix + field.name for field in model._meta.concrete_fields)
+
+    def apply(self, queryset, restrict_columns=True):
+        # A bare select_related() would follow every non-null foreign key.
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        queryset = queryset.prefetch_related(*self.prefetch_related.values())
+        if restrict_columns:
+            queryset = queryset.only(*sorted(self.only))
+        return queryset
+
+
+def _add_prefetch(selection, lookup, serializer, model, extra_only=()):
+    child = build_selection(serializer, model)
+    child.only.update(extra_only)
+    selection.prefetch_related[lookup] = Prefetch(
+        lookup, queryset=child.apply(model._default_manager.all())
+    )
+
+
+def build_selection(serializer, model, prefix='', selection=None):
+    """
+    Walk the (already expanded and trimmed) fields of ``serializer`` and
+    record which columns and relations of ``model`` they read. Sources that
+    are not model fields (methods, properties, ``source='*'``) load every
+    column of the model they hang off, unless listed in ``METHOD_COLUMNS``.
+    """
+    if selection is None:
+        selection = QuerySelection()
+    selection.only.add(prefix + model._meta.pk.name)
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            selection.add_all_columns(model, prefix)
+            continue
+
+        current, path = model, prefix
+        attrs = field.source_attrs
+        for index, attr in enumerate(attrs):
+            is_last = index == len(attrs) - 1
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                columns = METHOD_COLUMNS.get((current, attr))
+                if columns is None:
+                    selection.add_all_columns(current, path)
+                else:
+                    selection.only.update(path + column for column in columns)
+                break
+
+            if not model_field.is_relation:
+                selection.only.add(path + attr)
+                break
+
+            if model_field.many_to_many or model_field.one_to_many:
+                if is_last and isinstance(field, serializers.ListSerializer):
+                    extra_only = [model_field.field.name] if model_field.one_to_many else []
+                    _add_prefetch(
+                        selection, path + attr, field.child,
+                        model_field.related_model, extra_only,
+                    )
+                else:
+                    selection.add_all_columns(current, path)
+                break
+
+            if model_field.concrete:
+                selection.only.add(path + attr)
+            if is_last and not isinstance(field, serializers.BaseSerializer):
+                break
+            selection.select_related.add(path + attr)
+            current, path = model_field.related_model, f'{path}{attr}__'
+            if is_last:
+                build_selection(field, current, path, selection)
+
+    return selection
+
+
+class SelectiveQuerysetMixin:
+    """
+    Derives ``select_related``/``prefetch_related``/``only`` for the view's
+    queryset from the serializer fields left after ``?fields=`` and
+    ``?expand=`` are applied, so only what is rendered is fetched. Columns
+    the view orders or paginates on are always loaded, and column
+    restriction is skipped on writes so saves never touch deferred fields.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        selection = build_selection(self.get_serializer(), queryset.model)
+        ordering = [*getattr(self, 'ordering_fields', ()), *getattr(self, 'keyset_ordering', ())]
+        selection.only.update(field.lstrip('-') for field in ordering)
+        queryset = queryset.select_related(None).prefetch_related(None)
+        return selection.apply(
+            queryset, restrict_columns=self.request.method in SAFE_METHODS
+        )
+
+
+class RoleScopedQuerysetMixin:
+    """
+    Limits students and teachers to the rows reachable from their own
+    profile through ``student_lookup``/``teacher_lookup``; a role without a
+    lookup is not restricted, and a user missing their profile sees nothing.
+    ``scope_queryset`` applies the same rules to other models sharing the
+    lookups.
+    The profile comes from ``get_request_profile`` and costs no queries
+    when the user was loaded by ``ProfileTokenAuthentication``.
+    """
+    student_lookup = None
+    teacher_lookup = None
+
+    def get_role_profile(self):
+        return get_request_profile(self.request)
+
+    def scope_for_student(self, queryset, student):
+        return queryset.filter(**{self.student_lookup: student.pk})
+
+    def scope_for_teacher(self, queryset, teacher):
+        return queryset.filter(**{self.teacher_lookup: teacher.pk})
+
+    def get_queryset(self):
+        return self.scope_queryset(super().get_queryset())
+
+    def scope_queryset(self, queryset):
+        role = self.request.user.role
+        if role == User.Roles.STUDENT and self.student_lookup:
+            student = self.get_role_profile()
+            if student is None:
+                return queryset.none()
+            return self.scope_for_student(queryset, student)
+        if role == User.Roles.TEACHER and self.teacher_lookup:
+            teacher = self.get_role_profile()
+            if teacher is None:
+                return queryset.none()
+            return self.scope_for_teacher(queryset, teacher)
+        return queryset
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value, for csv.writer."""
+    def write(self, value):
+        return value
+
+
+class StreamingExportMixin:
+    """
+    Adds ``GET <list>/export/?export_format=csv|jsonl`` streaming every row
+    the caller may see (same scoping and filters as the list) as a flat
+    ``values()`` projection of ``export_fields``, read with
+    ``iterator(chunk_size=export_chunk_size)`` so memory stays constant.
+    """
+    export_fields = ()
+    export_chunk_size = 2000
+    export_formats = ('csv', 'jsonl')
+
+    def get_export_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset.prefetch_related(None).order_by('pk').values_list(*self.export_fields)
+
+    def _csv_lines(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(self.export_fields)
+        for row in rows:
+            yield writer.writerow(row)
+
+    def _jsonl_lines(self, rows):
+        for row in rows:
+            yield json.dumps(dict(zip(self.export_fields, row)), cls=DjangoJSONEncoder) + '\n'
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in self.export_formats:
+            return Response(
+                {'error': f'export_format must be one of {", ".join(self.export_formats)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = self.get_export_queryset().iterator(chunk_size=self.export_chunk_size)
+        if export_format == 'csv':
+            lines, content_type = self._csv_lines(rows), 'text/csv'
+        else:
+            lines, content_type = self._jsonl_lines(rows), 'application/x-ndjson'
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        filename = f'{self.basename}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified validators for ``list`` and ``retrieve`` from one
+    aggregate over the filtered queryset: the latest of
+    ``last_modified_fields`` (the model's and rendered relations'
+    ``updated_at``), the sum of ``etag_counter_fields`` (counters kept up
+    to date with SQL updates) and the row count, which catches deletes.
+    Requests matching the client's validators get a 304 without the body
+    being built. Lists carry only the ETag: their latest ``updated_at``
+    does not move when a row is deleted, so Last-Modified would let a
+    stale copy through. ``?expand=`` responses are validated the same way
+    when every expanded relation has its ``updated_at`` among
+    ``last_modified_fields``; otherwise they are always rendered.
+    """
+    last_modified_fields = ('updated_at',)
+    etag_counter_fields = ()
+
+    def get_validators(self, queryset):
+        aggregates = {f'modified_{index}': Max(field) for index, field in enumerate(self.last_modified_fields)}
+        aggregates.update({f'counter_{index}': Sum(field) for index, field in enumerate(self.etag_counter_fields)})
+        values = queryset.order_by().aggregate(rows=Count('pk', distinct=True), **aggregates)
+        timestamps = [
+            value for key, value in values.items() if key.startswith('modified_') and value is not None
+        ]
+        last_modified = timegm(max(timestamps).utctimetuple()) if timestamps else None
+        fingerprint = json.dumps(
+            [self.request.get_full_path(), self.request.user.pk, sorted(values.items())],
+            cls=DjangoJSONEncoder,
+        )
+        return quote_etag(hashlib.sha1(fingerprint.encode()).hexdigest()), last_modified
+
+    def _expands_unversioned(self):
+        versioned = {field.rsplit('__', 1)[0] for field in self.last_modified_fields}
+        return any(
+            path.replace('.', '__') not in versioned
+            for path in parse_expand(self.get_serializer_context())
+        )
+
+    def _conditional(self, request, queryset, render, use_last_modified=True):
+        if self._expands_unversioned():
+            return render()
+        etag, last_modified = self.get_validators(queryset)
+        if not use_last_modified:
+            last_modified = None
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional(request, queryset, lambda: super(ConditionalGetMixin, self).list(
+            request, *args, **kwargs
+        ), use_last_modified=False)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return self._conditional(request, queryset, lambda: super(ConditionalGetMixin, self).retrieve(
+            request, *args, **kwargs
+        ))
+
+
+class SerializedWriteMixin:
+    """Runs ``create``, ``update`` and ``destroy`` inside ``serialized_write``."""
+    def create(self, request, *args, **kwargs):
+        with serialized_write():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with serialized_write():
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with serialized_write():
+            return super().destroy(request, *args, **kwargs)
+
+
+class ReplicaReadMixin:
+    """
+    Serves safe-method requests from a read replica picked by
+    ``api.routers.choose_replica``: none while the user's last write may
+    not have replicated yet. A request that writes reads from the primary
+    from then on.
+    """
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        state = current_routing()
+        if state is not None and request.method in SAFE_METHODS and not state.wrote:
+            state.replica = choose_replica(request.user.pk)
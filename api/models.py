@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -10,6 +11,9 @@ class User(AbstractUser):
         STUDENT = 3, 'Student'
 
     role = models.IntegerField(choices=Roles.choices, default=Roles.STUDENT)
+    access_role = models.ForeignKey(
+        'Role', on_delete=models.SET_NULL, blank=True, null=True, related_name='users'
+    )
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     date_of_birth = models.DateField(blank=True, null=True)
     address = models.TextField(blank=True, null=True)
@@ -41,6 +45,7 @@ class Subject(models.Model):
     code = models.CharField(max_length=10, unique=True)
     description = models.TextField(blank=True, null=True)
     credits = models.IntegerField(default=1, validators=[MinValueValidator(1), MaxValueValidator(10)])
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.code} - {self.name}"
@@ -53,10 +58,17 @@ class Student(models.Model):
     parent_name = models.CharField(max_length=255, blank=True, null=True)
     parent_phone = models.CharField(max_length=15, blank=True, null=True)
     parent_email = models.EmailField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.student_id} - {self.user.get_full_name()}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['grade_level', 'student_id'], name='student_level_number_idx'),
+            models.Index(fields=['enrollment_date', 'student_id'], name='student_enrolled_number_idx'),
+        ]
+
 class Teacher(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='teacher_profile')
     employee_id = models.CharField(max_length=20, unique=True)
@@ -65,11 +77,56 @@ class Teacher(models.Model):
     subjects = models.ManyToManyField(Subject, blank=True)
     qualification = models.CharField(max_length=255, blank=True, null=True)
     experience_years = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.employee_id} - {self.user.get_full_name()}"
 
-class Class(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(fields=['department', 'employee_id'], name='teacher_dept_number_idx'),
+            models.Index(fields=['hire_date', 'employee_id'], name='teacher_hired_number_idx'),
+        ]
+
+class CounterFieldsModel(models.Model):
+    """
+    Base for models whose ``counter_fields`` are maintained with SQL
+    updates; saving an existing instance never writes back its (possibly
+    stale) copy of them.
+    """
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+class ClassQuerySet(models.QuerySet):
+    def with_student_count(self):
+        """
+        Annotate the roster size counted live as ``actual_student_count``.
+        API lists read the stored ``student_count``; this COUNT is what the
+        admin and ``rebuild_counters`` check the stored value against.
+        """
+        return self.annotate(actual_student_count=models.Count('students', distinct=True))
+
+    def refresh_student_count(self):
+        """Recompute the stored roster size in a single UPDATE."""
+        roster = self.model.students.through.objects.filter(
+            class_id=models.OuterRef('pk')
+        ).order_by().values('class_id').annotate(total=models.Count('pk')).values('total')
+        # The roster is part of the rendered class, so it counts as a change.
+        return self.update(
+            student_count=Coalesce(models.Subquery(roster), 0), updated_at=timezone.now()
+        )
+
+class Class(CounterFieldsModel):
     name = models.CharField(max_length=255)
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='classes')
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
@@ -78,6 +135,15 @@ class Class(models.Model):
     schedule_time = models.TimeField(blank=True, null=True)
     schedule_days = models.CharField(max_length=20, blank=True, null=True)  # e.g., "Mon,Wed,Fri"
     max_capacity = models.IntegerField(default=30, validators=[MinValueValidator(1)])
+    student_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ClassQuerySet.as_manager()
+    counter_fields = ('student_count',)
+
+    @property
+    def is_full(self):
+        return self.student_count >= self.max_capacity
 
     def __str__(self):
         return f"{self.name} - {self.subject.name}"
@@ -105,6 +171,80 @@ class Attendance(models.Model):
 
     class Meta:
         unique_together = ['student', 'class_session', 'date']
+        # Keyset pages run newest first on (date, id) within the role scope
+        # and filters of AttendanceViewSet.
+        indexes = [
+            models.Index(fields=['date', 'id'], name='attendance_date_idx'),
+            models.Index(fields=['class_session', 'date', 'id'], name='attendance_class_date_idx'),
+            models.Index(fields=['student', 'date', 'id'], name='attendance_student_date_idx'),
+            models.Index(fields=['status', 'date', 'id'], name='attendance_status_date_idx'),
+            models.Index(
+                fields=['class_session', 'date'], name='attendance_absent_idx',
+                condition=models.Q(status='A'),
+            ),
+        ]
+
+class AttendanceCounts(models.Model):
+    """Per-status attendance tallies shared by the rollup tables."""
+    class PeriodKind(models.TextChoices):
+        ALL = 'A', 'All time'
+        TERM = 'T', 'Term'
+        DAY = 'D', 'Day'
+
+    period_kind = models.CharField(max_length=1, choices=PeriodKind.choices)
+    period = models.CharField(max_length=10)  # '', term label or ISO date
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def total(self):
+        return self.present + self.absent + self.late + self.excused
+
+class StudentAttendanceRollup(AttendanceCounts):
+    """A student's attendance in one class, all time and per term."""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_rollups')
+    class_session = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='student_attendance_rollups')
+
+    def __str__(self):
+        return f"{self.student} - {self.class_session} - {self.period or 'all'}"
+
+    class Meta:
+        unique_together = ['student', 'class_session', 'period_kind', 'period']
+
+class ClassAttendanceRollup(AttendanceCounts):
+    """A class's attendance across its roster, all time, per term and per day."""
+    class_session = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='attendance_rollups')
+
+    def __str__(self):
+        return f"{self.class_session} - {self.period or 'all'}"
+
+    class Meta:
+        unique_together = ['class_session', 'period_kind', 'period']
+
+class AttendanceBitmap(models.Model):
+    """
+    One student's attendance in one class over a term, one bit per day
+    since the term start in each plane: ``recorded`` marks days with an
+    attendance row and ``low``/``high`` hold the 2-bit status code.
+    Maintained by ``api.bitmaps``.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_bitmaps')
+    class_session = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='attendance_bitmaps')
+    term = models.CharField(max_length=10)
+    recorded = models.BinaryField(default=b'')
+    low = models.BinaryField(default=b'')
+    high = models.BinaryField(default=b'')
+
+    def __str__(self):
+        return f"{self.student} - {self.class_session} - {self.term}"
+
+    class Meta:
+        unique_together = ['student', 'class_session', 'term']
 
 class Grade(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='grades')
@@ -116,11 +256,92 @@ class Grade(models.Model):
     date_assigned = models.DateField()
     date_submitted = models.DateField(blank=True, null=True)
     comments = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.student} - {self.subject} - {self.assignment_name}: {self.grade}/{self.max_grade}"
 
-class Assignment(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(fields=['date_assigned', 'id'], name='grade_date_idx'),
+            models.Index(fields=['student', 'date_assigned', 'id'], name='grade_student_date_idx'),
+            models.Index(fields=['student', 'subject', 'date_assigned'], name='grade_student_subject_idx'),
+            models.Index(fields=['subject', 'date_assigned', 'id'], name='grade_subject_date_idx'),
+            models.Index(fields=['teacher', 'date_assigned', 'id'], name='grade_teacher_date_idx'),
+        ]
+
+class TermStandings(models.Model):
+    """
+    Cached GPA and rank results for one term. Grade, roster and profile
+    changes mark it stale; it is recomputed on next use by
+    ``api.analytics.get_term_standings``.
+    """
+    term = models.CharField(max_length=10, unique=True)
+    is_stale = models.BooleanField(default=False)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Standings {self.term}{' (stale)' if self.is_stale else ''}"
+
+    class Meta:
+        verbose_name_plural = "Term standings"
+
+class StudentStanding(models.Model):
+    standings = models.ForeignKey(TermStandings, on_delete=models.CASCADE, related_name='students')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='standings')
+    grade_level = models.CharField(max_length=20)
+    gpa = models.DecimalField(max_digits=3, decimal_places=2)
+    credits = models.PositiveIntegerField()
+    grade_level_rank = models.PositiveIntegerField()
+    grade_level_size = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.student} - {self.standings.term}: {self.gpa}"
+
+    class Meta:
+        unique_together = ['standings', 'student']
+
+class ClassStanding(models.Model):
+    standings = models.ForeignKey(TermStandings, on_delete=models.CASCADE, related_name='classes')
+    class_session = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='standings')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='class_standings')
+    average = models.DecimalField(max_digits=5, decimal_places=2)
+    rank = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.student} - {self.class_session} - {self.standings.term}: #{self.rank}"
+
+    class Meta:
+        unique_together = ['standings', 'class_session', 'student']
+
+class AssignmentQuerySet(models.QuerySet):
+    def with_submission_count(self):
+        """
+        Annotate the submission counts counted live as
+        ``actual_submission_count``/``actual_late_submission_count``, to
+        check the stored counters against.
+        """
+        return self.annotate(
+            actual_submission_count=models.Count('submissions', distinct=True),
+            actual_late_submission_count=models.Count(
+                'submissions', filter=models.Q(submissions__is_late=True), distinct=True
+            ),
+        )
+
+    def refresh_submission_counts(self):
+        """Recompute the stored submission counters in a single UPDATE."""
+        submissions = self.model.submissions.rel.related_model.objects.filter(
+            assignment_id=models.OuterRef('pk')
+        ).order_by().values('assignment_id')
+        total = submissions.annotate(total=models.Count('pk')).values('total')
+        late = submissions.filter(is_late=True).annotate(total=models.Count('pk')).values('total')
+        return self.update(
+            submission_count=Coalesce(models.Subquery(total), 0),
+            late_submission_count=Coalesce(models.Subquery(late), 0),
+        )
+
+class Assignment(CounterFieldsModel):
     class Status(models.TextChoices):
         DRAFT = 'D', 'Draft'
         PUBLISHED = 'P', 'Published'
@@ -133,12 +354,31 @@ class Assignment(models.Model):
     due_date = models.DateTimeField()
     max_points = models.DecimalField(max_digits=5, decimal_places=2, default=100)
     status = models.CharField(max_length=1, choices=Status.choices, default=Status.DRAFT)
+    submission_count = models.PositiveIntegerField(default=0, editable=False)
+    late_submission_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AssignmentQuerySet.as_manager()
+    counter_fields = ('submission_count', 'late_submission_count')
+
     def __str__(self):
         return f"{self.title} - {self.class_session}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='assignment_created_idx'),
+            models.Index(fields=['class_session', 'created_at', 'id'], name='assignment_class_created_idx'),
+            models.Index(fields=['teacher', 'created_at', 'id'], name='assignment_teacher_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='assignment_status_created_idx'),
+            models.Index(fields=['status', 'due_date', 'id'], name='assignment_status_due_idx'),
+            # What students see: published work per class, by due date.
+            models.Index(
+                fields=['class_session', 'due_date'], name='assignment_published_idx',
+                condition=models.Q(status='P'),
+            ),
+        ]
+
 class Submission(models.Model):
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='submissions')
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='submissions')
@@ -151,4 +391,38 @@ class Submission(models.Model):
         return f"{self.student} - {self.assignment.title}"
 
     class Meta:
-        unique_together = ['assignment', 'student']
\ No newline at end of file
+        unique_together = ['assignment', 'student']
+        indexes = [
+            models.Index(fields=['submitted_at', 'id'], name='submission_submitted_idx'),
+            models.Index(fields=['assignment', 'submitted_at', 'id'], name='submission_assignment_idx'),
+            models.Index(fields=['student', 'submitted_at', 'id'], name='submission_student_idx'),
+            models.Index(
+                fields=['assignment', 'submitted_at'], name='submission_late_idx',
+                condition=models.Q(is_late=True),
+            ),
+        ]
+
+class StudentRiskScore(models.Model):
+    """
+    Latest at-risk score of a student, written by the ``detect_at_risk``
+    command. ``is_stale`` is set when the student's attendance, grades,
+    submissions or enrollments change so incremental runs can pick them up.
+    """
+    class Level(models.TextChoices):
+        LOW = 'L', 'Low'
+        MEDIUM = 'M', 'Medium'
+        HIGH = 'H', 'High'
+
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, related_name='risk_score')
+    score = models.DecimalField(max_digits=5, decimal_places=2)
+    level = models.CharField(max_length=1, choices=Level.choices)
+    attendance_rate = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    late_ratio = models.DecimalField(max_digits=5, decimal_places=4, null=True)
+    missing_submissions = models.PositiveIntegerField(default=0)
+    assigned_submissions = models.PositiveIntegerField(default=0)
+    grade_trend = models.DecimalField(max_digits=6, decimal_places=2, null=True)
+    is_stale = models.BooleanField(default=False)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.student} - {self.get_level_display()} ({self.score})"
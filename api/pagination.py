@@ -0,0 +1,165 @@
+import base64
+import datetime
+import hashlib
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework import filters
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps the microseconds ``DjangoJSONEncoder`` drops, so seeks land exactly on the row."""
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _invert(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek-method pagination over the view's ``keyset_ordering`` (or the
+    ``?ordering=`` chosen through ``OrderingFilter``), always tie-broken on
+    ``id`` so cursors are stable. Each page is one indexed range scan, no
+    matter how deep it is. The total is only computed when ``?count=1``
+    is passed, and is then cached for ``count_cache_timeout`` seconds.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_cache_timeout = 60
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, filters.OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+        ordering = list(ordering or getattr(view, 'keyset_ordering', ('-id',)))
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return ordering
+
+    def encode_cursor(self, reverse, values):
+        payload = json.dumps([reverse, values], cls=CursorEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            reverse, values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), values
+
+    def _seek_filter(self, ordering, values):
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y), per field direction.
+        clauses = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {f.lstrip('-'): value for f, value in zip(ordering[:index], values)}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': values[index]}))
+        return reduce(or_, clauses)
+
+    def _row_values(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        reverse, values = self.decode_cursor(request)
+
+        ordering = [_invert(field) for field in self.ordering] if reverse else self.ordering
+        page_queryset = queryset.order_by(*ordering)
+        if values is not None:
+            page_queryset = page_queryset.filter(self._seek_filter(ordering, values))
+
+        rows = list(page_queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = values is not None, has_more
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = self.get_count(queryset)
+        self.page = rows
+        return rows
+
+    def get_count(self, queryset):
+        query = str(queryset.order_by().query)
+        key = 'keyset-count:' + hashlib.sha1(query.encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def _link(self, reverse, obj):
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(reverse, self._row_values(obj))
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self._link(True, self.page[0])
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload = {'count': self.count, **payload}
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
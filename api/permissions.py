@@ -1,5 +1,50 @@
+import itertools
+import threading
+import time
+
+from django.conf import settings
 from rest_framework import permissions
-from .models import User
+from .models import Role, User
+
+class PermissionMatrix:
+    """
+    In-memory map of Role id -> frozenset of permission codes, compiled
+    with a single query and rebuilt after ``invalidate()`` (wired to Role
+    and Permission changes) or once ``PERMISSION_MATRIX_TTL`` expires.
+    """
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._matrix = None
+        self._expires = 0
+        self._generations = itertools.count(1)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _compile(self):
+        matrix = {}
+        rows = Role.permissions.through.objects.values_list('role_id', 'permission__code')
+        for role_id, code in rows:
+            matrix.setdefault(role_id, set()).add(code)
+        return {role_id: frozenset(codes) for role_id, codes in matrix.items()}
+
+    def codes_for(self, role_id):
+        matrix = self._matrix
+        if matrix is None or time.monotonic() >= self._expires:
+            with self._lock:
+                generation = self._generation
+                matrix = self._compile()
+                # Invalidated while compiling: the rows read may predate the
+                # change, so answer from them this once but don't keep them.
+                if generation == self._generation:
+                    self._matrix = matrix
+                    self._expires = time.monotonic() + self.ttl
+        return matrix.get(role_id, frozenset())
+
+    def invalidate(self):
+        self._generation = next(self._generations)
+        self._matrix = None
+
+permission_matrix = PermissionMatrix(ttl=settings.PERMISSION_MATRIX_TTL)
 
 class HasPermission(permissions.BasePermission):
     """
@@ -17,12 +62,11 @@ class HasPermission(permissions.BasePermission):
         if request.user.role == User.Roles.ADMIN:
             return True
             
-        # Check if user's role has the required permission
-        try:
-            user_permissions = request.user.role.permissions.values_list('code', flat=True)
-            return required_permission in user_permissions
-        except AttributeError:
+        # Check if user's access role grants the required permission
+        role_id = request.user.access_role_id
+        if role_id is None:
             return False
+        return required_permission in permission_matrix.codes_for(role_id)
 
 class IsAdmin(permissions.BasePermission):
     """
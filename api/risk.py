@@ -0,0 +1,173 @@
+from datetime import timedelta
+
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Q, Sum
+from django.utils import timezone
+
+from .dashboard import invalidate_dashboards
+from .models import (
+    Assignment, AttendanceCounts, Class, Grade, Student, StudentAttendanceRollup,
+    StudentRiskScore, Submission,
+)
+
+# Share of the 0-100 score each signal contributes at its worst.
+RISK_WEIGHTS = {'attendance': 35, 'missing': 30, 'trend': 20, 'late': 15}
+# Minimum score for each level, highest first.
+RISK_LEVELS = ((50, StudentRiskScore.Level.HIGH), (25, StudentRiskScore.Level.MEDIUM))
+# Grades from the last TREND_WINDOW_DAYS are compared against older ones; a
+# drop of TREND_FULL_DROP percentage points scores the full trend weight.
+TREND_WINDOW_DAYS = 30
+TREND_FULL_DROP = 20
+
+SCORE_FIELDS = [
+    'score', 'level', 'attendance_rate', 'late_ratio', 'missing_submissions',
+    'assigned_submissions', 'grade_trend', 'is_stale', 'computed_at',
+]
+
+def mark_risk_stale(student_ids):
+    """Flag the scores of ``student_ids`` (ids or an id queryset) for the next incremental run."""
+    StudentRiskScore.objects.filter(student_id__in=student_ids, is_stale=False).update(is_stale=True)
+
+def _clamp(value):
+    return min(max(value, 0.0), 1.0)
+
+def _level(score):
+    for minimum, level in RISK_LEVELS:
+        if score >= minimum:
+            return level
+    return StudentRiskScore.Level.LOW
+
+class RiskScorer:
+    """
+    Scores students from a fixed set of grouped queries (attendance
+    rollups, submissions, missing published work, grade trend), each
+    returning one row per student, and upserts ``StudentRiskScore`` rows.
+    ``run()`` without ids scores everyone; with ids it scores them in
+    chunks of ``chunk_size``.
+    """
+    def __init__(self, now=None, chunk_size=900, batch_size=1000):
+        self.now = now or timezone.now()
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+
+    def _per_student(self, queryset, key, student_ids, **aggregates):
+        if student_ids is not None:
+            queryset = queryset.filter(**{f'{key}__in': student_ids})
+        rows = queryset.order_by().values(key).annotate(**aggregates)
+        return {row.pop(key): row for row in rows}
+
+    def collect(self, student_ids=None):
+        """``{student_id: signals}`` for ``student_ids`` (default: every student)."""
+        students = Student.objects.all()
+        if student_ids is not None:
+            students = students.filter(pk__in=student_ids)
+
+        attendance = self._per_student(
+            StudentAttendanceRollup.objects.filter(period_kind=AttendanceCounts.PeriodKind.ALL),
+            'student_id', student_ids,
+            attended=Sum(F('present') + F('late')),
+            total=Sum(F('present') + F('late') + F('absent') + F('excused')),
+        )
+        submissions = self._per_student(
+            Submission.objects.all(), 'student_id', student_ids,
+            total=Count('pk'), late=Count('pk', filter=Q(is_late=True)),
+        )
+        due = {'status': Assignment.Status.PUBLISHED, 'due_date__lt': self.now}
+        assigned = self._per_student(
+            Class.students.through.objects.filter(**{f'class__assignments__{k}': v for k, v in due.items()}),
+            'student_id', student_ids, total=Count('class__assignments'),
+        )
+        submitted = self._per_student(
+            Submission.objects.filter(**{f'assignment__{k}': v for k, v in due.items()}),
+            'student_id', student_ids, total=Count('assignment_id', distinct=True),
+        )
+        percentage = ExpressionWrapper(F('grade') * 100.0 / F('max_grade'), output_field=FloatField())
+        cutoff = (self.now - timedelta(days=TREND_WINDOW_DAYS)).date()
+        grades = self._per_student(
+            Grade.objects.filter(max_grade__gt=0), 'student_id', student_ids,
+            recent=Avg(percentage, filter=Q(date_assigned__gte=cutoff)),
+            earlier=Avg(percentage, filter=Q(date_assigned__lt=cutoff)),
+        )
+
+        signals = {}
+        for student_id in students.values_list('pk', flat=True).iterator():
+            seen = attendance.get(student_id, {})
+            sent = submissions.get(student_id, {})
+            assigned_total = assigned.get(student_id, {}).get('total', 0)
+            trend = grades.get(student_id, {})
+            signals[student_id] = {
+                'attendance_rate': seen['attended'] / seen['total'] if seen.get('total') else None,
+                'late_ratio': sent['late'] / sent['total'] if sent.get('total') else None,
+                'assigned': assigned_total,
+                'missing': max(assigned_total - submitted.get(student_id, {}).get('total', 0), 0),
+                'grade_trend': (
+                    trend['recent'] - trend['earlier']
+                    if trend.get('recent') is not None and trend.get('earlier') is not None else None
+                ),
+            }
+        return signals
+
+    def score(self, student_id, signals):
+        components = {
+            'attendance': 0.0 if signals['attendance_rate'] is None else 1 - signals['attendance_rate'],
+            'late': signals['late_ratio'] or 0.0,
+            'missing': signals['missing'] / signals['assigned'] if signals['assigned'] else 0.0,
+            'trend': 0.0 if signals['grade_trend'] is None else -signals['grade_trend'] / TREND_FULL_DROP,
+        }
+        score = round(sum(RISK_WEIGHTS[name] * _clamp(value) for name, value in components.items()), 2)
+        return StudentRiskScore(
+            student_id=student_id,
+            score=score,
+            level=_level(score),
+            attendance_rate=None if signals['attendance_rate'] is None else round(signals['attendance_rate'] * 100, 2),
+            late_ratio=None if signals['late_ratio'] is None else round(signals['late_ratio'], 4),
+            missing_submissions=signals['missing'],
+            assigned_submissions=signals['assigned'],
+            grade_trend=None if signals['grade_trend'] is None else round(signals['grade_trend'], 2),
+            is_stale=False,
+            computed_at=self.now,
+        )
+
+    def _write(self, signals):
+        scores = [self.score(student_id, values) for student_id, values in signals.items()]
+        StudentRiskScore.objects.bulk_create(
+            scores, batch_size=self.batch_size, update_conflicts=True,
+            unique_fields=['student'], update_fields=SCORE_FIELDS,
+        )
+        return len(scores)
+
+    def _invalidate_dashboards(self, student_ids=None):
+        # Teacher dashboards list the at-risk students of their classes, and
+        # the bulk upsert sends no signals.
+        classes = Class.objects.all()
+        if student_ids is not None:
+            classes = classes.filter(students__in=student_ids)
+        invalidate_dashboards(set(classes.values_list('teacher_id', flat=True)))
+
+    def run(self, student_ids=None):
+        if student_ids is None:
+            written = self._write(self.collect())
+            self._invalidate_dashboards()
+            return written
+        student_ids = sorted(student_ids)
+        written = 0
+        for start in range(0, len(student_ids), self.chunk_size):
+            chunk = student_ids[start:start + self.chunk_size]
+            written += self._write(self.collect(chunk))
+            self._invalidate_dashboards(chunk)
+        return written
+
+def students_to_rescore(now=None):
+    """
+    Students with no score, a stale score, or a published assignment in
+    one of their classes that fell due since their score was computed.
+    """
+    now = now or timezone.now()
+    student_ids = set(Student.objects.filter(
+        Q(risk_score__isnull=True) | Q(risk_score__is_stale=True)
+    ).values_list('pk', flat=True))
+    student_ids.update(Class.students.through.objects.filter(
+        class__assignments__status=Assignment.Status.PUBLISHED,
+        class__assignments__due_date__lte=now,
+        class__assignments__due_date__gt=F('student__risk_score__computed_at'),
+    ).values_list('student_id', flat=True))
+    return student_ids
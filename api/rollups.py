@@ -0,0 +1,144 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import Attendance, AttendanceCounts, ClassAttendanceRollup, StudentAttendanceRollup
+from .terms import as_date, term_for
+
+STATUS_FIELDS = {
+    Attendance.Status.PRESENT: 'present',
+    Attendance.Status.ABSENT: 'absent',
+    Attendance.Status.LATE: 'late',
+    Attendance.Status.EXCUSED: 'excused',
+}
+# Statuses that count as attended for attendance rates.
+ATTENDED_FIELDS = ('present', 'late')
+
+Period = AttendanceCounts.PeriodKind
+
+def _periods(date, with_day):
+    date = as_date(date)
+    periods = [(Period.ALL, ''), (Period.TERM, term_for(date))]
+    if with_day:
+        periods.append((Period.DAY, date.isoformat()))
+    return periods
+
+class AttendanceRollupDelta:
+    """
+    Accumulates attendance rows added (``sign=1``) or removed (``sign=-1``)
+    and writes the net change to the rollup tables. ``apply`` increments
+    existing rollups with one UPDATE per distinct change, so a roll-call
+    of a whole class costs a handful of queries; ``create`` inserts the
+    totals into empty tables for a rebuild.
+    """
+    def __init__(self):
+        self.students = defaultdict(Counter)
+        self.classes = defaultdict(Counter)
+
+    def add(self, student_id, class_id, date, status, sign=1):
+        field = STATUS_FIELDS[status]
+        for kind, period in _periods(date, with_day=False):
+            self.students[(student_id, class_id, kind, period)][field] += sign
+        for kind, period in _periods(date, with_day=True):
+            self.classes[(class_id, kind, period)][field] += sign
+
+    def add_row(self, row, sign=1):
+        self.add(row.student_id, row.class_session_id, row.date, row.status, sign)
+
+    @staticmethod
+    def _changes(deltas):
+        for key, counts in deltas.items():
+            counts = {field: n for field, n in counts.items() if n}
+            if counts:
+                yield key, counts
+
+    def create(self, batch_size=1000, apps=None, using=None):
+        _, student_model, class_model = _rollup_models(apps)
+        student_model._default_manager.db_manager(using).bulk_create([
+            student_model(
+                student_id=student_id, class_session_id=class_id,
+                period_kind=kind, period=period, **counts,
+            )
+            for (student_id, class_id, kind, period), counts in self._changes(self.students)
+        ], batch_size=batch_size)
+        class_model._default_manager.db_manager(using).bulk_create([
+            class_model(class_session_id=class_id, period_kind=kind, period=period, **counts)
+            for (class_id, kind, period), counts in self._changes(self.classes)
+        ], batch_size=batch_size)
+
+    def apply(self):
+        student_changes = list(self._changes(self.students))
+        class_changes = list(self._changes(self.classes))
+        if not student_changes and not class_changes:
+            return
+        with transaction.atomic():
+            # Only increments can need a new row; decrements always hit an
+            # existing one (and must not recreate rollups of deleted rows).
+            StudentAttendanceRollup.objects.bulk_create([
+                StudentAttendanceRollup(
+                    student_id=student_id, class_session_id=class_id,
+                    period_kind=kind, period=period,
+                )
+                for (student_id, class_id, kind, period), counts in student_changes
+                if any(n > 0 for n in counts.values())
+            ], ignore_conflicts=True)
+            ClassAttendanceRollup.objects.bulk_create([
+                ClassAttendanceRollup(class_session_id=class_id, period_kind=kind, period=period)
+                for (class_id, kind, period), counts in class_changes
+                if any(n > 0 for n in counts.values())
+            ], ignore_conflicts=True)
+
+            # Students sharing a class, period and change get one UPDATE.
+            grouped = defaultdict(list)
+            for (student_id, class_id, kind, period), counts in student_changes:
+                grouped[(class_id, kind, period, frozenset(counts.items()))].append(student_id)
+            for (class_id, kind, period, counts), student_ids in grouped.items():
+                StudentAttendanceRollup.objects.filter(
+                    class_session_id=class_id, period_kind=kind, period=period,
+                    student_id__in=student_ids,
+                ).update(**{field: F(field) + n for field, n in counts})
+
+            grouped = defaultdict(list)
+            for (class_id, kind, period), counts in class_changes:
+                grouped[(kind, period, frozenset(counts.items()))].append(class_id)
+            for (kind, period, counts), class_ids in grouped.items():
+                ClassAttendanceRollup.objects.filter(
+                    period_kind=kind, period=period, class_session_id__in=class_ids,
+                ).update(**{field: F(field) + n for field, n in counts})
+
+def _rollup_models(apps=None):
+    models = (Attendance, StudentAttendanceRollup, ClassAttendanceRollup)
+    if apps is None:
+        return models
+    return tuple(apps.get_model(model._meta.label) for model in models)
+
+def rebuild_attendance_rollups(chunk_size=5000, apps=None, using=None):
+    """
+    Recompute every rollup from the ``Attendance`` table, optionally with
+    the (historical) models of a migration's ``apps`` registry and database
+    alias.
+    """
+    attendance_model, student_model, class_model = _rollup_models(apps)
+    delta = AttendanceRollupDelta()
+    rows = attendance_model._default_manager.using(using).order_by().values_list(
+        'student_id', 'class_session_id', 'date', 'status'
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        delta.add(*row)
+    with transaction.atomic(using=using):
+        student_model._default_manager.using(using).all().delete()
+        class_model._default_manager.using(using).all().delete()
+        delta.create(apps=apps, using=using)
+    return len(delta.students), len(delta.classes)
+
+def attendance_totals(rollups):
+    """Sum the status counts of a rollup queryset into a plain dict."""
+    totals = rollups.aggregate(**{field: Sum(field) for field in STATUS_FIELDS.values()})
+    return {field: n or 0 for field, n in totals.items()}
+
+def attendance_rate(totals):
+    total = sum(totals.values())
+    if total == 0:
+        return 100
+    return round(sum(totals[field] for field in ATTENDED_FIELDS) / total * 100, 2)
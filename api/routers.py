@@ -0,0 +1,132 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# Replication lag of each replica as (seconds, measured_at), per process.
+_lag_cache = {}
+
+_routing = ContextVar('db_routing', default=None)
+
+class RoutingState:
+    """Per-request routing: the replica chosen for reads, if any, and whether anything was written."""
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+@contextmanager
+def request_routing():
+    """Track the routing of the database calls made while handling one request."""
+    state = RoutingState()
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+def current_routing():
+    return _routing.get()
+
+def _pin_key(user_id):
+    return f'db-last-write:{user_id}'
+
+def pin_to_primary(user_id):
+    """Record that ``user_id`` just wrote, so their reads stay on the primary while replicas catch up."""
+    caches[settings.REPLICA_PIN_CACHE_ALIAS].set(
+        _pin_key(user_id), time.time(), settings.REPLICA_MAX_LAG
+    )
+
+def last_write(user_id):
+    return caches[settings.REPLICA_PIN_CACHE_ALIAS].get(_pin_key(user_id))
+
+def replica_lag(alias):
+    """
+    Seconds ``alias`` is behind the primary, measured at most every
+    ``REPLICA_LAG_CHECK_INTERVAL`` seconds. PostgreSQL standbys report
+    the age of their last replayed transaction (0 once caught up); other
+    backends are assumed to be ``REPLICA_MAX_LAG`` behind. An unreachable
+    replica counts as infinitely behind.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return settings.REPLICA_MAX_LAG
+    lag, measured_at = _lag_cache.get(alias, (None, 0))
+    if time.monotonic() - measured_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return lag
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT CASE WHEN NOT pg_is_in_recovery()"
+                " OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+                " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            )
+            lag = float(cursor.fetchone()[0])
+    except DatabaseError:
+        lag = float('inf')
+    _lag_cache[alias] = (lag, time.monotonic())
+    return lag
+
+def choose_replica(user_id=None):
+    """
+    A replica within ``REPLICA_MAX_LAG`` that has also replayed the last
+    write of ``user_id``, or None to read from the primary.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return None
+    written_at = last_write(user_id) if user_id is not None else None
+    since_write = time.time() - written_at if written_at is not None else float('inf')
+    candidates = [
+        alias for alias in settings.DATABASE_REPLICAS
+        if replica_lag(alias) <= min(settings.REPLICA_MAX_LAG, since_write)
+    ]
+    return random.choice(candidates) if candidates else None
+
+def read_lag():
+    """Seconds the data read by the current request may be behind the primary."""
+    state = current_routing()
+    if state is None or not state.replica or state.wrote:
+        return 0
+    return replica_lag(state.replica)
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block, for data that is derived and stored."""
+    state = current_routing()
+    if state is None:
+        yield
+        return
+    replica, state.replica = state.replica, None
+    try:
+        yield
+    finally:
+        state.replica = replica
+
+class ReplicaRouter:
+    """
+    Writes always go to the primary. Reads go to the replica picked for
+    the current request by ``ReplicaReadMixin``, and back to the primary
+    for the rest of the request once it has written anything. Replicas
+    are never migrated directly.
+    """
+    def db_for_read(self, model, **hints):
+        state = current_routing()
+        if state is not None and state.replica and not state.wrote:
+            return state.replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = current_routing()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
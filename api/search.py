@@ -0,0 +1,231 @@
+import re
+from collections import defaultdict
+from functools import reduce
+from operator import and_, or_
+
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from .models import Assignment, Class, Student, Teacher, User
+
+SEARCH_TABLE = 'api_search_index'
+# Documents of every kind share the FTS5 table: rowid = pk * KIND_SLOTS + code.
+KIND_SLOTS = 8
+# bm25() weights of the title and body columns.
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+class SearchKind:
+    """An indexed model and the fields concatenated into its document's title and body."""
+    def __init__(self, code, model, title_fields, body_fields):
+        self.code = code
+        self.model = model
+        self.title_fields = title_fields
+        self.body_fields = body_fields
+
+    @property
+    def fields(self):
+        return (*self.title_fields, *self.body_fields)
+
+SEARCH_KINDS = {
+    'user': SearchKind(1, User, ('first_name', 'last_name'), ('username', 'email')),
+    'student': SearchKind(
+        2, Student, ('user__first_name', 'user__last_name'),
+        ('student_id', 'user__email', 'user__username'),
+    ),
+    'teacher': SearchKind(
+        3, Teacher, ('user__first_name', 'user__last_name'),
+        ('employee_id', 'department', 'user__email', 'user__username'),
+    ),
+    'class': SearchKind(
+        4, Class, ('name',),
+        ('subject__name', 'subject__code', 'teacher__user__first_name', 'teacher__user__last_name'),
+    ),
+    'assignment': SearchKind(
+        5, Assignment, ('title',),
+        ('class_session__name', 'class_session__subject__name', 'description'),
+    ),
+}
+
+def _dependencies():
+    """
+    ``{model: {(kind, lookup)}}`` of the documents reading ``model``'s rows
+    through ``lookup`` ('' for the row's own document) and ``{model:
+    field names}`` of the columns they read.
+    """
+    dependencies, fields = defaultdict(set), defaultdict(set)
+    for kind, search_kind in SEARCH_KINDS.items():
+        dependencies[search_kind.model].add((kind, ''))
+        for path in search_kind.fields:
+            model = search_kind.model
+            *relations, name = path.split('__')
+            for depth, relation in enumerate(relations, start=1):
+                model = model._meta.get_field(relation).related_model
+                dependencies[model].add((kind, '__'.join(relations[:depth])))
+            fields[model].add(name)
+    return dependencies, fields
+
+SEARCH_DEPENDENCIES, INDEXED_FIELDS = _dependencies()
+
+def search_enabled(alias):
+    return connections[alias].vendor == 'sqlite'
+
+def _join(values):
+    return ' '.join(str(value) for value in values if value)
+
+def _chunks(values, size=900):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def index_documents(kind, pks=None, apps=None, using=None):
+    """
+    Write the documents of ``pks`` (default: every row) of ``kind`` to the
+    index, dropping those whose rows no longer exist. Migrations pass their
+    ``apps`` registry and database alias.
+    """
+    search_kind = SEARCH_KINDS[kind]
+    model = search_kind.model if apps is None else apps.get_model(search_kind.model._meta.label)
+    alias = using or router.db_for_write(model)
+    if not search_enabled(alias):
+        return
+    queryset = model._default_manager.using(alias).order_by()
+    title_count = len(search_kind.title_fields)
+    batches = [None] if pks is None else _chunks(pks)
+    with connections[alias].cursor() as cursor:
+        for batch in batches:
+            rows = queryset if batch is None else queryset.filter(pk__in=batch)
+            documents = [
+                (pk * KIND_SLOTS + search_kind.code, _join(values[:title_count]), _join(values[title_count:]))
+                for pk, *values in rows.values_list('pk', *search_kind.fields).iterator()
+            ]
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, title, body) VALUES (%s, %s, %s)',
+                documents,
+            )
+            if batch is not None:
+                found = {rowid // KIND_SLOTS for rowid, _, _ in documents}
+                _delete(cursor, search_kind, [pk for pk in batch if pk not in found])
+
+def _delete(cursor, search_kind, pks):
+    if pks:
+        cursor.executemany(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+            [(pk * KIND_SLOTS + search_kind.code,) for pk in pks],
+        )
+
+def reindex_instance(instance):
+    """Rewrite every document that contains text of ``instance``."""
+    for kind, lookup in SEARCH_DEPENDENCIES[type(instance)]:
+        if not lookup:
+            index_documents(kind, [instance.pk])
+        else:
+            pks = SEARCH_KINDS[kind].model._default_manager.filter(**{lookup: instance.pk})
+            index_documents(kind, pks.values_list('pk', flat=True))
+
+def remove_documents(kind, pks):
+    search_kind = SEARCH_KINDS[kind]
+    alias = router.db_for_write(search_kind.model)
+    if search_enabled(alias):
+        with connections[alias].cursor() as cursor:
+            _delete(cursor, search_kind, pks)
+
+def rebuild_search_index(apps=None, using=None):
+    """Recreate every document from the database."""
+    alias = using or router.db_for_write(User)
+    if not search_enabled(alias):
+        return 0
+    with connections[alias].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+    for kind in SEARCH_KINDS:
+        index_documents(kind, apps=apps, using=alias)
+    with connections[alias].cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {SEARCH_TABLE}')
+        return cursor.fetchone()[0]
+
+def match_expression(terms):
+    """
+    FTS5 query matching documents that contain every word of ``terms`` as a
+    word prefix, or None when the terms hold no words.
+    """
+    words = re.findall(r'\w+', ' '.join(terms))
+    return ' '.join(f'"{word}"*' for word in words) or None
+
+def _rank(search_kind, queryset, match):
+    connection = connections[queryset.db]
+    pk_column = '{}.{}'.format(
+        connection.ops.quote_name(search_kind.model._meta.db_table),
+        connection.ops.quote_name(search_kind.model._meta.pk.column),
+    )
+    return RawSQL(
+        f'SELECT bm25({SEARCH_TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT}) FROM {SEARCH_TABLE}'
+        f' WHERE {SEARCH_TABLE} MATCH %s AND rowid = {pk_column} * {KIND_SLOTS} + {search_kind.code}',
+        (match,),
+    )
+
+def _matching(search_kind, match):
+    return RawSQL(
+        f'SELECT rowid / {KIND_SLOTS} FROM {SEARCH_TABLE}'
+        f' WHERE {SEARCH_TABLE} MATCH %s AND rowid %% {KIND_SLOTS} = {search_kind.code}',
+        (match,),
+    )
+
+def search_queryset(queryset, kind, terms):
+    """
+    ``queryset`` narrowed to the rows whose ``kind`` document matches
+    ``terms``, best match first by the ``search_rank`` annotation (bm25,
+    lower is better).
+    """
+    search_kind = SEARCH_KINDS[kind]
+    match = match_expression(terms)
+    if match is None:
+        return queryset.none()
+    return queryset.filter(pk__in=_matching(search_kind, match)).annotate(
+        search_rank=_rank(search_kind, queryset, match)
+    ).order_by('search_rank', 'pk')
+
+def _fallback_queryset(queryset, kind, terms):
+    words = re.findall(r'\w+', ' '.join(terms))
+    if not words:
+        return queryset.none()
+    return queryset.filter(reduce(and_, (
+        reduce(or_, (Q(**{f'{field}__icontains': word}) for field in SEARCH_KINDS[kind].fields))
+        for word in words
+    ))).order_by('pk')
+
+def search_hits(queryset, kind, terms, limit):
+    """
+    Up to ``limit`` ``{'type', 'id', 'title', 'rank'}`` hits of ``kind``
+    within ``queryset``, best first. Without the index (other databases)
+    every hit ranks 0.
+    """
+    search_kind = SEARCH_KINDS[kind]
+    if not search_enabled(queryset.db):
+        titles = _fallback_queryset(queryset, kind, terms).values_list('pk', *search_kind.title_fields)
+        return [
+            {'type': kind, 'id': pk, 'title': _join(values), 'rank': 0.0}
+            for pk, *values in titles[:limit]
+        ]
+    rows = search_queryset(queryset, kind, terms).values_list(
+        'pk', 'search_rank', *search_kind.title_fields
+    )
+    return [
+        {'type': kind, 'id': pk, 'title': _join(values), 'rank': rank}
+        for pk, rank, *values in rows[:limit]
+    ]
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    ``SearchFilter`` answered from the full-text index for views with a
+    ``search_kind``, ranked by relevance unless ``?ordering=`` is given.
+    Other databases keep the ``LIKE`` lookups over ``search_fields``.
+    """
+    def filter_queryset(self, request, queryset, view):
+        kind = getattr(view, 'search_kind', None)
+        terms = self.get_search_terms(request)
+        if not terms or kind is None or not search_enabled(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        return search_queryset(queryset, kind, terms)
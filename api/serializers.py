@@ -1,15 +1,144 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from django.utils import timezone
 from .models import (
     User, Student, Teacher, Class, Subject, Attendance, 
-    Grade, Assignment, Submission, Permission, Role
+    Grade, Assignment, Submission, Permission, Role, StudentStanding, ClassStanding
 )
+from .lookup import LOOKUP_KINDS
+from .search import SEARCH_KINDS
+from .terms import term_bounds, term_for
+
+MAX_EXPAND_DEPTH = 3
+
+def parse_paths(context, param):
+    """
+    Return the set of dotted field paths named by ``context[param]`` or, when
+    the context does not set it, by the ``?<param>=`` query parameter.
+    """
+    paths = context.get(param)
+    if paths is None:
+        request = context.get('request')
+        paths = request.query_params.get(param, '') if request is not None else ''
+    if isinstance(paths, str):
+        paths = [path.strip() for path in paths.split(',')]
+    return {path for path in paths if path}
+
+def parse_expand(context):
+    paths = parse_paths(context, 'expand')
+    return {path for path in paths if path.count('.') < MAX_EXPAND_DEPTH}
+
+def unknown_expand_paths(serializer_class, paths):
+    """
+    The ``paths`` that do not name a chain of ``Meta.expandable_fields``
+    from ``serializer_class``, or that go deeper than ``MAX_EXPAND_DEPTH``.
+    """
+    unknown = []
+    for path in paths:
+        node = serializer_class
+        for name in path.split('.'):
+            node = getattr(getattr(node, 'Meta', None), 'expandable_fields', {}).get(name)
+            if node is None:
+                break
+        if node is None or path.count('.') >= MAX_EXPAND_DEPTH:
+            unknown.append(path)
+    return sorted(unknown)
+
+class DynamicFieldsMixin:
+    """
+    Nested relations are rendered with their compact summary serializer.
+    Relations listed in ``Meta.expandable_fields`` are swapped for the full
+    serializer when their dotted path (e.g. ``class_session.teacher``) is
+    named in ``?expand=``, and ``?fields=`` (e.g. ``id,date,student.name``)
+    trims the output to the named fields. Write-only fields are never
+    dropped so the same query string can be used on writes. The top-level
+    serializer rejects ``?expand=`` paths that cannot be expanded.
+    """
+    def _field_path(self):
+        names = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                names.append(node.field_name)
+            node = node.parent
+        return '.'.join(reversed(names))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        prefix = self._field_path()
+        if not prefix:
+            unknown = unknown_expand_paths(type(self), parse_paths(self.context, 'expand'))
+            if unknown:
+                raise serializers.ValidationError(
+                    {'expand': [f"Cannot expand: {', '.join(unknown)}."]}
+                )
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        if expandable:
+            expand = parse_expand(self.context)
+            for name, serializer_class in expandable.items():
+                path = f'{prefix}.{name}' if prefix else name
+                if name in fields and path in expand:
+                    many = isinstance(fields[name], serializers.ListSerializer)
+                    fields[name] = serializer_class(many=many, read_only=True)
+
+        selected = set()
+        for path in parse_paths(self.context, 'fields'):
+            if prefix:
+                if not path.startswith(f'{prefix}.'):
+                    continue
+                path = path[len(prefix) + 1:]
+            selected.add(path.split('.')[0])
+        if selected:
+            fields = {
+                name: field for name, field in fields.items()
+                if name in selected or field.write_only
+            }
+        return fields
+
+class UserSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    name = serializers.CharField(source='get_full_name', read_only=True)
 
-class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'name']
+
+class SubjectSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Subject
+        fields = ['id', 'name', 'code']
+
+class StudentSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    name = serializers.CharField(source='user.get_full_name', read_only=True)
+
+    class Meta:
+        model = Student
+        fields = ['id', 'student_id', 'name']
+
+class TeacherSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    name = serializers.CharField(source='user.get_full_name', read_only=True)
+
+    class Meta:
+        model = Teacher
+        fields = ['id', 'employee_id', 'name']
+
+class ClassSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    subject = SubjectSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Class
+        fields = ['id', 'name', 'subject']
+
+class AssignmentSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Assignment
+        fields = ['id', 'title', 'due_date', 'status']
+
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 
-                 'phone_number', 'date_of_birth', 'address', 'profile_picture']
+                 'access_role', 'phone_number', 'date_of_birth', 'address', 'profile_picture']
         read_only_fields = ['id']
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -31,12 +160,12 @@ class RegisterSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(**validated_data)
         return user
 
-class SubjectSerializer(serializers.ModelSerializer):
+class SubjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Subject
         fields = ['id', 'name', 'code', 'description', 'credits']
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.IntegerField(write_only=True)
 
@@ -45,10 +174,10 @@ class StudentSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'user_id', 'student_id', 'enrollment_date', 
                  'grade_level', 'parent_name', 'parent_phone', 'parent_email']
 
-class TeacherSerializer(serializers.ModelSerializer):
+class TeacherSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.IntegerField(write_only=True)
-    subjects = SubjectSerializer(many=True, read_only=True)
+    subjects = SubjectSummarySerializer(many=True, read_only=True)
     subject_ids = serializers.ListField(
         child=serializers.IntegerField(), write_only=True, required=False
     )
@@ -57,6 +186,7 @@ class TeacherSerializer(serializers.ModelSerializer):
         model = Teacher
         fields = ['id', 'user', 'user_id', 'employee_id', 'hire_date', 
                  'department', 'subjects', 'subject_ids', 'qualification', 'experience_years']
+        expandable_fields = {'subjects': SubjectSerializer}
 
     def create(self, validated_data):
         subject_ids = validated_data.pop('subject_ids', [])
@@ -65,41 +195,142 @@ class TeacherSerializer(serializers.ModelSerializer):
             teacher.subjects.set(subject_ids)
         return teacher
 
-class ClassSerializer(serializers.ModelSerializer):
-    teacher = TeacherSerializer(read_only=True)
+class ClassSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    teacher = TeacherSummarySerializer(read_only=True)
     teacher_id = serializers.IntegerField(write_only=True)
-    subject = SubjectSerializer(read_only=True)
+    subject = SubjectSummarySerializer(read_only=True)
     subject_id = serializers.IntegerField(write_only=True)
-    students = StudentSerializer(many=True, read_only=True)
-    student_count = serializers.SerializerMethodField()
+    students = StudentSummarySerializer(many=True, read_only=True)
 
     class Meta:
         model = Class
         fields = ['id', 'name', 'teacher', 'teacher_id', 'subject', 'subject_id', 
                  'students', 'room_number', 'schedule_time', 'schedule_days', 
                  'max_capacity', 'student_count']
+        read_only_fields = ['student_count']
+        expandable_fields = {
+            'teacher': TeacherSerializer,
+            'subject': SubjectSerializer,
+            'students': StudentSerializer,
+        }
 
-    def get_student_count(self, obj):
-        return obj.students.count()
-
-class AttendanceSerializer(serializers.ModelSerializer):
-    student = StudentSerializer(read_only=True)
+class AttendanceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    student = StudentSummarySerializer(read_only=True)
     student_id = serializers.IntegerField(write_only=True)
-    class_session = ClassSerializer(read_only=True)
+    class_session = ClassSummarySerializer(read_only=True)
     class_id = serializers.IntegerField(write_only=True)
-    marked_by = UserSerializer(read_only=True)
+    marked_by = UserSummarySerializer(read_only=True)
 
     class Meta:
         model = Attendance
         fields = ['id', 'student', 'student_id', 'class_session', 'class_id', 
                  'date', 'status', 'notes', 'marked_by', 'created_at']
+        expandable_fields = {
+            'student': StudentSerializer,
+            'class_session': ClassSerializer,
+            'marked_by': UserSerializer,
+        }
 
-class GradeSerializer(serializers.ModelSerializer):
-    student = StudentSerializer(read_only=True)
+class RollCallEntrySerializer(serializers.Serializer):
+    student_id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Attendance.Status.choices)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+class RollCallSerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+    records = RollCallEntrySerializer(many=True, allow_empty=False)
+
+class AttendancePatternSerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    status = serializers.ChoiceField(choices=Attendance.Status.choices, default=Attendance.Status.ABSENT)
+    class_session = serializers.IntegerField(required=False)
+    min_days = serializers.IntegerField(min_value=1, default=1)
+
+    def validate(self, attrs):
+        today = timezone.localdate()
+        attrs.setdefault('end', today)
+        attrs.setdefault('start', attrs['end'].replace(day=1))
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError("start must not be after end.")
+        return attrs
+
+class TermSerializer(serializers.Serializer):
+    term = serializers.CharField(required=False)
+
+    def validate_term(self, value):
+        try:
+            term_bounds(value)
+        except ValueError:
+            raise serializers.ValidationError("Expected a term such as 2025-T1.")
+        return value
+
+    def validate(self, attrs):
+        attrs.setdefault('term', term_for(timezone.localdate()))
+        return attrs
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField()
+    types = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate_types(self, value):
+        types = [kind.strip() for kind in value.split(',') if kind.strip()]
+        unknown = sorted(set(types) - set(SEARCH_KINDS))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown types: {', '.join(unknown)}.")
+        return list(dict.fromkeys(types))
+
+    def validate(self, attrs):
+        attrs['types'] = attrs.get('types') or list(SEARCH_KINDS)
+        return attrs
+
+class LookupQuerySerializer(serializers.Serializer):
+    q = serializers.CharField()
+    types = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def validate_types(self, value):
+        types = [kind.strip() for kind in value.split(',') if kind.strip()]
+        unknown = sorted(set(types) - set(LOOKUP_KINDS))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown types: {', '.join(unknown)}.")
+        return types
+
+class ClassStandingSerializer(serializers.ModelSerializer):
+    student = StudentSummarySerializer(read_only=True)
+    class_session = ClassSummarySerializer(read_only=True)
+
+    class Meta:
+        model = ClassStanding
+        fields = ['class_session', 'student', 'average', 'rank', 'size']
+
+class StudentStandingSerializer(serializers.ModelSerializer):
+    term = serializers.CharField(source='standings.term', read_only=True)
+    computed_at = serializers.DateTimeField(source='standings.computed_at', read_only=True)
+
+    class Meta:
+        model = StudentStanding
+        fields = ['term', 'grade_level', 'gpa', 'credits', 'grade_level_rank',
+                  'grade_level_size', 'computed_at']
+
+class BulkEnrollmentSerializer(serializers.Serializer):
+    student_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    grade_level = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if ('student_ids' in attrs) == ('grade_level' in attrs):
+            raise serializers.ValidationError("Provide either student_ids or grade_level.")
+        return attrs
+
+class GradeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    student = StudentSummarySerializer(read_only=True)
     student_id = serializers.IntegerField(write_only=True)
-    subject = SubjectSerializer(read_only=True)
+    subject = SubjectSummarySerializer(read_only=True)
     subject_id = serializers.IntegerField(write_only=True)
-    teacher = TeacherSerializer(read_only=True)
+    teacher = TeacherSummarySerializer(read_only=True)
     teacher_id = serializers.IntegerField(write_only=True)
     percentage = serializers.SerializerMethodField()
 
@@ -108,37 +339,47 @@ class GradeSerializer(serializers.ModelSerializer):
         fields = ['id', 'student', 'student_id', 'subject', 'subject_id', 
                  'teacher', 'teacher_id', 'assignment_name', 'grade', 'max_grade', 
                  'percentage', 'date_assigned', 'date_submitted', 'comments']
+        expandable_fields = {
+            'student': StudentSerializer,
+            'subject': SubjectSerializer,
+            'teacher': TeacherSerializer,
+        }
 
     def get_percentage(self, obj):
         if obj.max_grade > 0:
             return round((obj.grade / obj.max_grade) * 100, 2)
         return 0
 
-class AssignmentSerializer(serializers.ModelSerializer):
-    class_session = ClassSerializer(read_only=True)
+class AssignmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    class_session = ClassSummarySerializer(read_only=True)
     class_id = serializers.IntegerField(write_only=True)
-    teacher = TeacherSerializer(read_only=True)
-    submission_count = serializers.SerializerMethodField()
+    teacher = TeacherSummarySerializer(read_only=True)
 
     class Meta:
         model = Assignment
         fields = ['id', 'title', 'description', 'class_session', 'class_id', 
                  'teacher', 'due_date', 'max_points', 'status', 'submission_count',
-                 'created_at', 'updated_at']
-
-    def get_submission_count(self, obj):
-        return obj.submissions.count()
+                 'late_submission_count', 'created_at', 'updated_at']
+        read_only_fields = ['submission_count', 'late_submission_count']
+        expandable_fields = {
+            'class_session': ClassSerializer,
+            'teacher': TeacherSerializer,
+        }
 
-class SubmissionSerializer(serializers.ModelSerializer):
-    assignment = AssignmentSerializer(read_only=True)
+class SubmissionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    assignment = AssignmentSummarySerializer(read_only=True)
     assignment_id = serializers.IntegerField(write_only=True)
-    student = StudentSerializer(read_only=True)
+    student = StudentSummarySerializer(read_only=True)
     student_id = serializers.IntegerField(write_only=True)
 
     class Meta:
         model = Submission
         fields = ['id', 'assignment', 'assignment_id', 'student', 'student_id', 
                  'content', 'file_attachment', 'submitted_at', 'is_late']
+        expandable_fields = {
+            'assignment': AssignmentSerializer,
+            'student': StudentSerializer,
+        }
 
 class PermissionSerializer(serializers.ModelSerializer):
     class Meta:
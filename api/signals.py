@@ -0,0 +1,381 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .models import (
+    Assignment, Attendance, Class, Grade, Permission, Role, Student, Subject, Submission,
+    Teacher, User
+)
+from .permissions import permission_matrix
+from .analytics import invalidate_term_standings
+from .bitmaps import AttendanceBitmapWriter
+from .dashboard import admin_key, dashboard_cache, invalidate_dashboards, teacher_key
+from .lookup import prefix_index
+from .risk import mark_risk_stale
+from .search import INDEXED_FIELDS, SEARCH_KINDS, reindex_instance, remove_documents
+from .rollups import AttendanceRollupDelta
+from .terms import term_for
+
+
+@receiver(m2m_changed, sender=Class.students.through)
+def update_class_student_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep ``Class.student_count`` in step with roster changes made from
+    either side of the relation (``class.students`` or ``student.classes``).
+    """
+    if action == 'pre_clear' and reverse:
+        instance._cleared_class_ids = list(instance.classes.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        class_ids = [instance.pk]
+    elif action == 'post_clear':
+        class_ids = instance.__dict__.pop('_cleared_class_ids', [])
+    else:
+        class_ids = pk_set
+    if class_ids:
+        Class.objects.filter(pk__in=class_ids).refresh_student_count()
+
+
+@receiver(pre_delete, sender=Student)
+def remember_student_classes(sender, instance, **kwargs):
+    # Roster rows are removed by cascade, which does not send m2m_changed.
+    instance._deleted_class_ids = list(instance.classes.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Student)
+def update_counts_after_student_delete(sender, instance, **kwargs):
+    class_ids = instance.__dict__.pop('_deleted_class_ids', [])
+    if class_ids:
+        Class.objects.filter(pk__in=class_ids).refresh_student_count()
+
+
+@receiver(post_save, sender=Submission)
+@receiver(post_delete, sender=Submission)
+def update_assignment_submission_counts(sender, instance, **kwargs):
+    Assignment.objects.filter(pk=instance.assignment_id).refresh_submission_counts()
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_attendance_state(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._rollup_previous = Attendance.objects.filter(pk=instance.pk).values_list(
+            'student_id', 'class_session_id', 'date', 'status'
+        ).first()
+
+
+@receiver(post_save, sender=Attendance)
+def update_attendance_aggregates(sender, instance, **kwargs):
+    # Bulk writes (roll-call) skip signals and update both themselves.
+    delta = AttendanceRollupDelta()
+    bitmaps = AttendanceBitmapWriter()
+    previous = instance.__dict__.pop('_rollup_previous', None)
+    if previous is not None:
+        delta.add(*previous, sign=-1)
+        bitmaps.clear(*previous[:3])
+    delta.add_row(instance)
+    bitmaps.set_row(instance)
+    delta.apply()
+    bitmaps.apply()
+
+
+@receiver(post_delete, sender=Attendance)
+def update_attendance_aggregates_after_delete(sender, instance, **kwargs):
+    delta = AttendanceRollupDelta()
+    delta.add_row(instance, sign=-1)
+    delta.apply()
+    bitmaps = AttendanceBitmapWriter()
+    bitmaps.clear(instance.student_id, instance.class_session_id, instance.date)
+    bitmaps.apply()
+
+
+@receiver(pre_save, sender=Grade)
+def remember_grade_date(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._previous_date_assigned = Grade.objects.filter(pk=instance.pk).values_list(
+            'date_assigned', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def invalidate_grade_term_standings(sender, instance, **kwargs):
+    dates = {instance.date_assigned, instance.__dict__.pop('_previous_date_assigned', None)}
+    invalidate_term_standings({term_for(date) for date in dates if date is not None})
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Subject)
+@receiver(post_save, sender=Class)
+def invalidate_all_term_standings(sender, **kwargs):
+    # Grade levels, credits and class subjects feed every term's ranks.
+    invalidate_term_standings()
+
+
+@receiver(m2m_changed, sender=Class.students.through)
+def invalidate_standings_after_roster_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_term_standings()
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+@receiver(post_save, sender=Submission)
+@receiver(post_delete, sender=Submission)
+def mark_student_risk_stale(sender, instance, **kwargs):
+    mark_risk_stale([instance.student_id])
+
+
+@receiver(post_save, sender=Assignment)
+def mark_class_risk_stale(sender, instance, **kwargs):
+    # Publishing or rescheduling changes what counts as missing work.
+    mark_risk_stale(Class.students.through.objects.filter(
+        class_id=instance.class_session_id
+    ).values('student_id'))
+
+
+@receiver(m2m_changed, sender=Class.students.through)
+def mark_enrolled_students_risk_stale(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            mark_risk_stale([instance.pk])
+    elif action == 'pre_clear':
+        mark_risk_stale(instance.students.values('pk'))
+    elif action in ('post_add', 'post_remove'):
+        mark_risk_stale(pk_set)
+
+
+ADMIN_DASHBOARD_COUNTERS = {
+    Student: 'total_students',
+    Teacher: 'total_teachers',
+    Class: 'total_classes',
+    Subject: 'total_subjects',
+    User: 'recent_registrations',
+}
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+@receiver(post_save, sender=Class)
+@receiver(post_save, sender=Subject)
+@receiver(post_save, sender=User)
+def count_created_on_admin_dashboard(sender, created, **kwargs):
+    if created:
+        dashboard_cache.adjust(admin_key(), ADMIN_DASHBOARD_COUNTERS[sender], 1)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_delete, sender=Class)
+@receiver(post_delete, sender=Subject)
+def count_deleted_on_admin_dashboard(sender, **kwargs):
+    dashboard_cache.adjust(admin_key(), ADMIN_DASHBOARD_COUNTERS[sender], -1)
+
+
+@receiver(post_save, sender=Class)
+def update_class_teacher_dashboard(sender, instance, created, **kwargs):
+    if created:
+        dashboard_cache.adjust(teacher_key(instance.teacher_id), 'my_classes', 1)
+    else:
+        invalidate_dashboards([instance.teacher_id])
+
+
+@receiver(pre_delete, sender=Class)
+def remember_class_dashboards(sender, instance, **kwargs):
+    # The roster goes with the class without sending m2m_changed.
+    instance._dashboard_student_ids = list(instance.students.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Class)
+def invalidate_deleted_class_dashboards(sender, instance, **kwargs):
+    invalidate_dashboards(
+        [instance.teacher_id], instance.__dict__.pop('_dashboard_student_ids', [])
+    )
+
+
+@receiver(pre_delete, sender=Student)
+def remember_student_teachers(sender, instance, **kwargs):
+    instance._dashboard_teacher_ids = list(
+        instance.classes.values_list('teacher_id', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Student)
+def invalidate_deleted_student_dashboards(sender, instance, **kwargs):
+    invalidate_dashboards(instance.__dict__.pop('_dashboard_teacher_ids', []), [instance.pk])
+
+
+@receiver(m2m_changed, sender=Class.students.through)
+def invalidate_roster_dashboards(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._dashboard_class_ids = list(instance.classes.values_list('pk', flat=True))
+        else:
+            instance._dashboard_student_ids = list(instance.students.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        class_ids = instance.__dict__.pop('_dashboard_class_ids', []) if action == 'post_clear' else pk_set
+        teacher_ids = Class.objects.filter(pk__in=class_ids).values_list('teacher_id', flat=True)
+        invalidate_dashboards(set(teacher_ids), [instance.pk])
+    else:
+        student_ids = instance.__dict__.pop('_dashboard_student_ids', []) if action == 'post_clear' else pk_set
+        invalidate_dashboards([instance.teacher_id], student_ids)
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def invalidate_assignment_dashboards(sender, instance, **kwargs):
+    invalidate_dashboards(
+        [instance.teacher_id],
+        Class.students.through.objects.filter(
+            class_id=instance.class_session_id
+        ).values_list('student_id', flat=True),
+    )
+
+
+def _submission_teacher_id(submission):
+    assignment = submission._state.fields_cache.get('assignment')
+    if assignment is not None:
+        return assignment.teacher_id
+    return Assignment.objects.filter(pk=submission.assignment_id).values_list(
+        'teacher_id', flat=True
+    ).first()
+
+
+@receiver(post_save, sender=Submission)
+def count_submission_on_teacher_dashboard(sender, instance, created, **kwargs):
+    if created:
+        dashboard_cache.adjust(teacher_key(_submission_teacher_id(instance)), 'recent_submissions', 1)
+
+
+@receiver(post_delete, sender=Submission)
+def uncount_submission_on_teacher_dashboard(sender, instance, **kwargs):
+    dashboard_cache.adjust(teacher_key(_submission_teacher_id(instance)), 'recent_submissions', -1)
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def invalidate_student_dashboard(sender, instance, **kwargs):
+    invalidate_dashboards(student_ids=[instance.student_id])
+
+
+@receiver(m2m_changed, sender=Teacher.subjects.through)
+def touch_teachers_after_subject_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # Subjects are rendered with the teacher, so the teacher counts as modified.
+    if action == 'pre_clear' and reverse:
+        instance._cleared_teacher_ids = list(instance.teacher_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        teacher_ids = [instance.pk]
+    elif action == 'post_clear':
+        teacher_ids = instance.__dict__.pop('_cleared_teacher_ids', [])
+    else:
+        teacher_ids = pk_set
+    Teacher.objects.filter(pk__in=teacher_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=User)
+def touch_classes_after_roster_change(sender, instance, created, update_fields, **kwargs):
+    # Enrolled students (and their names) are rendered with each class, so
+    # the class counts as modified. Logins only record last_login.
+    if created or update_fields == {'last_login'}:
+        return
+    lookup = 'students__user' if sender is User else 'students'
+    Class.objects.filter(**{lookup: instance.pk}).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    token_cache.evict(instance.key)
+
+
+@receiver(post_save, sender=User)
+def evict_user_tokens(sender, instance, created, **kwargs):
+    # Covers deactivation and role changes; new users have no token yet.
+    if not created:
+        token_cache.evict_user(instance.pk)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+def evict_profile_owner_tokens(sender, instance, **kwargs):
+    token_cache.evict_user(instance.user_id)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(m2m_changed, sender=Role.permissions.through)
+def invalidate_permission_matrix(sender, **kwargs):
+    permission_matrix.invalidate()
+    # Again once committed, in case another thread compiled the old rows in between.
+    transaction.on_commit(permission_matrix.invalidate)
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+@receiver(post_save, sender=Subject)
+@receiver(post_save, sender=Class)
+@receiver(post_save, sender=Assignment)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    # Partial saves such as ``last_login`` leave the documents unchanged.
+    if update_fields is not None and not INDEXED_FIELDS[sender] & set(update_fields):
+        return
+    reindex_instance(instance)
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_delete, sender=Class)
+@receiver(post_delete, sender=Assignment)
+def remove_from_search_index(sender, instance, **kwargs):
+    # Documents that only read a deleted row are deleted with it by cascade.
+    for kind, search_kind in SEARCH_KINDS.items():
+        if search_kind.model is sender:
+            remove_documents(kind, [instance.pk])
+
+# The type-ahead index lives in process memory, so it is only changed once
+# the write is committed; a rolled back write must not leave entries behind.
+@receiver(post_save, sender=Student)
+def update_student_lookup(sender, instance, **kwargs):
+    transaction.on_commit(partial(prefix_index.refresh, 'student', pk=instance.pk))
+
+@receiver(post_save, sender=Teacher)
+def update_teacher_lookup(sender, instance, **kwargs):
+    transaction.on_commit(partial(prefix_index.refresh, 'teacher', pk=instance.pk))
+
+@receiver(post_save, sender=User)
+def update_user_lookup(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'first_name', 'last_name'} & set(update_fields):
+        return
+    transaction.on_commit(partial(prefix_index.refresh, 'student', user=instance.pk))
+    transaction.on_commit(partial(prefix_index.refresh, 'teacher', user=instance.pk))
+
+@receiver(post_delete, sender=Student)
+def remove_student_lookup(sender, instance, **kwargs):
+    transaction.on_commit(partial(prefix_index.remove, 'student', instance.pk))
+
+@receiver(post_delete, sender=Teacher)
+def remove_teacher_lookup(sender, instance, **kwargs):
+    transaction.on_commit(partial(prefix_index.remove, 'teacher', instance.pk))
@@ -0,0 +1,192 @@
+import datetime
+import json
+import os
+import sys
+from array import array
+from decimal import Decimal
+
+from .models import Attendance, Grade
+from .terms import term_for
+
+EPOCH = datetime.date(1970, 1, 1)
+NULL_DATE = -1
+
+# array typecode -> numpy-compatible little-endian dtype
+DTYPES = {'q': '<i8', 'i': '<i4', 'B': '|u1'}
+
+def _days(value):
+    return NULL_DATE if value is None else (value - EPOCH).days
+
+def _hundredths(value):
+    return int((Decimal(value) * 100).to_integral_value())
+
+class Dataset:
+    """
+    One snapshotted model: the ``values_list`` fields read from it, the
+    date and subject used to partition each row, and its typed columns as
+    ``(name, typecode, converter)``. ``dictionaries`` maps a column to the
+    code list its values are indexes into.
+    """
+    def __init__(self, name, queryset, fields, date_field, subject_field, columns, dictionaries=None):
+        self.name = name
+        self.queryset = queryset
+        self.fields = fields
+        self.date_field = date_field
+        self.subject_field = subject_field
+        self.columns = columns
+        self.dictionaries = dictionaries or {}
+
+ATTENDANCE_STATUSES = [code for code, _ in Attendance.Status.choices]
+
+DATASETS = {
+    'attendance': Dataset(
+        'attendance',
+        Attendance.objects.all(),
+        ('id', 'student_id', 'class_session_id', 'class_session__subject_id',
+         'date', 'status', 'marked_by_id'),
+        date_field='date',
+        subject_field='class_session__subject_id',
+        columns=[
+            ('id', 'q', int),
+            ('student_id', 'i', int),
+            ('class_id', 'i', int),
+            ('date', 'i', _days),
+            ('status', 'B', ATTENDANCE_STATUSES.index),
+            ('marked_by_id', 'i', int),
+        ],
+        dictionaries={'status': ATTENDANCE_STATUSES},
+    ),
+    'grade': Dataset(
+        'grade',
+        Grade.objects.all(),
+        ('id', 'student_id', 'teacher_id', 'subject_id', 'date_assigned',
+         'date_submitted', 'grade', 'max_grade'),
+        date_field='date_assigned',
+        subject_field='subject_id',
+        columns=[
+            ('id', 'q', int),
+            ('student_id', 'i', int),
+            ('teacher_id', 'i', int),
+            ('date_assigned', 'i', _days),
+            ('date_submitted', 'i', _days),
+            ('grade_hundredths', 'i', _hundredths),
+            ('max_grade_hundredths', 'i', _hundredths),
+        ],
+    ),
+}
+
+class Partition:
+    """
+    Buffered append-only writer for ``<dataset>/term=<term>/subject=<id>/``.
+    Each column is a headerless little-endian file ``<column>.bin``;
+    ``_meta.json`` records the dtypes, dictionaries, the number of committed
+    rows and the highest id written. On open, column files are truncated to
+    the committed row count, so rows from an interrupted run are discarded.
+    """
+    def __init__(self, path, dataset):
+        self.path = path
+        self.dataset = dataset
+        self.meta_path = os.path.join(path, '_meta.json')
+        os.makedirs(path, exist_ok=True)
+        self.meta = {'rows': 0, 'max_id': 0}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as fh:
+                self.meta = json.load(fh)
+        for name, typecode, _ in dataset.columns:
+            column_path = self._column_path(name)
+            with open(column_path, 'ab') as fh:
+                fh.truncate(self.meta['rows'] * array(typecode).itemsize)
+        self.buffers = {name: array(typecode) for name, typecode, _ in dataset.columns}
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f'{name}.bin')
+
+    def append(self, row_id, values):
+        if row_id <= self.meta['max_id']:
+            return False
+        for (name, _, convert), value in zip(self.dataset.columns, values):
+            self.buffers[name].append(convert(value))
+        self.meta['max_id'] = row_id
+        return True
+
+    def pending(self):
+        return len(self.buffers['id'])
+
+    def flush(self):
+        pending = self.pending()
+        if not pending:
+            return
+        for name, buffer in self.buffers.items():
+            if sys.byteorder != 'little':
+                buffer.byteswap()
+            with open(self._column_path(name), 'ab') as fh:
+                buffer.tofile(fh)
+            del buffer[:]
+        self.meta.update(
+            rows=self.meta['rows'] + pending,
+            columns={name: DTYPES[typecode] for name, typecode, _ in self.dataset.columns},
+            dictionaries=self.dataset.dictionaries,
+        )
+        tmp_path = f'{self.meta_path}.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump(self.meta, fh)
+        os.replace(tmp_path, self.meta_path)
+
+class SnapshotWriter:
+    """
+    Appends ``Grade`` and ``Attendance`` rows created since the last run to
+    a columnar snapshot under ``root``, partitioned by term and subject.
+    The watermark is the highest primary key exported per dataset, kept in
+    ``root/_watermark.json``; edits to rows below it are only picked up by
+    a full rebuild.
+    """
+    def __init__(self, root, chunk_size=5000):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.watermark_path = os.path.join(root, '_watermark.json')
+
+    def read_watermark(self):
+        if not os.path.exists(self.watermark_path):
+            return {}
+        with open(self.watermark_path) as fh:
+            return json.load(fh)
+
+    def write_watermark(self, watermark):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f'{self.watermark_path}.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump(watermark, fh)
+        os.replace(tmp_path, self.watermark_path)
+
+    def run(self, names=None):
+        watermark = self.read_watermark()
+        written = {}
+        for name in names or DATASETS:
+            dataset = DATASETS[name]
+            written[name], watermark[name] = self.write_dataset(dataset, watermark.get(name, 0))
+            self.write_watermark(watermark)
+        return written
+
+    def write_dataset(self, dataset, since_id):
+        partitions = {}
+        written, last_id = 0, since_id
+        date_index = dataset.fields.index(dataset.date_field)
+        subject_index = dataset.fields.index(dataset.subject_field)
+        rows = dataset.queryset.filter(pk__gt=since_id).order_by('pk').values_list(*dataset.fields)
+        for row in rows.iterator(chunk_size=self.chunk_size):
+            key = (term_for(row[date_index]), row[subject_index])
+            partition = partitions.get(key)
+            if partition is None:
+                path = os.path.join(
+                    self.root, dataset.name, f'term={key[0]}', f'subject={key[1]}'
+                )
+                partition = partitions[key] = Partition(path, dataset)
+            values = [value for index, value in enumerate(row) if index != subject_index]
+            if partition.append(row[0], values):
+                written += 1
+                if partition.pending() >= self.chunk_size:
+                    partition.flush()
+            last_id = row[0]
+        for partition in partitions.values():
+            partition.flush()
+        return written, last_id
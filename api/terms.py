@@ -0,0 +1,41 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def as_date(value):
+    """
+    The date a ``DateField`` stores for ``value``: fields defaulting to
+    ``timezone.now`` hold a datetime until the row is read back.
+    """
+    if isinstance(value, datetime.datetime):
+        if settings.USE_TZ and timezone.is_aware(value):
+            value = timezone.make_naive(value, timezone.get_default_timezone())
+        return value.date()
+    return value
+
+def term_start_months():
+    return settings.ACADEMIC_TERM_START_MONTHS
+
+def term_for(date):
+    """Label of the academic term containing ``date``, e.g. ``"2025-T3"``."""
+    months = term_start_months()
+    if date.month < months[0]:
+        return f'{date.year - 1}-T{len(months)}'
+    number = sum(1 for month in months if month <= date.month)
+    return f'{date.year}-T{number}'
+
+def term_bounds(term):
+    """Inclusive ``(first_day, last_day)`` of a term label from ``term_for``."""
+    months = term_start_months()
+    year, number = term.split('-T')
+    year, index = int(year), int(number) - 1
+    if not 0 <= index < len(months):
+        raise ValueError(f"Unknown term: {term}")
+    start = datetime.date(year, months[index], 1)
+    if index + 1 < len(months):
+        end = datetime.date(year, months[index + 1], 1)
+    else:
+        end = datetime.date(year + 1, months[0], 1)
+    return start, end - datetime.timedelta(days=1)
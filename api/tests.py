@@ -1,3 +1,1171 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import re
+import runpy
+import shutil
+import tempfile
+from array import array
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, router, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .authentication import ProfileTokenAuthentication, get_request_profile, get_role_profile, token_cache
+from .bitmaps import rebuild_attendance_bitmaps
+from .dashboard import dashboard_cache
+from .db import configure_sqlite, serialized_write
+from .importers import BulkUserImporter, iter_rows
+from .models import (
+    Assignment, Attendance, AttendanceBitmap, Class, ClassAttendanceRollup, Grade, Student, StudentAttendanceRollup,
+    StudentRiskScore, Subject, Submission, Teacher, User,
+)
+from .lookup import prefix_index
+from .permissions import PermissionMatrix
+from .risk import RiskScorer, students_to_rescore
+from .rollups import AttendanceRollupDelta, rebuild_attendance_rollups
+from .routers import choose_replica, pin_to_primary, primary_reads, request_routing
+from .snapshots import DTYPES, EPOCH, NULL_DATE, SnapshotWriter
+from .terms import term_for
+
+
+class SchoolTestCase(TestCase):
+    """An admin and a teacher whose class has five enrolled students."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role=User.Roles.ADMIN)
+        teacher_user = User.objects.create_user(
+            'teacher', password='x', role=User.Roles.TEACHER, first_name='Ada', last_name='Byron',
+        )
+        cls.teacher = Teacher.objects.create(user=teacher_user, employee_id='T1', department='Science')
+        cls.subject = Subject.objects.create(name='Physics', code='PHY', credits=3)
+        cls.class_obj = Class.objects.create(
+            name='PHY-10', subject=cls.subject, teacher=cls.teacher, room_number='101', max_capacity=30,
+        )
+        cls.students = [cls.create_student(number) for number in range(5)]
+        cls.class_obj.students.add(*cls.students)
+
+    @staticmethod
+    def create_student(number, grade_level='10'):
+        user = User.objects.create_user(
+            f'student{number}', password='x', role=User.Roles.STUDENT,
+            first_name=f'Student{number}', last_name='Test',
+        )
+        return Student.objects.create(user=user, student_id=f'S{number:03}', grade_level=grade_level)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    @staticmethod
+    def run_migration(migration, function):
+        """Run a data migration's ``function`` against the current rows."""
+        state = MigrationLoader(connection).project_state(('api', migration))
+        getattr(import_module(f'api.migrations.{migration}'), function)(
+            state.apps, mock.Mock(connection=connection)
+        )
+
+
+class RollCallTests(SchoolTestCase):
+    def roll_call(self, records, date='2025-03-03'):
+        return self.client_for(self.teacher.user).post(
+            f'/api/classes/{self.class_obj.pk}/attendance/bulk/',
+            {'date': date, 'records': records}, format='json',
+        )
+
+    def test_second_roll_call_updates_the_same_rows(self):
+        first = self.roll_call([{'student_id': student.pk, 'status': 'P'} for student in self.students])
+        self.assertEqual((first.data['created'], first.data['updated']), (5, 0))
+
+        second = self.roll_call([
+            {'student_id': self.students[0].pk, 'status': 'A', 'notes': 'Sick'},
+            {'student_id': self.students[1].pk, 'status': 'L'},
+        ])
+        self.assertEqual((second.data['created'], second.data['updated']), (0, 2))
+        self.assertEqual([result['result'] for result in second.data['results']], ['updated', 'updated'])
+        rows = Attendance.objects.filter(class_session=self.class_obj, date='2025-03-03')
+        self.assertEqual(rows.count(), 5)
+        self.assertEqual(rows.get(student=self.students[0]).status, 'A')
+        self.assertEqual(rows.get(student=self.students[0]).notes, 'Sick')
+        self.assertEqual(rows.get(student=self.students[2]).status, 'P')
+
+    def test_unenrolled_and_duplicate_entries_are_reported(self):
+        outsider = self.create_student(99)
+        response = self.roll_call([
+            {'student_id': self.students[0].pk, 'status': 'P'},
+            {'student_id': self.students[0].pk, 'status': 'A'},
+            {'student_id': outsider.pk, 'status': 'P'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['errors']), (1, 2))
+        self.assertEqual(
+            [result.get('error') for result in response.data['results']],
+            [None, 'Duplicate entry for this student', 'Student is not enrolled in this class'],
+        )
+        self.assertFalse(Attendance.objects.filter(student=outsider).exists())
+        self.assertEqual(Attendance.objects.get(student=self.students[0]).status, 'P')
+
+
+class BulkEnrollmentTests(SchoolTestCase):
+    def post(self, action, data):
+        return self.client_for(self.teacher.user).post(
+            f'/api/classes/{self.class_obj.pk}/{action}/', data, format='json',
+        )
+
+    def test_enrollment_stops_at_capacity(self):
+        Class.objects.filter(pk=self.class_obj.pk).update(max_capacity=6)
+        newcomers = [self.create_student(number) for number in range(10, 13)]
+        response = self.post('enroll_students', {
+            'student_ids': [self.students[0].pk] + [student.pk for student in newcomers] + [0],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['enrolled'], response.data['capacity_remaining']), (1, 0))
+        self.assertEqual(
+            [result['result'] for result in response.data['results']],
+            ['already_enrolled', 'enrolled', 'over_capacity', 'over_capacity', 'not_found'],
+        )
+        self.class_obj.refresh_from_db()
+        self.assertEqual(self.class_obj.student_count, 6)
+        self.assertEqual(self.class_obj.students.count(), 6)
+
+    def test_counters_are_backfilled(self):
+        # The state right after 0002_counters: existing rows, zero counters.
+        assignment = Assignment.objects.create(
+            title='Homework', description='', class_session=self.class_obj, teacher=self.teacher,
+            due_date=timezone.now(),
+        )
+        Submission.objects.create(assignment=assignment, student=self.students[0], content='-')
+        Submission.objects.create(assignment=assignment, student=self.students[1], content='-', is_late=True)
+        Class.objects.update(student_count=0)
+        Assignment.objects.update(submission_count=0, late_submission_count=0)
+
+        self.run_migration('0012_backfill_counters', 'backfill_counters')
+        self.class_obj.refresh_from_db()
+        self.assertEqual(self.class_obj.student_count, 5)
+        assignment.refresh_from_db()
+        self.assertEqual((assignment.submission_count, assignment.late_submission_count), (2, 1))
+
+    def test_grade_level_enrollment_and_removal(self):
+        newcomers = [self.create_student(number, grade_level='11') for number in range(10, 12)]
+        response = self.post('enroll_students', {'grade_level': '11'})
+        self.assertEqual(response.data['enrolled'], 2)
+
+        response = self.post('remove_students', {
+            'student_ids': [newcomers[0].pk, self.create_student(20).pk],
+        })
+        self.assertEqual(response.data['removed'], 1)
+        self.assertEqual(
+            [result['result'] for result in response.data['results']], ['removed', 'not_enrolled']
+        )
+        self.class_obj.refresh_from_db()
+        self.assertEqual(self.class_obj.student_count, 6)
+
+    def test_single_enrollment_refuses_a_full_class(self):
+        Class.objects.filter(pk=self.class_obj.pk).update(max_capacity=5)
+        response = self.post('enroll_student', {'student_id': self.create_student(10).pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.class_obj.students.count(), 5)
+
+
+class UserImportTests(SchoolTestCase):
+    CSV = (
+        'username,email,password,student_id,grade_level\n'
+        'new1,new1@example.com,Fresh-Pass-1,S100,10\n'
+        'student0,dup@example.com,Hunter2-Secret,S101,10\n'
+        'new2,not-an-email,Another-Secret-3,S102,10\n'
+    )
+
+    def test_rejected_rows_never_report_passwords(self):
+        upload = SimpleUploadedFile('students.csv', self.CSV.encode())
+        response = self.client_for(self.admin).post(
+            '/api/import/users/', {'file': upload, 'kind': 'student'}, format='multipart',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 2))
+        self.assertEqual({error['row']['username'] for error in response.data['errors']}, {'student0', 'new2'})
+        self.assertNotIn(b'Secret', response.content)
+
+        with tempfile.TemporaryDirectory() as directory:
+            error_path = os.path.join(directory, 'errors.jsonl')
+            BulkUserImporter('student', error_path=error_path).run(
+                iter_rows(io.StringIO(self.CSV), 'csv')
+            )
+            with open(error_path) as fh:
+                report = fh.read()
+        self.assertEqual(len(report.splitlines()), 3)
+        self.assertNotIn('password', report)
+        self.assertNotIn('Secret', report)
+
+    def test_import_refreshes_the_admin_dashboard(self):
+        client = self.client_for(self.admin)
+        before = client.get('/api/dashboard/').data
+        BulkUserImporter('student').run(iter_rows(io.StringIO(self.CSV), 'csv'))
+        after = client.get('/api/dashboard/').data
+        self.assertEqual(after['total_students'], before['total_students'] + 1)
+        self.assertEqual(after['recent_registrations'], before['recent_registrations'] + 1)
+
+
+class StreamingExportTests(SchoolTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        other_user = User.objects.create_user('other', password='x', role=User.Roles.TEACHER)
+        cls.other_teacher = Teacher.objects.create(user=other_user, employee_id='T2', department='Arts')
+        other_subject = Subject.objects.create(name='Art', code='ART', credits=1)
+        other_class = Class.objects.create(
+            name='ART-10', subject=other_subject, teacher=cls.other_teacher, max_capacity=30,
+        )
+        other_class.students.add(cls.students[0])
+        today = timezone.localdate()
+        for student in cls.students:
+            Grade.objects.create(
+                student=student, subject=cls.subject, teacher=cls.teacher,
+                assignment_name='Quiz', grade=80, date_assigned=today,
+            )
+            Attendance.objects.create(
+                student=student, class_session=cls.class_obj, marked_by=cls.teacher.user, date=today,
+                status='A' if student in cls.students[:2] else 'P',
+            )
+        Grade.objects.create(
+            student=cls.students[0], subject=other_subject, teacher=cls.other_teacher,
+            assignment_name='Sketch', grade=90, date_assigned=today,
+        )
+        Attendance.objects.create(
+            student=cls.students[0], class_session=other_class, marked_by=other_user, date=today, status='A',
+        )
+
+    def export(self, user, url):
+        response = self.client_for(user).get(url)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_exports_are_scoped_like_the_list(self):
+        own = self.export(self.students[0].user, '/api/grades/export/?export_format=jsonl')
+        rows = [json.loads(line) for line in own.splitlines()]
+        self.assertEqual(sorted(row['assignment_name'] for row in rows), ['Quiz', 'Sketch'])
+        self.assertEqual({row['student_id'] for row in rows}, {self.students[0].pk})
+
+        taught = list(csv.reader(io.StringIO(self.export(self.teacher.user, '/api/grades/export/'))))
+        self.assertEqual(taught[0][:3], ['id', 'student_id', 'student__student_id'])
+        self.assertEqual(len(taught) - 1, 5)
+        self.assertEqual({row[5] for row in taught[1:]}, {str(self.teacher.pk)})
+
+    def test_exports_apply_the_list_filters(self):
+        absent = self.export(self.admin, '/api/attendance/export/?export_format=jsonl&status=A')
+        self.assertEqual(len(absent.splitlines()), 3)
+        absent = self.export(
+            self.other_teacher.user, '/api/attendance/export/?export_format=jsonl&status=A'
+        )
+        self.assertEqual([json.loads(line)['class_session__name'] for line in absent.splitlines()], ['ART-10'])
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client_for(self.admin).get('/api/grades/export/?export_format=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class AttendanceRollupTests(SchoolTestCase):
+    def rollups(self):
+        counts = ('present', 'absent', 'late', 'excused')
+        students = StudentAttendanceRollup.objects.values_list(
+            'student_id', 'class_session_id', 'period_kind', 'period', *counts
+        )
+        classes = ClassAttendanceRollup.objects.values_list(
+            'class_session_id', 'period_kind', 'period', *counts
+        )
+        # Rows decremented back to zero are kept; a rebuild does not create them.
+        return (
+            sorted(row for row in students if any(row[4:])),
+            sorted(row for row in classes if any(row[3:])),
+        )
+
+    def test_rollups_match_a_rebuild_after_changes(self):
+        monday = datetime.date(2025, 3, 3)
+        rows = [
+            Attendance.objects.create(
+                student=student, class_session=self.class_obj, marked_by=self.teacher.user,
+                date=monday, status='P',
+            )
+            for student in self.students
+        ]
+        rows[0].status = 'A'
+        rows[0].save()
+        rows[1].date = monday + datetime.timedelta(days=1)
+        rows[1].save()
+        rows[2].delete()
+
+        day = self.client_for(self.admin).get(
+            f'/api/classes/{self.class_obj.pk}/attendance/summary/?date=2025-03-03'
+        )
+        self.assertEqual((day.data['present'], day.data['absent']), (2, 1))
+        incremental = self.rollups()
+        rebuild_attendance_rollups()
+        self.assertEqual(incremental, self.rollups())
+
+    def test_attendance_recorded_before_the_rollups_is_backfilled(self):
+        for student in self.students[:3]:
+            Attendance.objects.create(
+                student=student, class_session=self.class_obj, marked_by=self.teacher.user,
+                date=datetime.date(2025, 3, 3), status='L',
+            )
+        expected = self.rollups()
+        # The state right after 0004_attendance_rollups: attendance, no rollups.
+        StudentAttendanceRollup.objects.all().delete()
+        ClassAttendanceRollup.objects.all().delete()
+
+        self.run_migration('0013_backfill_attendance_rollups', 'backfill_attendance_rollups')
+        self.assertEqual(self.rollups(), expected)
+        self.assertIn((self.class_obj.pk, ClassAttendanceRollup.PeriodKind.ALL, '', 0, 0, 3, 0), expected[1])
+
+    def test_datetime_dates_are_keyed_by_day(self):
+        delta = AttendanceRollupDelta()
+        moment = datetime.datetime(2025, 3, 3, 23, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+        delta.add(self.students[0].pk, self.class_obj.pk, moment, 'P')
+        self.assertIn(
+            (self.class_obj.pk, ClassAttendanceRollup.PeriodKind.DAY, '2025-03-03'), delta.classes
+        )
+
+
+class AttendanceBitmapTests(SchoolTestCase):
+    def bitmaps(self):
+        return sorted(AttendanceBitmap.objects.values_list(
+            'student_id', 'class_session_id', 'term', 'recorded', 'low', 'high'
+        ))
+
+    def mark(self, student, date, status):
+        return Attendance.objects.create(
+            student=student, class_session=self.class_obj, marked_by=self.teacher.user,
+            date=date, status=status,
+        )
+
+    def test_attendance_recorded_before_the_bitmaps_is_backfilled(self):
+        monday = datetime.date(2025, 3, 3)
+        for offset, status in enumerate('PAL'):
+            self.mark(self.students[0], monday + datetime.timedelta(days=offset), status)
+        self.mark(self.students[1], monday, 'E')
+        expected = self.bitmaps()
+        # The state right after 0005_attendance_bitmaps: attendance, no bitmaps.
+        AttendanceBitmap.objects.all().delete()
+
+        self.run_migration('0014_backfill_attendance_bitmaps', 'backfill_attendance_bitmaps')
+        self.assertEqual(len(expected), 2)
+        self.assertEqual(self.bitmaps(), expected)
+
+    def test_row_with_the_default_date_is_counted_today(self):
+        row = Attendance.objects.create(
+            student=self.students[0], class_session=self.class_obj, marked_by=self.teacher.user,
+            status='A',
+        )
+        today = timezone.localdate()
+        response = self.client_for(self.admin).get(
+            f'/api/attendance/day-counts/?start={today}&end={today}'
+        )
+        self.assertEqual(response.data['results'], [{'student_id': self.students[0].pk, 'days': 1}])
+        summary = self.client_for(self.admin).get(
+            f'/api/classes/{self.class_obj.pk}/attendance/summary/?date={today}'
+        )
+        self.assertEqual(summary.data['absent'], 1)
+        row.delete()
+        self.assertEqual(AttendanceBitmap.objects.get().recorded, b'')
+
+    def test_streaks_and_counts_follow_changes(self):
+        monday = datetime.date(2025, 3, 3)
+        student = self.students[0]
+        for offset in range(5):
+            self.mark(student, monday + datetime.timedelta(days=offset), 'A' if offset != 2 else 'P')
+        self.mark(self.students[1], monday, 'A')
+        # Days without a record do not break a run; a present day does.
+        Attendance.objects.get(student=student, date=monday + datetime.timedelta(days=2)).delete()
+
+        client = self.client_for(self.admin)
+        window = 'start=2025-03-01&end=2025-03-31'
+        streaks = client.get(f'/api/attendance/streaks/?{window}').data['results']
+        self.assertEqual(
+            [(entry['student_id'], entry['days'], entry['start'], entry['end']) for entry in streaks],
+            [(student.pk, 4, monday, monday + datetime.timedelta(days=4))],
+        )
+        counts = client.get(f'/api/attendance/day-counts/?{window}&min_days=2').data['results']
+        self.assertEqual(counts, [{'student_id': student.pk, 'days': 4}])
+
+        incremental = self.bitmaps()
+        rebuild_attendance_bitmaps()
+        self.assertEqual(incremental, self.bitmaps())
+
+
+class GradebookTests(SchoolTestCase):
+    def grade(self, student, name, grade, date, subject=None):
+        Grade.objects.create(
+            student=student, subject=subject or self.subject, teacher=self.teacher,
+            assignment_name=name, grade=grade, max_grade=100, date_assigned=date,
+        )
+
+    def test_gradebook_covers_the_requested_term(self):
+        history = Subject.objects.create(name='History', code='HIS', credits=1)
+        first, second = self.students[:2]
+        self.grade(first, 'Quiz 1', 80, datetime.date(2025, 2, 3))
+        self.grade(first, 'Quiz 2', 60, datetime.date(2025, 3, 3))
+        self.grade(second, 'Quiz 1', 90, datetime.date(2025, 2, 3))
+        self.grade(first, 'Essay', 100, datetime.date(2025, 3, 5), subject=history)
+        # Earlier term: neither a column nor part of any average.
+        self.grade(first, 'Old test', 0, datetime.date(2024, 10, 1))
+        self.grade(first, 'Old essay', 0, datetime.date(2024, 10, 1), subject=history)
+
+        response = self.client_for(self.teacher.user).get(
+            f'/api/classes/{self.class_obj.pk}/gradebook/?term=2025-T1'
+        )
+        self.assertEqual(response.status_code, 200)
+        gradebook = response.data
+        self.assertEqual(gradebook['term'], '2025-T1')
+        self.assertEqual(gradebook['assignments'], ['Quiz 1', 'Quiz 2'])
+        self.assertEqual(gradebook['matrix'][:2], [[80.0, 60.0], [90.0, None]])
+        self.assertEqual(gradebook['averages'][:3], [70.0, 90.0, None])
+        # Physics (3 credits) at 70% and History (1 credit) at 100%.
+        self.assertEqual(gradebook['weighted_averages'][:3], [77.5, 90.0, None])
+        self.assertEqual(gradebook['assignment_stats']['count'], [2, 1])
+
+
+class TermStandingsTests(SchoolTestCase):
+    TERM = '2025-T1'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.grades = [
+            Grade.objects.create(
+                student=student, subject=cls.subject, teacher=cls.teacher, assignment_name='Exam',
+                grade=grade, max_grade=100, date_assigned=datetime.date(2025, 2, 3),
+            )
+            for student, grade in zip(cls.students, [95, 85, 85, 65])
+        ]
+        Student.objects.filter(pk=cls.students[3].pk).update(grade_level='11')
+
+    def standing(self, student):
+        response = self.client_for(self.admin).get(
+            f'/api/students/{student.pk}/standing/?term={self.TERM}'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_gpa_and_ranks_share_ties(self):
+        first, second, third = (self.standing(student) for student in self.students[:3])
+        self.assertEqual([first['gpa'], second['gpa']], ['4.00', '3.00'])
+        self.assertEqual(
+            [(data['grade_level_rank'], data['grade_level_size']) for data in (first, second, third)],
+            [(1, 3), (2, 3), (2, 3)],
+        )
+        # Grade 11 is ranked on its own.
+        self.assertEqual(self.standing(self.students[3])['grade_level_rank'], 1)
+        self.assertIsNone(self.standing(self.students[4])['gpa'])
+
+        response = self.client_for(self.teacher.user).get(
+            f'/api/classes/{self.class_obj.pk}/rankings/?term={self.TERM}'
+        )
+        self.assertEqual(
+            [(row['student']['id'], row['rank'], row['size']) for row in response.data['results']],
+            [(self.students[0].pk, 1, 4), (self.students[1].pk, 2, 4),
+             (self.students[2].pk, 2, 4), (self.students[3].pk, 4, 4)],
+        )
+
+    def test_grade_changes_refresh_the_standings(self):
+        self.assertEqual(self.standing(self.students[2])['grade_level_rank'], 2)
+        grade = self.grades[2]
+        grade.grade = 99
+        grade.save()
+        self.assertEqual(self.standing(self.students[2])['grade_level_rank'], 1)
+        self.assertEqual(self.standing(self.students[0])['grade_level_rank'], 1)
+        self.assertEqual(self.standing(self.students[1])['grade_level_rank'], 3)
+
+        # Moving a grade to another term takes it out of this one.
+        grade.date_assigned = datetime.date(2025, 6, 2)
+        grade.save()
+        self.assertIsNone(self.standing(self.students[2])['gpa'])
+
+
+class SearchIndexTests(SchoolTestCase):
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('The full-text index is SQLite only')
+
+    def search(self, q, user=None):
+        response = self.client_for(user or self.admin).get('/api/search/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [(hit['type'], hit['id']) for hit in response.data['results']]
+
+    def test_rows_created_before_the_index_are_backfilled(self):
+        # The state right after 0010_search_index: existing rows, empty index.
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM api_search_index')
+        self.assertEqual(self.search('Student3'), [])
+
+        self.run_migration('0011_backfill_search_index', 'backfill_search_index')
+        self.assertIn(('student', self.students[3].pk), self.search('Student3'))
+        response = self.client_for(self.admin).get('/api/classes/', {'search': 'PHY'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.class_obj.pk])
+
+    def test_changes_are_searchable_at_once(self):
+        user = self.students[0].user
+        user.first_name = 'Grace'
+        user.save()
+        self.assertIn(('student', self.students[0].pk), self.search('grace'))
+        user.first_name = 'Ada'
+        user.save(update_fields=['first_name'])
+        self.assertEqual(self.search('grace'), [])
+
+        # Renaming the teacher rewrites the class documents that mention them.
+        teacher_user = self.teacher.user
+        teacher_user.last_name = 'Lovelace'
+        teacher_user.save()
+        self.assertIn(('class', self.class_obj.pk), self.search('lovelace'))
+
+        assignment = Assignment.objects.create(
+            title='Pendulum lab', description='', class_session=self.class_obj, teacher=self.teacher,
+            due_date=timezone.now(),
+        )
+        self.assertEqual(self.search('pendulum'), [('assignment', assignment.pk)])
+        # Students only find what their own lists show: drafts are hidden.
+        self.assertEqual(self.search('pendulum', user=self.students[1].user), [])
+
+        assignment.delete()
+        self.assertEqual(self.search('pendulum'), [])
+
+
+class LookupTests(SchoolTestCase):
+    def setUp(self):
+        # The index outlives each test's rolled back transaction.
+        prefix_index.invalidate()
+        self.addCleanup(prefix_index.invalidate)
+
+    def lookup(self, q, **params):
+        response = self.client_for(self.teacher.user).get('/api/lookup/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(hit['type'], hit['id']) for hit in response.data['results']]
+
+    def test_prefixes_of_names_and_numbers(self):
+        self.assertEqual(self.lookup('byr'), [('teacher', self.teacher.pk)])
+        self.assertEqual(self.lookup('student3 te'), [('student', self.students[3].pk)])
+        self.assertEqual(self.lookup('s00', types='student', limit=2), [
+            ('student', self.students[0].pk), ('student', self.students[1].pk),
+        ])
+        self.assertEqual(self.lookup('t', types='teacher'), [('teacher', self.teacher.pk)])
+        response = self.client_for(self.teacher.user).get('/api/lookup/', {'q': 'x', 'types': 'class'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client_for(self.students[0].user).get('/api/lookup/', {'q': 'byr'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_committed_changes_are_found_at_once(self):
+        self.assertEqual(self.lookup('grace'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            user = self.students[0].user
+            user.first_name = 'Grace'
+            user.save()
+            newcomer = self.create_student(50)
+            self.students[1].delete()
+        self.assertEqual(self.lookup('grace'), [('student', self.students[0].pk)])
+        self.assertEqual(self.lookup('s050'), [('student', newcomer.pk)])
+        self.assertEqual(self.lookup('s001'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BulkUserImporter('teacher').run(iter_rows(io.StringIO(
+                'username,first_name,last_name,employee_id,department\n'
+                'hopper,Grace,Hopper,T9,Computing\n'
+            ), 'csv'))
+        self.assertEqual(sorted(kind for kind, _ in self.lookup('grace')), ['student', 'teacher'])
+
+    def test_rolled_back_changes_are_not_indexed(self):
+        self.lookup('student')
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                user = self.students[0].user
+                user.first_name = 'Phantom'
+                user.save()
+                raise RuntimeError
+        self.assertEqual(self.lookup('phantom'), [])
+
+
+class SparseFieldsetTests(SchoolTestCase):
+    def get(self, url, params):
+        response = self.client_for(self.admin).get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['results']
+
+    def test_fields_trim_top_level_and_nested_output(self):
+        rows = self.get('/api/students/', {'fields': 'id,student_id'})
+        self.assertEqual(len(rows), 5)
+        self.assertEqual({tuple(row) for row in rows}, {('id', 'student_id')})
+
+        Attendance.objects.create(
+            student=self.students[0], class_session=self.class_obj,
+            date=datetime.date(2025, 3, 3), marked_by=self.teacher.user,
+        )
+        [row] = self.get('/api/attendance/', {'fields': 'id,student.name'})
+        self.assertEqual(set(row), {'id', 'student'})
+        self.assertEqual(row['student'], {'name': 'Student0 Test'})
+
+    def test_local_fields_do_not_join_relations(self):
+        Attendance.objects.create(
+            student=self.students[0], class_session=self.class_obj,
+            date=datetime.date(2025, 3, 3), marked_by=self.teacher.user,
+        )
+        for url, fields, table in [
+            ('/api/attendance/', 'id,status', 'api_attendance'),
+            ('/api/students/', 'id,student_id', 'api_student'),
+        ]:
+            with CaptureQueriesContext(connection) as queries:
+                rows = self.get(url, {'fields': fields})
+            self.assertEqual({tuple(row) for row in rows}, {tuple(fields.split(','))})
+            [page_query] = [
+                query['sql'] for query in queries.captured_queries
+                if re.match(rf'SELECT .* FROM "{table}"', query['sql'])
+                and 'COUNT(' not in query['sql']
+            ]
+            self.assertNotIn('JOIN', page_query, url)
+
+    def test_relations_render_summaries_until_expanded(self):
+        [row] = self.get('/api/classes/', {})
+        self.assertEqual(set(row['teacher']), {'id', 'employee_id', 'name'})
+        [row] = self.get('/api/classes/', {'expand': 'teacher'})
+        self.assertEqual(row['teacher']['department'], 'Science')
+        self.assertEqual(row['teacher']['user']['username'], 'teacher')
+
+    def test_unknown_expand_is_rejected(self):
+        client = self.client_for(self.admin)
+        for expand in ('bogus', 'teacher.bogus', 'students.user.bogus'):
+            response = client.get('/api/classes/', {'expand': expand})
+            self.assertEqual(response.status_code, 400, expand)
+            self.assertIn(expand, response.data['expand'][0])
+        response = client.get('/api/classes/', {'expand': 'subject,teacher.subjects'})
+        self.assertEqual(response.status_code, 200)
+
+
+class ListQueryCountTests(SchoolTestCase):
+    """
+    Listing classes and assignments costs the same number of queries
+    whatever the number of rows on the page.
+    """
+    def add_classes(self, count):
+        for _ in range(count):
+            number = Teacher.objects.count() + 1
+            user = User.objects.create_user(f'teacher{number}', password='x', role=User.Roles.TEACHER)
+            teacher = Teacher.objects.create(user=user, employee_id=f'T{number}', department='Science')
+            subject = Subject.objects.create(name=f'Subject {number}', code=f'S{number}')
+            class_obj = Class.objects.create(name=f'C-{number}', teacher=teacher, subject=subject)
+            class_obj.students.add(*self.students)
+            Assignment.objects.create(
+                title=f'Homework {number}', description='-', class_session=class_obj,
+                teacher=teacher, due_date=timezone.now(), status=Assignment.Status.PUBLISHED,
+            )
+
+    def assert_constant_queries(self, url, params):
+        client = self.client_for(self.admin)
+        self.add_classes(2)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.add_classes(6)
+        with self.assertNumQueries(len(queries)):
+            response = client.get(url, params)
+        self.assertGreaterEqual(len(response.data['results']), 8)
+
+    def test_class_list(self):
+        self.assert_constant_queries('/api/classes/', {})
+        self.assert_constant_queries('/api/classes/', {'expand': 'teacher,subject,students'})
+
+    def test_assignment_list(self):
+        self.assert_constant_queries('/api/assignments/', {})
+        self.assert_constant_queries('/api/assignments/', {'expand': 'class_session,teacher'})
+
+
+class TokenAuthenticationTests(SchoolTestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+
+    def token_client(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}')
+        return client
+
+    def test_profile_is_loaded_with_the_token(self):
+        token = Token.objects.create(user=self.teacher.user)
+        with self.assertNumQueries(1):
+            user, _ = ProfileTokenAuthentication().authenticate_credentials(token.key)
+            self.assertEqual(get_role_profile(user), self.teacher)
+
+        student_token = Token.objects.create(user=self.students[0].user)
+        admin_token = Token.objects.create(user=self.admin)
+        orphan = User.objects.create_user('orphan', password='x', role=User.Roles.TEACHER)
+        orphan_token = Token.objects.create(user=orphan)
+        for key, profile in [
+            (student_token.key, self.students[0]), (admin_token.key, None), (orphan_token.key, None),
+        ]:
+            user, _ = ProfileTokenAuthentication().authenticate_credentials(key)
+            with self.assertNumQueries(0):
+                self.assertEqual(get_role_profile(user), profile)
+
+        request = mock.Mock(spec=['user'], user=user)
+        self.assertIsNone(get_request_profile(request))
+        request.user = self.teacher.user
+        self.assertIsNone(get_request_profile(request), 'the profile is resolved once per request')
+
+    def assert_revoked_in_another_process(self, client, revoke):
+        self.assertEqual(client.get('/api/subjects/').status_code, 200)
+        # Another worker's signals cannot evict this process's entries.
+        with mock.patch('api.signals.token_cache'):
+            revoke()
+        self.assertEqual(client.get('/api/subjects/').status_code, 401)
+
+    def test_logout_revokes_the_cached_token(self):
+        client = self.token_client(self.teacher.user)
+        self.assertEqual(client.get('/api/subjects/').status_code, 200)
+        self.assertEqual(client.post('/api/auth/logout/').status_code, 200)
+        self.assertEqual(client.get('/api/subjects/').status_code, 401)
+
+        client = self.token_client(self.teacher.user)
+        self.assert_revoked_in_another_process(
+            client, lambda: Token.objects.filter(user=self.teacher.user).delete()
+        )
+
+    def test_deactivation_revokes_the_cached_token(self):
+        user = self.students[0].user
+        client = self.token_client(user)
+        self.assertEqual(client.get('/api/subjects/').status_code, 200)
+        user.is_active = False
+        user.save()
+        self.assertEqual(client.get('/api/subjects/').status_code, 401)
+
+        User.objects.filter(pk=user.pk).update(is_active=True)
+        self.assertEqual(client.get('/api/subjects/').status_code, 200)
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        self.assertEqual(client.get('/api/subjects/').status_code, 401)
+
+        client = self.token_client(self.students[1].user)
+        self.assert_revoked_in_another_process(
+            client, lambda: User.objects.filter(pk=self.students[1].user.pk).update(is_active=False)
+        )
+
+    def test_cached_token_keeps_the_role_scope(self):
+        client = self.token_client(self.students[0].user)
+        for _ in range(2):
+            response = client.get('/api/students/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([row['id'] for row in response.data['results']], [self.students[0].pk])
+
+
+class AnalyticsSnapshotTests(SchoolTestCase):
+    TYPECODES = {dtype: typecode for typecode, dtype in DTYPES.items()}
+
+    def read_partition(self, path):
+        with open(os.path.join(path, '_meta.json')) as fh:
+            meta = json.load(fh)
+        columns = {}
+        for name, dtype in meta['columns'].items():
+            column = array(self.TYPECODES[dtype])
+            with open(os.path.join(path, f'{name}.bin'), 'rb') as fh:
+                column.frombytes(fh.read())
+            self.assertEqual(len(column), meta['rows'], name)
+            columns[name] = column.tolist()
+        return meta, columns
+
+    def grade(self, student, value, date):
+        return Grade.objects.create(
+            student=student, subject=self.subject, teacher=self.teacher,
+            assignment_name='Quiz', grade=value, date_assigned=date,
+        )
+
+    def test_incremental_snapshot_round_trip(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        date = datetime.date(2025, 3, 3)
+        grades = [self.grade(self.students[0], '80.50', date)]
+        Attendance.objects.create(
+            student=self.students[0], class_session=self.class_obj, date=date,
+            status=Attendance.Status.LATE, marked_by=self.teacher.user,
+        )
+        self.assertEqual(SnapshotWriter(root).run(), {'attendance': 1, 'grade': 1})
+
+        # Rows left behind by an interrupted run are discarded on reopen.
+        grade_path = os.path.join(root, 'grade', f'term={term_for(date)}', f'subject={self.subject.pk}')
+        with open(os.path.join(grade_path, 'id.bin'), 'ab') as fh:
+            fh.write(b'\xff' * 8)
+
+        grades.append(self.grade(self.students[1], 90, date + datetime.timedelta(days=1)))
+        self.assertEqual(SnapshotWriter(root).run(), {'attendance': 0, 'grade': 1})
+        self.assertEqual(SnapshotWriter(root).run(), {'attendance': 0, 'grade': 0})
+        self.assertEqual(SnapshotWriter(root).read_watermark()['grade'], grades[-1].pk)
+
+        meta, columns = self.read_partition(grade_path)
+        self.assertEqual(meta['max_id'], grades[-1].pk)
+        self.assertEqual(columns['id'], [grade.pk for grade in grades])
+        self.assertEqual(columns['student_id'], [self.students[0].pk, self.students[1].pk])
+        self.assertEqual(columns['grade_hundredths'], [8050, 9000])
+        self.assertEqual(
+            [EPOCH + datetime.timedelta(days=days) for days in columns['date_assigned']],
+            [date, date + datetime.timedelta(days=1)],
+        )
+        self.assertEqual(columns['date_submitted'], [NULL_DATE, NULL_DATE])
+
+        meta, columns = self.read_partition(
+            os.path.join(root, 'attendance', f'term={term_for(date)}', f'subject={self.subject.pk}')
+        )
+        self.assertEqual(
+            [meta['dictionaries']['status'][code] for code in columns['status']], ['L'],
+        )
+
+
+class RiskScoreTests(SchoolTestCase):
+    def setUp(self):
+        dashboard_cache.cache.clear()
+        self.addCleanup(dashboard_cache.cache.clear)
+
+    def at_risk(self):
+        response = self.client_for(self.teacher.user).get('/api/dashboard/')
+        return [(row['student_id'], row['level']) for row in response.data['at_risk_students']]
+
+    def test_scoring_refreshes_the_teacher_dashboard(self):
+        Attendance.objects.create(
+            student=self.students[0], class_session=self.class_obj, marked_by=self.teacher.user,
+            date=datetime.date(2025, 3, 3), status='A',
+        )
+        self.assertEqual(self.at_risk(), [])
+
+        self.assertEqual(RiskScorer().run(students_to_rescore()), 5)
+        self.assertEqual(self.at_risk(), [(self.students[0].pk, StudentRiskScore.Level.MEDIUM)])
+
+        Attendance.objects.create(
+            student=self.students[1], class_session=self.class_obj, marked_by=self.teacher.user,
+            date=datetime.date(2025, 3, 3), status='A',
+        )
+        self.assertEqual(len(self.at_risk()), 1)
+        self.assertEqual(RiskScorer().run(), 5)
+        self.assertEqual(self.at_risk(), [
+            (self.students[0].pk, StudentRiskScore.Level.MEDIUM),
+            (self.students[1].pk, StudentRiskScore.Level.MEDIUM),
+        ])
+
+
+class SQLiteWriteTests(SchoolTestCase):
+    def settings_module(self, **environ):
+        with mock.patch.dict(os.environ, environ):
+            return runpy.run_module('school_management.settings')
+
+    def test_production_profile_settings(self):
+        development = self.settings_module(SQLITE_PRODUCTION_PROFILE='false')
+        self.assertEqual(development['DATABASES']['default']['CONN_MAX_AGE'], 0)
+        self.assertNotIn('OPTIONS', development['DATABASES']['default'])
+        self.assertNotIn('journal_mode', development['SQLITE_PRAGMAS'])
+
+        production = self.settings_module(SQLITE_PRODUCTION_PROFILE='true')
+        self.assertEqual(production['DATABASES']['default']['CONN_MAX_AGE'], 600)
+        self.assertEqual(production['DATABASES']['default']['OPTIONS'], {'transaction_mode': 'IMMEDIATE'})
+        self.assertEqual(
+            (production['SQLITE_PRAGMAS']['journal_mode'], production['SQLITE_PRAGMAS']['synchronous']),
+            ('WAL', 'NORMAL'),
+        )
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        def pragma(name):
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA {name}')
+                return cursor.fetchone()[0]
+
+        self.addCleanup(configure_sqlite, sender=None, connection=connection)
+        with override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234, 'cache_size': -2000}):
+            configure_sqlite(sender=None, connection=connection)
+        self.assertEqual((pragma('busy_timeout'), pragma('cache_size')), (1234, -2000))
+
+    def test_model_writes_are_serialized(self):
+        client = self.client_for(self.admin)
+        with mock.patch('api.mixins.serialized_write', wraps=serialized_write) as serialized:
+            response = client.patch(f'/api/classes/{self.class_obj.pk}/', {'room_number': 'B2'})
+            self.assertEqual(response.status_code, 200)
+            response = client.patch(f'/api/teachers/{self.teacher.pk}/', {'department': 'Physics'})
+            self.assertEqual(response.status_code, 200)
+            response = client.delete(f'/api/students/{self.students[0].pk}/')
+            self.assertEqual(response.status_code, 204)
+        self.assertEqual(serialized.call_count, 3)
+
+
+class PermissionMatrixTests(SimpleTestCase):
+    def test_invalidation_during_compile_is_not_overwritten(self):
+        matrix = PermissionMatrix(ttl=60)
+        compiled = [{1: frozenset({'old'})}, {1: frozenset({'new'})}]
+
+        def compile_then_invalidate():
+            result = compiled.pop(0)
+            if compiled:
+                matrix.invalidate()
+            return result
+
+        with mock.patch.object(matrix, '_compile', side_effect=compile_then_invalidate):
+            self.assertEqual(matrix.codes_for(1), {'old'})
+            self.assertEqual(matrix.codes_for(1), {'new'})
+            self.assertEqual(matrix.codes_for(1), {'new'})
+        self.assertEqual(compiled, [])
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role=User.Roles.ADMIN)
+        teacher_user = User.objects.create_user('teacher', password='x', role=User.Roles.TEACHER)
+        teacher = Teacher.objects.create(user=teacher_user, employee_id='T1', department='Science')
+        subject = Subject.objects.create(name='Physics', code='PHY', credits=3)
+        class_obj = Class.objects.create(
+            name='PHY-10', subject=subject, teacher=teacher, room_number='101', max_capacity=30,
+        )
+        # created_at values within one millisecond, two of them equal.
+        created = timezone.now().replace(microsecond=500000)
+        cls.assignment_ids = []
+        for number, offset in enumerate([100, 200, 300, 300, 400, 500, 600]):
+            assignment = Assignment.objects.create(
+                title=f'Lab {number}', description='', class_session=class_obj, teacher=teacher,
+                due_date=created,
+            )
+            Assignment.objects.filter(pk=assignment.pk).update(
+                created_at=created + datetime.timedelta(microseconds=offset)
+            )
+            cls.assignment_ids.append(assignment.pk)
+
+    def _walk(self, url, link):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        pages = []
+        while url:
+            self.assertLess(len(pages), 10, 'the cursor stopped advancing')
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(([row['id'] for row in response.data['results']], url))
+            url = response.data[link]
+        return pages
+
+    def test_cursors_visit_every_row_once_in_both_directions(self):
+        for ordering, expected in [
+            ('created_at', self.assignment_ids),
+            ('-created_at', self.assignment_ids[::-1]),
+        ]:
+            with self.subTest(ordering=ordering):
+                forward = self._walk(f'/api/assignments/?ordering={ordering}&page_size=2', 'next')
+                self.assertEqual([pk for ids, _ in forward for pk in ids], expected)
+                backward = self._walk(forward[-1][1], 'previous')
+                self.assertEqual([pk for ids, _ in reversed(backward) for pk in ids], expected)
+
+
+class ConditionalGetTests(SchoolTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.grades = [
+            Grade.objects.create(
+                student=student, subject=cls.subject, teacher=cls.teacher,
+                assignment_name='Quiz', grade=80, date_assigned=timezone.localdate(),
+            )
+            for student in cls.students
+        ]
+
+    def test_list_etag_changes_when_a_row_is_deleted(self):
+        client = self.client_for(self.admin)
+        first = client.get('/api/grades/')
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn('Last-Modified', first)
+        self.assertEqual(client.get('/api/grades/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        self.grades[0].delete()
+        self.assertEqual(client.get('/api/grades/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+        since = http_date(timezone.now().timestamp() + 60)
+        self.assertEqual(client.get('/api/grades/', HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+    def test_detail_keeps_last_modified(self):
+        client = self.client_for(self.admin)
+        response = client.get(f'/api/grades/{self.grades[0].pk}/')
+        self.assertIn('Last-Modified', response)
+        repeat = client.get(
+            f'/api/grades/{self.grades[0].pk}/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_class_list_validators_do_not_join_the_roster(self):
+        client = self.client_for(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            first = client.get('/api/classes/')
+        aggregate = next(query['sql'] for query in queries.captured_queries if 'SUM(' in query['sql'])
+        self.assertNotIn('api_class_students', aggregate)
+
+        self.class_obj.students.remove(self.students[0])
+        self.assertEqual(client.get('/api/classes/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_roster_edits_change_the_class_etag(self):
+        client = self.client_for(self.admin)
+
+        def etag_after(change):
+            etag = client.get('/api/classes/', {'expand': 'subject'})['ETag']
+            change()
+            return client.get('/api/classes/', {'expand': 'subject'}, HTTP_IF_NONE_MATCH=etag).status_code
+
+        user = self.students[0].user
+        self.assertEqual(etag_after(lambda: None), 304)
+        user.last_name = 'Renamed'
+        self.assertEqual(etag_after(user.save), 200)
+        self.students[1].student_id = 'S999'
+        self.assertEqual(etag_after(self.students[1].save), 200)
+        user.last_login = timezone.now()
+        self.assertEqual(etag_after(lambda: user.save(update_fields=['last_login'])), 304)
+
+    def test_unversioned_expands_are_always_rendered(self):
+        client = self.client_for(self.admin)
+        self.assertIn('ETag', client.get('/api/classes/', {'expand': 'teacher,subject'}))
+        self.assertNotIn('ETag', client.get('/api/classes/', {'expand': 'students'}))
+
+
+class HotListQueryPlanTests(TestCase):
+    """
+    The page query behind each filtered and ordered list endpoint must be
+    answered from an index: no bare ``SCAN`` of a table and no temporary
+    B-tree to sort the keyset ordering.
+    """
+    # (role, url, table of the listed model)
+    HOT_LISTS = [
+        ('admin', '/api/attendance/', 'api_attendance'),
+        ('admin', '/api/attendance/?class_session={class_id}', 'api_attendance'),
+        ('admin', '/api/attendance/?status=A', 'api_attendance'),
+        ('admin', '/api/attendance/?class_session={class_id}&ordering=date', 'api_attendance'),
+        ('admin', '/api/attendance/?class_session={class_id}&status=A', 'api_attendance'),
+        ('admin', '/api/attendance/?date={today}', 'api_attendance'),
+        ('teacher', '/api/attendance/?class_session={class_id}', 'api_attendance'),
+        ('student', '/api/attendance/', 'api_attendance'),
+        ('admin', '/api/grades/', 'api_grade'),
+        ('admin', '/api/grades/?subject={subject_id}', 'api_grade'),
+        ('admin', '/api/grades/?student={student_id}', 'api_grade'),
+        ('admin', '/api/grades/?student={student_id}&subject={subject_id}&ordering=date_assigned', 'api_grade'),
+        ('teacher', '/api/grades/', 'api_grade'),
+        ('student', '/api/grades/', 'api_grade'),
+        ('admin', '/api/assignments/', 'api_assignment'),
+        ('admin', '/api/assignments/?class_session={class_id}', 'api_assignment'),
+        ('admin', '/api/assignments/?status=P', 'api_assignment'),
+        ('admin', '/api/assignments/?status=P&ordering=due_date', 'api_assignment'),
+        ('admin', '/api/assignments/?class_session={class_id}&status=P&ordering=due_date', 'api_assignment'),
+        ('teacher', '/api/assignments/', 'api_assignment'),
+        ('admin', '/api/submissions/', 'api_submission'),
+        ('admin', '/api/submissions/?assignment={assignment_id}', 'api_submission'),
+        ('admin', '/api/submissions/?assignment={assignment_id}&is_late=true', 'api_submission'),
+        ('student', '/api/submissions/', 'api_submission'),
+        ('admin', '/api/students/?grade_level=10&ordering=student_id', 'api_student'),
+        ('admin', '/api/teachers/?department=Science&ordering=employee_id', 'api_teacher'),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role=User.Roles.ADMIN)
+        teacher_user = User.objects.create_user('teacher', password='x', role=User.Roles.TEACHER)
+        cls.teacher = Teacher.objects.create(user=teacher_user, employee_id='T1', department='Science')
+        cls.subject = Subject.objects.create(name='Physics', code='PHY', credits=3)
+        cls.class_obj = Class.objects.create(
+            name='PHY-10', subject=cls.subject, teacher=cls.teacher,
+            room_number='101', max_capacity=30,
+        )
+        cls.students = []
+        for number in range(5):
+            user = User.objects.create_user(f'student{number}', password='x', role=User.Roles.STUDENT)
+            cls.students.append(Student.objects.create(user=user, student_id=f'S{number}', grade_level='10'))
+        cls.class_obj.students.add(*cls.students)
+        cls.assignment = Assignment.objects.create(
+            title='Lab report', description='', class_session=cls.class_obj, teacher=cls.teacher,
+            due_date=timezone.now(), status=Assignment.Status.PUBLISHED,
+        )
+        today = timezone.localdate()
+        for student in cls.students:
+            for offset in range(3):
+                Attendance.objects.create(
+                    student=student, class_session=cls.class_obj, marked_by=teacher_user,
+                    date=today - datetime.timedelta(days=offset), status=Attendance.Status.ABSENT,
+                )
+            Grade.objects.create(
+                student=student, subject=cls.subject, teacher=cls.teacher,
+                assignment_name='Quiz', grade=80, date_assigned=today,
+            )
+            Submission.objects.create(assignment=cls.assignment, student=student, content='Done')
+
+    def _user(self, role):
+        return {
+            'admin': self.admin,
+            'teacher': self.teacher.user,
+            'student': self.students[0].user,
+        }[role]
+
+    def _plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_hot_list_queries_use_indexes(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN output is SQLite specific')
+        ids = {
+            'class_id': self.class_obj.pk,
+            'subject_id': self.subject.pk,
+            'student_id': self.students[0].pk,
+            'assignment_id': self.assignment.pk,
+            'today': timezone.localdate().isoformat(),
+        }
+        client = APIClient()
+        for role, url, table in self.HOT_LISTS:
+            url = url.format(**ids)
+            with self.subTest(role=role, url=url):
+                client.force_authenticate(self._user(role))
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                pages = [
+                    query['sql'] for query in queries.captured_queries
+                    if f'FROM "{table}"' in query['sql'] and ' LIMIT ' in query['sql']
+                ]
+                self.assertTrue(pages, f'no page query on {table}')
+                for sql in pages:
+                    plan = self._plan(sql)
+                    scans = [step for step in plan if re.fullmatch(r'SCAN \S+', step)]
+                    self.assertFalse(scans, f'{url}: table scan in {plan}')
+                    self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan, f'{url}: sort in {plan}')
+                    self.assertTrue(
+                        any(table in step and 'INDEX' in step for step in plan),
+                        f'{url}: {table} not read through an index in {plan}',
+                    )
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_MAX_LAG=5)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        # No 'replica' connection exists here; report it one second behind.
+        patcher = mock.patch('api.routers.replica_lag', return_value=1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_outside_a_request_use_the_primary(self):
+        self.assertEqual(router.db_for_read(Student), 'default')
+
+    def test_request_reads_from_its_replica_until_it_writes(self):
+        with request_routing() as state:
+            state.replica = choose_replica(user_id=-1)
+            self.assertEqual(router.db_for_read(Student), 'replica')
+            with primary_reads():
+                self.assertEqual(router.db_for_read(Student), 'default')
+            self.assertEqual(router.db_for_write(Student), 'default')
+            self.assertTrue(state.wrote)
+            self.assertEqual(router.db_for_read(Student), 'default')
+
+    def test_user_stays_on_the_primary_after_writing(self):
+        pin_to_primary(-2)
+        self.assertIsNone(choose_replica(user_id=-2))
+        self.assertEqual(choose_replica(user_id=-3), 'replica')
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(router.allow_migrate('replica', 'api'))
+        self.assertTrue(router.allow_migrate('default', 'api'))
@@ -19,4 +19,7 @@ urlpatterns = [
     path('auth/login/', views.LoginView.as_view(), name='login'),
     path('auth/logout/', views.LogoutView.as_view(), name='logout'),
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
+    path('import/users/', views.ImportUsersView.as_view(), name='import-users'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('lookup/', views.LookupView.as_view(), name='lookup'),
 ]
\ No newline at end of file
@@ -1,22 +1,45 @@
-from rest_framework import generics, status, viewsets, filters
+from rest_framework import generics, status, viewsets, filters, serializers
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.parsers import MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth import authenticate
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, Exists, OuterRef
 from django.utils import timezone
 
 from .serializers import (
     RegisterSerializer, UserSerializer, StudentSerializer, TeacherSerializer,
     ClassSerializer, SubjectSerializer, AttendanceSerializer, GradeSerializer,
-    AssignmentSerializer, SubmissionSerializer, PermissionSerializer, RoleSerializer
+    AssignmentSerializer, SubmissionSerializer, PermissionSerializer, RoleSerializer,
+    RollCallSerializer, BulkEnrollmentSerializer, AttendancePatternSerializer,
+    TermSerializer, StudentStandingSerializer, ClassStandingSerializer, SearchQuerySerializer,
+    LookupQuerySerializer
 )
 from .models import (
     User, Student, Teacher, Class, Subject, Attendance, 
-    Grade, Assignment, Submission, Permission, Role
+    Grade, Assignment, Submission, Permission, Role,
+    AttendanceBitmap, ClassAttendanceRollup, StudentAttendanceRollup,
+    StudentStanding, ClassStanding, StudentRiskScore
 )
+from .analytics import build_gradebook, get_term_standings, invalidate_term_standings
+from .authentication import get_request_profile
+from .bitmaps import AttendanceBitmapWriter, absence_streaks, status_day_counts
+from .dashboard import (
+    admin_key, dashboard_cache, invalidate_dashboards, student_key, teacher_key
+)
+from .db import serialized_write
+from .importers import IMPORT_KINDS, BulkUserImporter, detect_format, iter_rows, open_text
+from .lookup import prefix_index
+from .mixins import (
+    ConditionalGetMixin, ReplicaReadMixin, RoleScopedQuerysetMixin, SelectiveQuerysetMixin,
+    SerializedWriteMixin, StreamingExportMixin, build_selection
+)
+from .pagination import KeysetPagination
+from .risk import mark_risk_stale
+from .search import IndexedSearchFilter, search_hits
+from .rollups import AttendanceRollupDelta, attendance_rate, attendance_totals
 from .permissions import (
     HasPermission, IsAdmin, IsTeacher, IsStudent, 
     IsTeacherOrAdmin, IsStudentOwner
@@ -76,9 +99,10 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['role', 'is_active']
     search_fields = ['username', 'email', 'first_name', 'last_name']
+    search_kind = 'user'
     ordering_fields = ['username', 'email', 'date_joined']
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
@@ -86,84 +110,110 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data)
 
-class SubjectViewSet(viewsets.ModelViewSet):
+class SubjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Subject.objects.all()
     serializer_class = SubjectSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     search_fields = ['name', 'code']
 
-class StudentViewSet(viewsets.ModelViewSet):
-    queryset = Student.objects.select_related('user').all()
+class StudentViewSet(ReplicaReadMixin, ConditionalGetMixin, RoleScopedQuerysetMixin,
+                     SelectiveQuerysetMixin, SerializedWriteMixin, viewsets.ModelViewSet):
+    queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['grade_level', 'enrollment_date']
     search_fields = ['user__first_name', 'user__last_name', 'student_id', 'user__email']
+    search_kind = 'student'
     ordering_fields = ['student_id', 'enrollment_date']
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.request.user.role == User.Roles.STUDENT:
-            # Students can only see their own profile
-            queryset = queryset.filter(user=self.request.user)
-        return queryset
+    last_modified_fields = ('updated_at', 'user__updated_at')
+    # Students can only see their own profile
+    student_lookup = 'pk'
 
     @action(detail=True, methods=['get'])
     def grades(self, request, pk=None):
         student = self.get_object()
-        grades = Grade.objects.filter(student=student).select_related('subject', 'teacher')
-        serializer = GradeSerializer(grades, many=True)
+        serializer = GradeSerializer(many=True, context=self.get_serializer_context())
+        grades = build_selection(serializer.child, Grade).apply(
+            Grade.objects.filter(student=student)
+        )
+        serializer.instance = grades
         return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
     def attendance(self, request, pk=None):
         student = self.get_object()
-        attendance = Attendance.objects.filter(student=student).select_related('class_session')
-        serializer = AttendanceSerializer(attendance, many=True)
+        serializer = AttendanceSerializer(many=True, context=self.get_serializer_context())
+        attendance = build_selection(serializer.child, Attendance).apply(
+            Attendance.objects.filter(student=student)
+        )
+        serializer.instance = attendance
         return Response(serializer.data)
 
-class TeacherViewSet(viewsets.ModelViewSet):
-    queryset = Teacher.objects.select_related('user').prefetch_related('subjects').all()
+    @action(detail=True, methods=['get'])
+    def standing(self, request, pk=None):
+        """GPA, grade-level rank and per-class ranks for ``?term=`` (default: current)."""
+        student = self.get_object()
+        params = TermSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        standings = get_term_standings(params.validated_data['term'])
+        standing = StudentStanding.objects.filter(
+            standings=standings, student=student
+        ).select_related('standings').first()
+        classes = ClassStanding.objects.filter(
+            standings=standings, student=student
+        ).select_related('class_session__subject', 'student__user')
+        data = StudentStandingSerializer(standing).data if standing else {
+            'term': standings.term, 'gpa': None
+        }
+        data['classes'] = ClassStandingSerializer(
+            classes, many=True, context=self.get_serializer_context()
+        ).data
+        return Response(data)
+
+class TeacherViewSet(ConditionalGetMixin, SelectiveQuerysetMixin, SerializedWriteMixin,
+                     viewsets.ModelViewSet):
+    queryset = Teacher.objects.all()
     serializer_class = TeacherSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['department', 'hire_date']
     search_fields = ['user__first_name', 'user__last_name', 'employee_id', 'department']
+    search_kind = 'teacher'
     ordering_fields = ['employee_id', 'hire_date']
+    last_modified_fields = ('updated_at', 'user__updated_at', 'subjects__updated_at')
 
     @action(detail=True, methods=['get'])
     def classes(self, request, pk=None):
         teacher = self.get_object()
-        classes = Class.objects.filter(teacher=teacher).select_related('subject')
-        serializer = ClassSerializer(classes, many=True)
+        serializer = ClassSerializer(many=True, context=self.get_serializer_context())
+        classes = build_selection(serializer.child, Class).apply(
+            Class.objects.filter(teacher=teacher)
+        )
+        serializer.instance = classes
         return Response(serializer.data)
 
-class ClassViewSet(viewsets.ModelViewSet):
-    queryset = Class.objects.select_related('teacher', 'subject').prefetch_related('students').all()
+class ClassViewSet(ReplicaReadMixin, ConditionalGetMixin, RoleScopedQuerysetMixin,
+                   SelectiveQuerysetMixin, SerializedWriteMixin, viewsets.ModelViewSet):
+    queryset = Class.objects.all()
     serializer_class = ClassSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
     filterset_fields = ['teacher', 'subject']
     search_fields = ['name', 'teacher__user__first_name', 'subject__name']
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.request.user.role == User.Roles.STUDENT:
-            # Students can only see classes they're enrolled in
-            try:
-                student = Student.objects.get(user=self.request.user)
-                queryset = queryset.filter(students=student)
-            except Student.DoesNotExist:
-                queryset = queryset.none()
-        elif self.request.user.role == User.Roles.TEACHER:
-            # Teachers can only see their own classes
-            try:
-                teacher = Teacher.objects.get(user=self.request.user)
-                queryset = queryset.filter(teacher=teacher)
-            except Teacher.DoesNotExist:
-                queryset = queryset.none()
-        return queryset
+    search_kind = 'class'
+    # Roster changes (refresh_student_count) and saves of enrolled students
+    # and their users bump Class.updated_at, so the roster itself is not
+    # joined into the aggregate.
+    last_modified_fields = (
+        'updated_at', 'teacher__updated_at', 'teacher__user__updated_at', 'subject__updated_at',
+    )
+    etag_counter_fields = ('student_count',)
+    # Students can only see classes they're enrolled in
+    student_lookup = 'students'
+    # Teachers can only see their own classes
+    teacher_lookup = 'teacher'
 
     @action(detail=True, methods=['post'], permission_classes=[IsTeacherOrAdmin])
     def enroll_student(self, request, pk=None):
@@ -172,11 +222,19 @@ class ClassViewSet(viewsets.ModelViewSet):
         
         try:
             student = Student.objects.get(id=student_id)
-            class_obj.students.add(student)
-            return Response({'message': 'Student enrolled successfully'})
         except Student.DoesNotExist:
             return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
 
+        with serialized_write():
+            class_obj = Class.objects.select_for_update().get(pk=class_obj.pk)
+            if class_obj.is_full and not class_obj.students.filter(pk=student.pk).exists():
+                return Response(
+                    {'error': 'Class is at full capacity'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            class_obj.students.add(student)
+        return Response({'message': 'Student enrolled successfully'})
+
     @action(detail=True, methods=['post'], permission_classes=[IsTeacherOrAdmin])
     def remove_student(self, request, pk=None):
         class_obj = self.get_object()
@@ -184,181 +242,517 @@ class ClassViewSet(viewsets.ModelViewSet):
         
         try:
             student = Student.objects.get(id=student_id)
-            class_obj.students.remove(student)
-            return Response({'message': 'Student removed successfully'})
         except Student.DoesNotExist:
             return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
 
-class AttendanceViewSet(viewsets.ModelViewSet):
-    queryset = Attendance.objects.select_related('student', 'class_session', 'marked_by').all()
+        with serialized_write():
+            class_obj.students.remove(student)
+        return Response({'message': 'Student removed successfully'})
+
+    def _bulk_enrollment_targets(self, class_obj, data):
+        """
+        Return the requested student ids in order with whether each one
+        exists and is already enrolled, using a single query.
+        """
+        roster = Class.students.through.objects.filter(
+            class_id=class_obj.pk, student_id=OuterRef('pk')
+        )
+        students = Student.objects.annotate(enrolled=Exists(roster))
+        if 'student_ids' in data:
+            requested = list(dict.fromkeys(data['student_ids']))
+            students = students.filter(pk__in=requested)
+        else:
+            students = students.filter(grade_level=data['grade_level']).order_by('pk')
+        found = dict(students.values_list('pk', 'enrolled'))
+        if 'student_ids' not in data:
+            requested = list(found)
+        return requested, found
+
+    @action(detail=True, methods=['post'], permission_classes=[IsTeacherOrAdmin])
+    def enroll_students(self, request, pk=None):
+        """
+        Enroll a list of students (``student_ids``) or a whole ``grade_level``
+        up to the class's remaining capacity, with one roster insert.
+        """
+        serializer = BulkEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        Through = Class.students.through
+
+        with serialized_write():
+            class_obj = Class.objects.select_for_update().get(pk=self.get_object().pk)
+            requested, found = self._bulk_enrollment_targets(class_obj, serializer.validated_data)
+            available = max(class_obj.max_capacity - class_obj.student_count, 0)
+
+            results, new_rows = [], []
+            for student_id in requested:
+                if student_id not in found:
+                    outcome = 'not_found'
+                elif found[student_id]:
+                    outcome = 'already_enrolled'
+                elif len(new_rows) >= available:
+                    outcome = 'over_capacity'
+                else:
+                    outcome = 'enrolled'
+                    new_rows.append(Through(class_id=class_obj.pk, student_id=student_id))
+                results.append({'student_id': student_id, 'result': outcome})
+
+            Through.objects.bulk_create(new_rows, ignore_conflicts=True)
+            Class.objects.filter(pk=class_obj.pk).refresh_student_count()
+            # The roster insert bypasses m2m_changed.
+            if new_rows:
+                student_ids = [row.student_id for row in new_rows]
+                invalidate_term_standings()
+                mark_risk_stale(student_ids)
+                invalidate_dashboards([class_obj.teacher_id], student_ids)
+
+        return Response({
+            'enrolled': len(new_rows),
+            'capacity_remaining': available - len(new_rows),
+            'results': results,
+        })
+
+    @action(detail=True, methods=['post'], permission_classes=[IsTeacherOrAdmin])
+    def remove_students(self, request, pk=None):
+        """Remove a list of students or a whole ``grade_level`` in one delete."""
+        serializer = BulkEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with serialized_write():
+            class_obj = Class.objects.select_for_update().get(pk=self.get_object().pk)
+            requested, found = self._bulk_enrollment_targets(class_obj, serializer.validated_data)
+            enrolled = [student_id for student_id in requested if found.get(student_id)]
+            Class.students.through.objects.filter(
+                class_id=class_obj.pk, student_id__in=enrolled
+            ).delete()
+            Class.objects.filter(pk=class_obj.pk).refresh_student_count()
+            if enrolled:
+                invalidate_term_standings()
+                mark_risk_stale(enrolled)
+                invalidate_dashboards([class_obj.teacher_id], enrolled)
+
+        results = [
+            {
+                'student_id': student_id,
+                'result': 'removed' if found.get(student_id)
+                else 'not_enrolled' if student_id in found else 'not_found',
+            }
+            for student_id in requested
+        ]
+        return Response({'removed': len(enrolled), 'results': results})
+
+    @action(detail=True, methods=['get'], permission_classes=[IsTeacherOrAdmin])
+    def rankings(self, request, pk=None):
+        """Students of the class ranked by their subject average for ``?term=``."""
+        class_obj = self.get_object()
+        params = TermSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        standings = get_term_standings(params.validated_data['term'])
+        ranks = ClassStanding.objects.filter(
+            standings=standings, class_session=class_obj
+        ).select_related('class_session__subject', 'student__user').order_by('rank', 'student_id')
+        return Response({
+            'term': standings.term,
+            'computed_at': standings.computed_at,
+            'results': ClassStandingSerializer(
+                ranks, many=True, context=self.get_serializer_context()
+            ).data,
+        })
+
+    @action(detail=True, methods=['get'], permission_classes=[IsTeacherOrAdmin])
+    def gradebook(self, request, pk=None):
+        """Students x assignments grade matrix for ``?term=`` with per-row and per-column statistics."""
+        class_obj = self.get_object()
+        params = TermSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(build_gradebook(class_obj, params.validated_data['term']))
+
+    @action(detail=True, methods=['get'], url_path='attendance/summary',
+            permission_classes=[IsTeacherOrAdmin])
+    def attendance_summary(self, request, pk=None):
+        """
+        Attendance totals for the class from the rollup tables, all time or
+        for ``?term=`` (e.g. 2025-T1) or ``?date=`` (YYYY-MM-DD); per-student
+        totals are included except for single days.
+        """
+        class_obj = self.get_object()
+        kind, period = ClassAttendanceRollup.PeriodKind.ALL, ''
+        if request.query_params.get('date'):
+            kind, period = ClassAttendanceRollup.PeriodKind.DAY, request.query_params['date']
+        elif request.query_params.get('term'):
+            kind, period = ClassAttendanceRollup.PeriodKind.TERM, request.query_params['term']
+
+        totals = attendance_totals(ClassAttendanceRollup.objects.filter(
+            class_session=class_obj, period_kind=kind, period=period
+        ))
+        data = {'period': period or 'all', **totals, 'attendance_rate': attendance_rate(totals)}
+        if kind != ClassAttendanceRollup.PeriodKind.DAY:
+            fields = list(totals)
+            rows = StudentAttendanceRollup.objects.filter(
+                class_session=class_obj, period_kind=kind, period=period
+            ).values_list('student_id', *fields)
+            data['students'] = [
+                {'student_id': student_id, **dict(zip(fields, counts)),
+                 'attendance_rate': attendance_rate(dict(zip(fields, counts)))}
+                for student_id, *counts in rows
+            ]
+        return Response(data)
+
+    @action(detail=True, methods=['post'], url_path='attendance/bulk',
+            permission_classes=[IsTeacherOrAdmin])
+    def bulk_attendance(self, request, pk=None):
+        """
+        Mark a whole roster for one date: validates every student against the
+        roster in one query and upserts all rows in a single transaction.
+        """
+        class_obj = self.get_object()
+        serializer = RollCallSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        date = serializer.validated_data.get('date') or timezone.localdate()
+        records = serializer.validated_data['records']
+
+        roster = set(class_obj.students.values_list('id', flat=True))
+        results = []
+        to_save = {}
+        for record in records:
+            student_id = record['student_id']
+            if student_id not in roster:
+                results.append({'student_id': student_id, 'error': 'Student is not enrolled in this class'})
+            elif student_id in to_save:
+                results.append({'student_id': student_id, 'error': 'Duplicate entry for this student'})
+            else:
+                to_save[student_id] = Attendance(
+                    student_id=student_id, class_session=class_obj, date=date,
+                    status=record['status'], notes=record.get('notes'),
+                    marked_by=request.user,
+                )
+                results.append({'student_id': student_id, 'status': record['status']})
+
+        with serialized_write():
+            existing = dict(Attendance.objects.filter(
+                class_session=class_obj, date=date, student_id__in=to_save
+            ).values_list('student_id', 'status'))
+            Attendance.objects.bulk_create(
+                to_save.values(),
+                update_conflicts=True,
+                unique_fields=['student', 'class_session', 'date'],
+                update_fields=['status', 'notes', 'marked_by'],
+            )
+            # bulk_create sends no signals, so the aggregates are updated here.
+            delta = AttendanceRollupDelta()
+            bitmaps = AttendanceBitmapWriter()
+            for student_id, previous_status in existing.items():
+                delta.add(student_id, class_obj.pk, date, previous_status, sign=-1)
+            for row in to_save.values():
+                delta.add_row(row)
+                bitmaps.set_row(row)
+            delta.apply()
+            bitmaps.apply()
+            mark_risk_stale(list(to_save))
+            invalidate_dashboards(student_ids=to_save)
+
+        for result in results:
+            if 'error' not in result:
+                result['result'] = 'updated' if result['student_id'] in existing else 'created'
+        return Response({
+            'date': date,
+            'created': len(to_save) - len(existing),
+            'updated': len(existing),
+            'errors': len(records) - len(to_save),
+            'results': results,
+        })
+
+class AttendanceViewSet(ReplicaReadMixin, StreamingExportMixin, RoleScopedQuerysetMixin,
+                        SelectiveQuerysetMixin, SerializedWriteMixin, viewsets.ModelViewSet):
+    queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status', 'date', 'class_session']
     ordering_fields = ['date', 'created_at']
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.request.user.role == User.Roles.STUDENT:
-            try:
-                student = Student.objects.get(user=self.request.user)
-                queryset = queryset.filter(student=student)
-            except Student.DoesNotExist:
-                queryset = queryset.none()
-        elif self.request.user.role == User.Roles.TEACHER:
-            try:
-                teacher = Teacher.objects.get(user=self.request.user)
-                queryset = queryset.filter(class_session__teacher=teacher)
-            except Teacher.DoesNotExist:
-                queryset = queryset.none()
-        return queryset
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date', '-id')
+    export_fields = ('id', 'date', 'status', 'student_id', 'student__student_id',
+                     'class_session_id', 'class_session__name', 'marked_by_id',
+                     'notes', 'created_at')
+    student_lookup = 'student'
+    teacher_lookup = 'class_session__teacher'
 
     def perform_create(self, serializer):
         serializer.save(marked_by=self.request.user)
 
-class GradeViewSet(viewsets.ModelViewSet):
-    queryset = Grade.objects.select_related('student', 'subject', 'teacher').all()
+    def _pattern_query(self, request):
+        params = AttendancePatternSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        bitmaps = self.scope_queryset(AttendanceBitmap.objects.all())
+        if 'class_session' in params.validated_data:
+            bitmaps = bitmaps.filter(class_session_id=params.validated_data['class_session'])
+        return bitmaps, params.validated_data
+
+    @action(detail=False, methods=['get'], url_path='day-counts')
+    def day_counts(self, request):
+        """
+        Students with at least ``?min_days=`` days of ``?status=`` (default
+        absent) between ``?start=`` and ``?end=`` (default: this month).
+        """
+        bitmaps, params = self._pattern_query(request)
+        counts = status_day_counts(bitmaps, params['start'], params['end'], params['status'])
+        results = sorted(
+            ({'student_id': student_id, 'days': days}
+             for student_id, days in counts.items() if days >= params['min_days']),
+            key=lambda entry: (-entry['days'], entry['student_id']),
+        )
+        return Response({'start': params['start'], 'end': params['end'], 'results': results})
+
+    @action(detail=False, methods=['get'])
+    def streaks(self, request):
+        """
+        Runs of at least ``?min_days=`` (default 2) consecutive recorded days
+        of ``?status=`` (default absent) per student and class.
+        """
+        bitmaps, params = self._pattern_query(request)
+        min_length = params['min_days'] if 'min_days' in request.query_params else 2
+        results = absence_streaks(
+            bitmaps, params['start'], params['end'], min_length, params['status']
+        )
+        results.sort(key=lambda entry: (-entry['days'], entry['student_id'], entry['class_id']))
+        return Response({'start': params['start'], 'end': params['end'], 'results': results})
+
+class GradeViewSet(ReplicaReadMixin, ConditionalGetMixin, StreamingExportMixin,
+                   RoleScopedQuerysetMixin, SelectiveQuerysetMixin, SerializedWriteMixin,
+                   viewsets.ModelViewSet):
+    queryset = Grade.objects.all()
     serializer_class = GradeSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['subject', 'student', 'teacher']
     ordering_fields = ['date_assigned', 'grade']
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.request.user.role == User.Roles.STUDENT:
-            try:
-                student = Student.objects.get(user=self.request.user)
-                queryset = queryset.filter(student=student)
-            except Student.DoesNotExist:
-                queryset = queryset.none()
-        elif self.request.user.role == User.Roles.TEACHER:
-            try:
-                teacher = Teacher.objects.get(user=self.request.user)
-                queryset = queryset.filter(teacher=teacher)
-            except Teacher.DoesNotExist:
-                queryset = queryset.none()
-        return queryset
-
-class AssignmentViewSet(viewsets.ModelViewSet):
-    queryset = Assignment.objects.select_related('class_session', 'teacher').all()
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date_assigned', '-id')
+    export_fields = ('id', 'student_id', 'student__student_id', 'subject_id', 'subject__code',
+                     'teacher_id', 'assignment_name', 'grade', 'max_grade',
+                     'date_assigned', 'date_submitted', 'comments')
+    last_modified_fields = (
+        'updated_at', 'student__updated_at', 'student__user__updated_at', 'subject__updated_at',
+        'teacher__updated_at', 'teacher__user__updated_at',
+    )
+    student_lookup = 'student'
+    teacher_lookup = 'teacher'
+
+class AssignmentViewSet(ConditionalGetMixin, RoleScopedQuerysetMixin, SelectiveQuerysetMixin,
+                        SerializedWriteMixin, viewsets.ModelViewSet):
+    queryset = Assignment.objects.all()
     serializer_class = AssignmentSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status', 'class_session', 'teacher']
     ordering_fields = ['due_date', 'created_at']
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.request.user.role == User.Roles.STUDENT:
-            try:
-                student = Student.objects.get(user=self.request.user)
-                queryset = queryset.filter(class_session__students=student, status='P')
-            except Student.DoesNotExist:
-                queryset = queryset.none()
-        elif self.request.user.role == User.Roles.TEACHER:
-            try:
-                teacher = Teacher.objects.get(user=self.request.user)
-                queryset = queryset.filter(teacher=teacher)
-            except Teacher.DoesNotExist:
-                queryset = queryset.none()
-        return queryset
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    last_modified_fields = (
+        'updated_at', 'class_session__updated_at', 'class_session__subject__updated_at',
+        'teacher__updated_at', 'teacher__user__updated_at',
+    )
+    etag_counter_fields = ('submission_count', 'late_submission_count')
+    student_lookup = 'class_session__students'
+    teacher_lookup = 'teacher'
+
+    def scope_for_student(self, queryset, student):
+        return super().scope_for_student(queryset, student).filter(
+            status=Assignment.Status.PUBLISHED
+        )
 
     def perform_create(self, serializer):
-        try:
-            teacher = Teacher.objects.get(user=self.request.user)
-            serializer.save(teacher=teacher)
-        except Teacher.DoesNotExist:
+        teacher = self.get_role_profile()
+        if not isinstance(teacher, Teacher):
             raise serializers.ValidationError("Only teachers can create assignments")
+        serializer.save(teacher=teacher)
 
-class SubmissionViewSet(viewsets.ModelViewSet):
-    queryset = Submission.objects.select_related('assignment', 'student').all()
+class SubmissionViewSet(StreamingExportMixin, RoleScopedQuerysetMixin, SelectiveQuerysetMixin,
+                        SerializedWriteMixin, viewsets.ModelViewSet):
+    queryset = Submission.objects.all()
     serializer_class = SubmissionSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['assignment', 'student', 'is_late']
     ordering_fields = ['submitted_at']
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.request.user.role == User.Roles.STUDENT:
-            try:
-                student = Student.objects.get(user=self.request.user)
-                queryset = queryset.filter(student=student)
-            except Student.DoesNotExist:
-                queryset = queryset.none()
-        elif self.request.user.role == User.Roles.TEACHER:
-            try:
-                teacher = Teacher.objects.get(user=self.request.user)
-                queryset = queryset.filter(assignment__teacher=teacher)
-            except Teacher.DoesNotExist:
-                queryset = queryset.none()
-        return queryset
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-submitted_at', '-id')
+    export_fields = ('id', 'assignment_id', 'assignment__title', 'student_id',
+                     'student__student_id', 'submitted_at', 'is_late')
+    student_lookup = 'student'
+    teacher_lookup = 'assignment__teacher'
 
     def perform_create(self, serializer):
-        try:
-            student = Student.objects.get(user=self.request.user)
-            assignment = serializer.validated_data['assignment']
-            is_late = timezone.now() > assignment.due_date
-            serializer.save(student=student, is_late=is_late)
-        except Student.DoesNotExist:
+        student = self.get_role_profile()
+        if not isinstance(student, Student):
             raise serializers.ValidationError("Only students can submit assignments")
+        try:
+            assignment = Assignment.objects.only('due_date').get(
+                pk=serializer.validated_data['assignment_id']
+            )
+        except Assignment.DoesNotExist:
+            raise serializers.ValidationError("Assignment not found")
+
+        is_late = timezone.now() > assignment.due_date
+        serializer.save(student=student, is_late=is_late)
+
+class ImportUsersView(generics.GenericAPIView):
+    """
+    Admin-only upload of a CSV/JSON Lines file of users (``kind`` =
+    user, student or teacher), streamed through ``BulkUserImporter``.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        kind = request.data.get('kind', 'student')
+        if upload is None:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if kind not in IMPORT_KINDS:
+            return Response({'error': f'Unknown kind: {kind}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = request.data.get('format') or detect_format(upload.name)
+        try:
+            rows = iter_rows(open_text(upload.file), fmt)
+            summary = BulkUserImporter(kind).run(rows)
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_201_CREATED if summary['created'] else status.HTTP_200_OK)
 
 # Dashboard and Analytics Views
-class DashboardView(generics.GenericAPIView):
+class DashboardView(ReplicaReadMixin, generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
-        data = {}
-
         if user.role == User.Roles.ADMIN:
-            data = {
-                'total_students': Student.objects.count(),
-                'total_teachers': Teacher.objects.count(),
-                'total_classes': Class.objects.count(),
-                'total_subjects': Subject.objects.count(),
-                'recent_registrations': User.objects.filter(
-                    date_joined__gte=timezone.now() - timezone.timedelta(days=7)
-                ).count()
+            return Response(dashboard_cache.get_or_build(admin_key(), self._admin_dashboard))
+
+        profile = get_request_profile(request)
+        if profile is None:
+            return Response({})
+        if user.role == User.Roles.TEACHER:
+            return Response(dashboard_cache.get_or_build(
+                teacher_key(profile.pk), lambda: self._teacher_dashboard(profile)
+            ))
+        if user.role == User.Roles.STUDENT:
+            return Response(dashboard_cache.get_or_build(
+                student_key(profile.pk), lambda: self._student_dashboard(profile)
+            ))
+        return Response({})
+
+    def _admin_dashboard(self):
+        return {
+            'total_students': Student.objects.count(),
+            'total_teachers': Teacher.objects.count(),
+            'total_classes': Class.objects.count(),
+            'total_subjects': Subject.objects.count(),
+            'recent_registrations': User.objects.filter(
+                date_joined__gte=timezone.now() - timezone.timedelta(days=7)
+            ).count()
+        }
+
+    def _teacher_dashboard(self, teacher):
+        return {
+            'my_classes': teacher.classes.count(),
+            'total_students': Student.objects.filter(classes__teacher=teacher).distinct().count(),
+            'pending_assignments': Assignment.objects.filter(teacher=teacher, status='P').count(),
+            'recent_submissions': Submission.objects.filter(assignment__teacher=teacher).count(),
+            'at_risk_students': self._at_risk_students(teacher),
+        }
+
+    def _student_dashboard(self, student):
+        return {
+            'enrolled_classes': student.classes.count(),
+            'pending_assignments': Assignment.objects.filter(
+                class_session__students=student, 
+                status='P',
+                due_date__gt=timezone.now()
+            ).count(),
+            'average_grade': Grade.objects.filter(student=student).aggregate(
+                avg=Avg('grade')
+            )['avg'] or 0,
+            'attendance_rate': self._calculate_attendance_rate(student)
+        }
+
+    def _at_risk_students(self, teacher, limit=10):
+        # Precomputed by the detect_at_risk command.
+        scores = StudentRiskScore.objects.filter(
+            student__in=Student.objects.filter(classes__teacher=teacher)
+        ).exclude(level=StudentRiskScore.Level.LOW).order_by('-score', 'student_id')[:limit]
+        return [
+            {
+                'student_id': student_id,
+                'student_number': student_number,
+                'name': f'{first_name} {last_name}'.strip(),
+                'score': score,
+                'level': level,
+                'computed_at': computed_at,
             }
-        elif user.role == User.Roles.TEACHER:
-            try:
-                teacher = Teacher.objects.get(user=user)
-                data = {
-                    'my_classes': teacher.classes.count(),
-                    'total_students': Student.objects.filter(classes__teacher=teacher).distinct().count(),
-                    'pending_assignments': Assignment.objects.filter(teacher=teacher, status='P').count(),
-                    'recent_submissions': Submission.objects.filter(assignment__teacher=teacher).count()
-                }
-            except Teacher.DoesNotExist:
-                pass
-        elif user.role == User.Roles.STUDENT:
-            try:
-                student = Student.objects.get(user=user)
-                data = {
-                    'enrolled_classes': student.classes.count(),
-                    'pending_assignments': Assignment.objects.filter(
-                        class_session__students=student, 
-                        status='P',
-                        due_date__gt=timezone.now()
-                    ).count(),
-                    'average_grade': Grade.objects.filter(student=student).aggregate(
-                        avg=Avg('grade')
-                    )['avg'] or 0,
-                    'attendance_rate': self._calculate_attendance_rate(student)
-                }
-            except Student.DoesNotExist:
-                pass
-
-        return Response(data)
+            for student_id, student_number, first_name, last_name, score, level, computed_at
+            in scores.values_list(
+                'student_id', 'student__student_id', 'student__user__first_name',
+                'student__user__last_name', 'score', 'level', 'computed_at',
+            )
+        ]
 
     def _calculate_attendance_rate(self, student):
-        total_attendance = Attendance.objects.filter(student=student).count()
-        if total_attendance == 0:
-            return 100
-        present_count = Attendance.objects.filter(
-            student=student, 
-            status__in=['P', 'L']
-        ).count()
-        return round((present_count / total_attendance) * 100, 2)
\ No newline at end of file
+        return attendance_rate(attendance_totals(StudentAttendanceRollup.objects.filter(
+            student=student, period_kind=StudentAttendanceRollup.PeriodKind.ALL
+        )))
+
+class SearchView(ReplicaReadMixin, generics.GenericAPIView):
+    """
+    Ranked full-text search over every ``?types=`` (default: all) for
+    ``?q=``. Each type only returns what the caller could list from its
+    own endpoint; hits of all types are merged best first.
+    """
+    permission_classes = [IsAuthenticated]
+    search_views = {
+        'user': UserViewSet,
+        'student': StudentViewSet,
+        'teacher': TeacherViewSet,
+        'class': ClassViewSet,
+        'assignment': AssignmentViewSet,
+    }
+
+    def _searchable(self, request, kind):
+        view = self.search_views[kind](request=request, format_kwarg=None, action='list', args=(), kwargs={})
+        if not all(permission.has_permission(request, view) for permission in view.get_permissions()):
+            return None
+        queryset = view.queryset.all()
+        if isinstance(view, RoleScopedQuerysetMixin):
+            queryset = view.scope_queryset(queryset)
+        return queryset
+
+    def get(self, request):
+        params = SearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query, limit = params.validated_data['q'], params.validated_data['limit']
+        hits = []
+        for kind in params.validated_data['types']:
+            queryset = self._searchable(request, kind)
+            if queryset is not None:
+                hits.extend(search_hits(queryset, kind, [query], limit))
+        hits.sort(key=lambda hit: hit['rank'])
+        return Response({'q': query, 'results': hits[:limit]})
+
+class LookupView(generics.GenericAPIView):
+    """
+    Type-ahead over student and teacher names and numbers for ``?q=``,
+    answered from the in-memory ``prefix_index`` without a query.
+    """
+    permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+
+    def get(self, request):
+        params = LookupQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data['q']
+        matches = prefix_index.lookup(
+            query, params.validated_data['limit'], params.validated_data.get('types')
+        )
+        return Response({
+            'q': query,
+            'results': [{'type': kind, 'id': pk, 'label': label} for kind, pk, label in matches],
+        })
@@ -37,6 +37,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'school_management.urls'
@@ -60,12 +61,58 @@ TEMPLATES = [
 WSGI_APPLICATION = 'school_management.wsgi.application'
 
 # Database
+# Connections are kept for DB_CONN_MAX_AGE seconds (0 closes them after each
+# request). Under the production profile, SQLITE_PRODUCTION_PROFILE, they
+# are kept for 600 seconds by default and SQLite transactions take the write
+# lock at BEGIN, so a writer waits up to SQLITE_BUSY_TIMEOUT ms for it
+# instead of failing on upgrade.
+SQLITE_PRODUCTION_PROFILE = config('SQLITE_PRODUCTION_PROFILE', default=False, cast=bool)
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600 if SQLITE_PRODUCTION_PROFILE else 0, cast=int)
+SQLITE_BUSY_TIMEOUT = config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
+if SQLITE_PRODUCTION_PROFILE:
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+
+# Read replicas: every DATABASES alias other than 'default'. Safe-method
+# requests of views using ReplicaReadMixin read from one that is at most
+# REPLICA_MAX_LAG seconds behind (PostgreSQL standbys are measured every
+# REPLICA_LAG_CHECK_INTERVAL seconds, other backends are assumed to be that
+# far behind). After writing, a user reads from the primary for
+# REPLICA_MAX_LAG seconds; use a shared REPLICA_PIN_CACHE_ALIAS with several
+# processes. DB_REPLICA_NAME adds a 'replica' alias with the primary's
+# engine, e.g. a copy of db.sqlite3 for local testing.
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+if DB_REPLICA_NAME:
+    DATABASES['replica'] = {**DATABASES['default'], 'NAME': DB_REPLICA_NAME, 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+REPLICA_MAX_LAG = config('REPLICA_MAX_LAG', default=5, cast=float)
+REPLICA_LAG_CHECK_INTERVAL = config('REPLICA_LAG_CHECK_INTERVAL', default=1, cast=float)
+REPLICA_PIN_CACHE_ALIAS = config('REPLICA_PIN_CACHE_ALIAS', default='default')
+
+# Pragmas applied to every new SQLite connection (api.db.configure_sqlite);
+# a negative cache_size is in KiB. The journal mode is stored in the
+# database file itself, so WAL (readers run alongside the single writer)
+# is only switched on by the production profile.
+SQLITE_PRAGMAS = {
+    'busy_timeout': SQLITE_BUSY_TIMEOUT,
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+    'cache_size': config('SQLITE_CACHE_SIZE', default=-64000, cast=int),
+    'temp_store': 'MEMORY',
+}
+if SQLITE_PRODUCTION_PROFILE:
+    SQLITE_PRAGMAS.update({
+        'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+        'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+    })
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -86,7 +133,7 @@ AUTH_PASSWORD_VALIDATORS = [
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -98,6 +145,41 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Authenticated users are cached per token for TOKEN_CACHE_TTL seconds.
+# Every hit still checks that the token exists and its user is active, so
+# the cache can stay process-local. Set TOKEN_CACHE_ALIAS to a CACHES alias
+# to share entries between processes.
+TOKEN_CACHE_MAX_SIZE = config('TOKEN_CACHE_MAX_SIZE', default=10000, cast=int)
+TOKEN_CACHE_TTL = config('TOKEN_CACHE_TTL', default=60, cast=int)
+TOKEN_CACHE_ALIAS = config('TOKEN_CACHE_ALIAS', default='') or None
+
+# Seconds before the compiled role -> permission matrix is rebuilt even
+# without a Role/Permission change (changes in other processes).
+PERMISSION_MATRIX_TTL = config('PERMISSION_MATRIX_TTL', default=300, cast=int)
+
+# Seconds before the in-memory type-ahead index behind /api/lookup/ is
+# reloaded, picking up changes made by other processes.
+LOOKUP_INDEX_TTL = config('LOOKUP_INDEX_TTL', default=300, cast=int)
+
+# Dashboard payloads are cached for DASHBOARD_CACHE_TIMEOUT seconds in the
+# DASHBOARD_CACHE_ALIAS cache (use a shared backend with several processes).
+# With DASHBOARD_STALE_WHILE_REVALIDATE, outdated payloads are served for up
+# to DASHBOARD_STALE_TTL more seconds while they are rebuilt in the background.
+DASHBOARD_CACHE_ALIAS = config('DASHBOARD_CACHE_ALIAS', default='default')
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=300, cast=int)
+DASHBOARD_STALE_WHILE_REVALIDATE = config('DASHBOARD_STALE_WHILE_REVALIDATE', default=False, cast=bool)
+DASHBOARD_STALE_TTL = config('DASHBOARD_STALE_TTL', default=3600, cast=int)
+
+# Months (1-12) in which each academic term starts; terms are labelled
+# "<year>-T<n>" and run until the next start month.
+ACADEMIC_TERM_START_MONTHS = config(
+    'ACADEMIC_TERM_START_MONTHS', default='1,5,9',
+    cast=lambda v: tuple(sorted(int(s) for s in v.split(',')))
+)
+
+# Output directory of the snapshot_analytics command.
+ANALYTICS_SNAPSHOT_DIR = config('ANALYTICS_SNAPSHOT_DIR', default=str(BASE_DIR / 'analytics'))
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -179,7 +179,7 @@ const Assignments = () => {
                   <div>
                     <span className="text-sm font-medium text-gray-700">Teacher:</span>
                     <span className="ml-2 text-sm text-gray-900">
-                      {assignment.teacher?.user?.first_name} {assignment.teacher?.user?.last_name}
+                      {assignment.teacher?.name}
                     </span>
                   </div>
                 )}
@@ -272,7 +272,7 @@ const Assignments = () => {
                   <div>
                     <label className="block text-sm font-medium text-gray-700">Teacher</label>
                     <p className="mt-1 text-sm text-gray-900">
-                      {selectedAssignment.teacher?.user?.first_name} {selectedAssignment.teacher?.user?.last_name}
+                      {selectedAssignment.teacher?.name}
                     </p>
                   </div>
                   <div>
@@ -48,8 +48,7 @@ const Attendance = () => {
 
   const filteredAttendance = attendance.filter(record => {
     const matchesSearch = 
-      record.student?.user?.first_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      record.student?.user?.last_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
+      record.student?.name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
       record.class_session?.name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
       record.class_session?.subject?.name?.toLowerCase().includes(searchTerm.toLowerCase())
     
@@ -182,13 +181,13 @@ const Attendance = () => {
                         <div className="flex-shrink-0 h-8 w-8">
                           <div className="h-8 w-8 rounded-full bg-indigo-100 flex items-center justify-center">
                             <span className="text-xs font-medium text-indigo-600">
-                              {record.student?.user?.first_name?.[0]}{record.student?.user?.last_name?.[0]}
+                              {record.student?.name?.split(' ').map((part) => part[0]).join('')}
                             </span>
                           </div>
                         </div>
                         <div className="ml-3">
                           <div className="text-sm font-medium text-gray-900">
-                            {record.student?.user?.first_name} {record.student?.user?.last_name}
+                            {record.student?.name}
                           </div>
                           <div className="text-sm text-gray-500">
                             {record.student?.student_id}
@@ -214,7 +213,7 @@ const Attendance = () => {
                     </span>
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
-                    {record.marked_by?.first_name} {record.marked_by?.last_name}
+                    {record.marked_by?.name}
                   </td>
                   <td className="px-6 py-4 text-sm text-gray-900">
                     {record.notes || '-'}
@@ -17,7 +17,7 @@ const Classes = () => {
 
   const fetchClasses = async () => {
     try {
-      const response = await api.get('/classes/')
+      const response = await api.get('/classes/', { params: { expand: 'subject' } })
       setClasses(response.data.results || response.data)
     } catch (error) {
       console.error('Failed to fetch classes:', error)
@@ -29,8 +29,7 @@ const Classes = () => {
   const filteredClasses = classes.filter(classItem =>
     classItem.name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
     classItem.subject?.name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    classItem.teacher?.user?.first_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    classItem.teacher?.user?.last_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
+    classItem.teacher?.name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
     classItem.room_number?.toLowerCase().includes(searchTerm.toLowerCase())
   )
 
@@ -118,7 +117,7 @@ const Classes = () => {
                 <div>
                   <span className="text-sm font-medium text-gray-700">Teacher:</span>
                   <span className="ml-2 text-sm text-gray-900">
-                    {classItem.teacher?.user?.first_name} {classItem.teacher?.user?.last_name}
+                    {classItem.teacher?.name}
                   </span>
                 </div>
                 
@@ -204,7 +203,7 @@ const Classes = () => {
                   <div>
                     <label className="block text-sm font-medium text-gray-700">Teacher</label>
                     <p className="mt-1 text-sm text-gray-900">
-                      {selectedClass.teacher?.user?.first_name} {selectedClass.teacher?.user?.last_name}
+                      {selectedClass.teacher?.name}
                     </p>
                   </div>
                   <div>
@@ -54,8 +54,7 @@ const Grades = () => {
 
   const filteredGrades = grades.filter(grade => {
     const matchesSearch = 
-      grade.student?.user?.first_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      grade.student?.user?.last_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
+      grade.student?.name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
       grade.assignment_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
       grade.subject?.name?.toLowerCase().includes(searchTerm.toLowerCase())
     
@@ -199,13 +198,13 @@ const Grades = () => {
                         <div className="flex-shrink-0 h-8 w-8">
                           <div className="h-8 w-8 rounded-full bg-indigo-100 flex items-center justify-center">
                             <span className="text-xs font-medium text-indigo-600">
-                              {grade.student?.user?.first_name?.[0]}{grade.student?.user?.last_name?.[0]}
+                              {grade.student?.name?.split(' ').map((part) => part[0]).join('')}
                             </span>
                           </div>
                         </div>
                         <div className="ml-3">
                           <div className="text-sm font-medium text-gray-900">
-                            {grade.student?.user?.first_name} {grade.student?.user?.last_name}
+                            {grade.student?.name}
                           </div>
                           <div className="text-sm text-gray-500">
                             {grade.student?.student_id}